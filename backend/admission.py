@@ -0,0 +1,192 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from backend.ai_engine import metrics
+
+# ---------------------------
+# CONFIG
+# ---------------------------
+
+def _budget(name: str, default: str):
+    # "concurrency,queue,max_wait_s,retry_after_s", e.g. SO_ADMIT_CHAT="2,8,30,10"
+    concurrency, queue, max_wait, retry_after = os.environ.get(f"SO_ADMIT_{name.upper()}", default).split(",")
+    return int(concurrency), int(queue), float(max_wait), int(retry_after)
+
+# Dashboard reads get most of the threadpool; chat (two LLM calls and a full
+# scan each) and bulk reads get small budgets, so a burst of either can't
+# starve the cheap endpoints.
+BUDGETS = {
+    "interactive": _budget("interactive", "16,64,2,1"),
+    "chat": _budget("chat", "2,8,30,10"),
+    "bulk": _budget("bulk", "2,4,10,5"),
+}
+
+# /details requests at least this large (or searching every status) count as bulk
+BULK_PAGE_SIZE = int(os.environ.get("SO_BULK_PAGE_SIZE", "5000"))
+INTERACTIVE_PREFIXES = ("/summary", "/details/", "/facets", "/hierarchies", "/drilldown/", "/orders/", "/datasets")
+
+QUEUE_DEPTH = metrics.registry.register(metrics.Gauge(
+    "so_admission_queue_depth", "Requests waiting for a slot, by priority class"))
+IN_FLIGHT = metrics.registry.register(metrics.Gauge(
+    "so_admission_in_flight", "Requests holding a slot, by priority class"))
+WAIT_SECONDS = metrics.registry.register(metrics.Histogram(
+    "so_admission_wait_seconds", "Time admitted requests waited for a slot, by priority class"))
+SHED = metrics.registry.register(metrics.Counter(
+    "so_admission_shed_total", "Requests rejected by admission control, by priority class and reason"))
+
+
+class Shed(Exception):
+    def __init__(self, status: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+# ---------------------------
+# PRIORITY CLASSES
+# ---------------------------
+
+class PriorityClass:
+    """
+    A concurrency budget with a bounded FIFO queue. A request that finds the
+    queue full is shed at once (429); one that waits longer than
+    `max_wait_s` is shed too (503). Both carry Retry-After. Runs on the event
+    loop only, so the counters need no lock.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_limit: int, max_wait_s: float, retry_after_s: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.max_wait_s = max_wait_s
+        self.retry_after_s = retry_after_s
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+    def _report(self):
+        QUEUE_DEPTH.set(len(self._waiters), **{"class": self.name})
+        IN_FLIGHT.set(self.in_flight, **{"class": self.name})
+
+    async def acquire(self) -> float:
+        """
+        Waits for a slot; returns the seconds waited.
+        """
+        if self.in_flight < self.concurrency and not self._waiters:
+            self.in_flight += 1
+            self._report()
+            return 0.0
+        if len(self._waiters) >= self.queue_limit:
+            raise Shed(429, "queue_full", self.retry_after_s)
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait_s)
+        except asyncio.TimeoutError:
+            raise Shed(503, "timeout", self.retry_after_s)
+        except asyncio.CancelledError:
+            # Client went away; pass on a slot that was handed over meanwhile
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._report()
+        return time.perf_counter() - start
+
+    def release(self):
+        # The slot goes straight to the oldest waiter, if any
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._report()
+                return
+        self.in_flight -= 1
+        self._report()
+
+    def snapshot(self) -> dict:
+        return {"in_flight": self.in_flight, "queued": len(self._waiters),
+                "concurrency": self.concurrency, "queue_limit": self.queue_limit}
+
+
+def classify(path: str, query: bytes) -> Optional[str]:
+    """
+    Priority class of a request, or None for requests that are never queued
+    (probes, metrics, profiles, docs, static files).
+    """
+    if path == "/chat" or path.startswith("/chat/"):
+        return "chat"
+    if not path.startswith(INTERACTIVE_PREFIXES):
+        return None
+    if path.startswith("/details/"):
+        params = parse_qs(query.decode("latin-1"))
+        try:
+            page_size = int(params.get("page_size", ["1000"])[0])
+        except ValueError:
+            page_size = 0
+        grand_total_search = path.rstrip("/") == "/details/Grand Total" and params.get("search", [""])[0].strip()
+        if page_size >= BULK_PAGE_SIZE or grand_total_search:
+            return "bulk"
+    return "interactive"
+
+
+# ---------------------------
+# MIDDLEWARE
+# ---------------------------
+
+classes = {name: PriorityClass(name, *budget) for name, budget in BUDGETS.items()}
+
+
+def snapshot() -> dict:
+    return {name: priority.snapshot() for name, priority in classes.items()}
+
+
+class AdmissionMiddleware:
+    """
+    Admits each classified request through its priority class before the
+    route runs (and before it takes a threadpool thread), and sheds it with
+    a JSON 429/503 and Retry-After when the class is saturated.
+    """
+
+    def __init__(self, app, priority_classes: Optional[Dict[str, PriorityClass]] = None):
+        self.app = app
+        self.classes = classes if priority_classes is None else priority_classes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        name = classify(scope["path"], scope.get("query_string", b""))
+        priority = self.classes.get(name) if name else None
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            waited = await priority.acquire()
+        except Shed as shed:
+            SHED.inc(**{"class": priority.name, "reason": shed.reason})
+            body = json.dumps({"detail": f"Server busy ({priority.name}: {shed.reason}); retry in {shed.retry_after}s"}).encode()
+            await send({"type": "http.response.start", "status": shed.status, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(shed.retry_after).encode()),
+            ]})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        WAIT_SECONDS.observe(waited, **{"class": priority.name})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            priority.release()
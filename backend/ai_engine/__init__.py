@@ -1,3 +1,10 @@
-from .agent import run_pandas_query
+# The agent pulls in langchain (slow to import); load it on first use so the
+# data modules (data_version, executor, metrics, ...) stay cheap to import.
+__all__ = ["run_pandas_query", "plan_query"]
 
-__all__ = ["run_pandas_query"]
+
+def __getattr__(name):
+    if name in __all__:
+        from . import agent
+        return getattr(agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,16 +1,45 @@
+import copy
 import json
-from typing import List, Dict, Any
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
 import pandas as pd
 
 from langchain_ollama import ChatOllama
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 
 # Relative imports within the ai_engine package
-from .schema import validate_query_plan
+from .schema import DATASETS, validate_query_plan
 from .column_resolver import resolve_column_or_clarify
 from .executor import execute_query_plan, load_dataset
+from .registry import registry
+from .metrics import Stopwatch, log_event
+from .data_version import current_version
+from .singleflight import SingleFlight
+from .facets import STATUS_COL, common_values
+from .approximate import APPROX_OPERATIONS, MARGIN_SUFFIX, estimate_plan
 
 MODEL = "llama3.2"
+# How long Ollama keeps the model loaded after a request (the startup warmup pings with it too)
+KEEP_ALIVE = os.environ.get("SO_OLLAMA_KEEP_ALIVE", "30m")
+
+# Columns whose most frequent values are listed in the prompt (from the facet counts)
+PROMPT_VALUE_COLUMNS = ["Seasonal Flag", "Region", "Division", "Zone", "Warehouse", "Ageing_Group"]
+PROMPT_VALUE_LIMIT = 12
+DEFAULT_COMMON_VALUES = """- Store Status: ['Active', 'Hold', 'Closed']
+- Seasonal Flag: ['SUMMER', 'WINTER', 'BASIC', 'CORE']
+- Region: ['JHK1', 'WB1', ...]"""
+
+# Identical questions asked at the same moment share one planner / executor run
+_plan_flight = SingleFlight("chat_plan")
+_execute_flight = SingleFlight("chat_execute")
+
+# Plans answered approximately, kept so the exact answer can follow on request
+MAX_EXACT_PLANS = 256
+_exact_plans: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+_exact_lock = threading.Lock()
 
 SYSTEM_PROMPT = """
 You are a DATA QUERY PLANNER for a Sales Order dataset.
@@ -23,15 +52,14 @@ Columns: ['Priority', 'Sitealias', 'Sitecode', 'Region', 'State', 'Store Remark'
 CRITICAL: Note that the column 'Ageing ' has a trailing space.
 
 COMMON VALUES:
-- Store Status: ['Active', 'Hold', 'Closed']
-- Seasonal Flag: ['SUMMER', 'WINTER', 'BASIC', 'CORE']
-- Region: ['JHK1', 'WB1', ...]
+{COMMON_VALUES}
 
 RULES (STRICT):
 1. Output MUST be valid JSON.
 2. The JSON MUST include "operation", "dataset", and "metric" (if applicable).
-3. "operation" MUST be one of: ["sum", "count", "group_sum", "group_count", "top_n", "bottom_n", "chat"].
-4. "dataset" MUST be "processed" (default) or "transformed".
+3. "operation" MUST be one of: ["sum", "count", "group_sum", "group_count", "top_n", "bottom_n", "avg", "min", "max", "percentile", "nunique", "histogram", "trend", "chat"].
+4. "dataset" MUST be "processed" (default) unless the user names another one of:
+{DATASETS}
 5. For "filters", use: {"Column Name": {"op": "=", "value": "value"}}.
 6. Operator Precision (CRITICAL):
    - "Greater than" or "More than" ALWAYS uses ">".
@@ -44,6 +72,13 @@ RULES (STRICT):
    - OMIT "metric" for "Top N by count". Include "metric" for summing.
    - NEVER add a filter on the group_by column (e.g. {"Region": "=": "..."}) unless specifically asked.
 10. NEVER add a filter with "value": null. If no filter is needed, omit the "filters" key.
+11. Statistics: "avg", "min", "max", "percentile" and "nunique" need a "metric"; add "group_by" for one value per group.
+   - "Average" or "mean" uses "avg". "Median" uses "percentile" with "percentile": 50; "90th percentile" uses "percentile": 90.
+   - "How many distinct/unique X" uses "nunique" with "metric": X (e.g. "Sitecode" for stores, "Orderkey" for orders).
+12. "Distribution" or "histogram" uses "histogram" over "metric" (default "Ageing "). Omit "bins" for the usual ageing buckets, or give "bins" as a number of bins or a list of edges (e.g. [0, 7, 14, 30, 60]).
+13. Questions over time ("trend", "growing", "week over week", "last 30 days") use "trend": one value per day, or per "period": "week" / "month", over the last "days" days.
+   - "metric" is the quantity to follow; omit it to follow the number of order lines. "Ageing " follows the average ageing.
+   - Filters and "group_by" may only use Store Status, Region, Zone, Division, Warehouse and Ageing_Group (at most two of them together).
 
 CRITICAL:
 - ONLY output the JSON plan.
@@ -86,6 +121,40 @@ Example 5: "Orders with Ageing greater than 50"
     "filters": {"Ageing ": {"op": ">", "value": 50}}
 }
 
+Example 6: "Median ageing by Region"
+{
+    "dataset": "processed",
+    "operation": "percentile",
+    "percentile": 50,
+    "metric": "Ageing ",
+    "group_by": ["Region"]
+}
+
+Example 7: "How many distinct stores have unallocated stock?"
+{
+    "dataset": "processed",
+    "operation": "nunique",
+    "metric": "Sitecode",
+    "filters": {"Unallocated Qty": {"op": ">", "value": 0}}
+}
+
+Example 8: "Ageing distribution for Hold stores"
+{
+    "dataset": "processed",
+    "operation": "histogram",
+    "metric": "Ageing ",
+    "filters": {"Store Status": {"op": "=", "value": "Hold"}}
+}
+
+Example 9: "Is unallocated stock for Region WB1 growing week over week?"
+{
+    "dataset": "processed",
+    "operation": "trend",
+    "metric": "Unallocated Qty Pcs",
+    "period": "week",
+    "filters": {"Region": {"op": "=", "value": "WB1"}}
+}
+
 CONVERSATION EXAMPLE:
 User: "Total Unallocated Qty for Region DELHI NCR?"
 Assistant: [RESULT] 15,000 [/RESULT]
@@ -119,14 +188,153 @@ If the result is a large table, just provide a very brief introductory sentence
 STRICT: DO NOT use [RESULT] tags in your output.
 """
 
-def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) -> str:
+def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None,
+                     trace: Dict[str, Any] | None = None, approximate: bool = False) -> str:
     """
     Main entry point for the AI Agent.
     Orchestrates: LLM -> Plan -> Resolve Columns -> Validate -> Execute.
+    Every stage is timed; the per-query record goes to agent_debug.log off the request path.
+    Pass a `trace` dict to receive that record (plan, path, llm_calls, stages, total_s).
+    With `approximate`, sum/count plans are answered from the ETL's stratified
+    sample with 95% error bounds; the record then carries `exact_id` for
+    run_exact_query().
     """
-    llm = ChatOllama(model=MODEL, temperature=0)
+    clock = Stopwatch("chat")
+    event = _new_event(query, trace)
+    try:
+        return _run_pandas_query(query, history, clock, event, approximate)
+    finally:
+        _finish_event(event, clock)
 
-    messages = [SystemMessage(content=SYSTEM_PROMPT)]
+def run_exact_query(exact_id: str, trace: Dict[str, Any] | None = None) -> str | None:
+    """
+    Exact answer for an earlier approximate one (by its `exact_id`), reusing
+    its plan, so only the execution runs: the exact figure is returned as
+    formatted, without a second LLM summary. None if the id is unknown.
+    """
+    with _exact_lock:
+        remembered = _exact_plans.get(exact_id)
+    if remembered is None:
+        return None
+    query, plan = remembered
+    clock = Stopwatch("chat")
+    event = _new_event(query, trace)
+    event.update(path="exact_followup", plan=plan)
+    try:
+        return _execute_and_summarize(query, copy.deepcopy(plan), _llm(), clock, event, summarize=False)
+    finally:
+        _finish_event(event, clock)
+
+def _remember_exact(query: str, plan: Dict[str, Any]) -> str:
+    exact_id = uuid.uuid4().hex[:16]
+    with _exact_lock:
+        _exact_plans[exact_id] = (query, copy.deepcopy(plan))
+        while len(_exact_plans) > MAX_EXACT_PLANS:
+            _exact_plans.popitem(last=False)
+    return exact_id
+
+def plan_query(query: str, history: List[Dict[str, str]] | None = None,
+               trace: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """
+    Planner only (no execution or summary): {"plan": {...}} for a validated,
+    column-resolved plan, or {"reply": "..."} when the agent would answer
+    directly (chat, clarification, invalid query).
+    """
+    clock = Stopwatch("plan")
+    event = _new_event(query, trace)
+    try:
+        plan, reply = _plan_query(query, history, _llm(), clock, event)
+        return {"plan": plan} if reply is None else {"reply": reply}
+    finally:
+        _finish_event(event, clock)
+
+def _new_event(query: str, trace: Dict[str, Any] | None) -> Dict[str, Any]:
+    event = trace if trace is not None else {}
+    # 'path' says how the plan was produced: "llm" here, "coalesced" when it was
+    # shared from a concurrent identical request, "exact_followup" for /chat/exact
+    event.update({"query": query, "path": "llm", "llm_calls": 0})
+    return event
+
+def _finish_event(event: Dict[str, Any], clock: Stopwatch):
+    event["stages"] = clock.stages
+    event["total_s"] = round(clock.total(), 6)
+    log_event(event)
+
+_prompt_cache: Tuple[Any, Dict[str, str], str] | None = None
+
+def _format_values(values: List[str], complete: bool) -> str:
+    return str(values)[:-1] + ("]" if complete else ", ...]")
+
+def _dataset_lines(datasets: Dict[str, str]) -> str:
+    return "\n".join(f'   - "{name}": {description}' for name, description in datasets.items())
+
+def system_prompt() -> str:
+    """
+    SYSTEM_PROMPT with the registered datasets and the current data's common
+    values (statuses and the most frequent values of the filter columns).
+    Rebuilt when the facets or the datasets change.
+    """
+    global _prompt_cache
+    try:
+        datasets = registry.names()
+    except Exception:
+        datasets = {name: spec["description"] for name, spec in DATASETS.items()}
+    base = SYSTEM_PROMPT.replace("{DATASETS}", _dataset_lines(datasets))
+    try:
+        facets = current_version().get_facets()
+    except Exception:
+        return base.replace("{COMMON_VALUES}", DEFAULT_COMMON_VALUES)
+    cached = _prompt_cache
+    if cached is not None and cached[0] is facets and cached[1] == datasets:
+        return cached[2]
+
+    statuses = facets.groupby(STATUS_COL)["Rows"].sum().sort_values(ascending=False).index.tolist()
+    lines = [f"- Store Status: {_format_values([s for s in statuses if s], True)}"] if any(statuses) else []
+    values = common_values(facets, PROMPT_VALUE_COLUMNS, PROMPT_VALUE_LIMIT + 1)
+    for col in PROMPT_VALUE_COLUMNS:
+        if values.get(col):
+            listed = values[col][:PROMPT_VALUE_LIMIT]
+            lines.append(f"- {col}: {_format_values(listed, len(values[col]) <= PROMPT_VALUE_LIMIT)}")
+    prompt = base.replace("{COMMON_VALUES}", "\n".join(lines) or DEFAULT_COMMON_VALUES)
+    _prompt_cache = (facets, datasets, prompt)
+    return prompt
+
+def _llm() -> ChatOllama:
+    return ChatOllama(model=MODEL, temperature=0, keep_alive=KEEP_ALIVE)
+
+def _run_pandas_query(query: str, history: List[Dict[str, str]] | None, clock: Stopwatch, event: dict,
+                      approximate: bool = False) -> str:
+    llm = _llm()
+    plan, reply = _plan_query(query, history, llm, clock, event)
+    if reply is not None:
+        return reply
+    return _execute_and_summarize(query, plan, llm, clock, event, approximate)
+
+def _plan_query(query: str, history: List[Dict[str, str]] | None, llm: ChatOllama,
+                clock: Stopwatch, event: dict) -> Tuple[Dict[str, Any] | None, str | None]:
+    """
+    Returns (plan, None), or (None, reply) when the agent answers without executing.
+    Concurrent requests with the same question, history and data version
+    share one planning run.
+    """
+    key = (current_version().name, query, json.dumps(history or [], sort_keys=True, default=str))
+    clock.skip()
+    (plan, reply), shared = _plan_flight.do(key, lambda: _build_plan(query, history, llm, clock, event))
+    if shared:
+        clock.lap("plan_wait")
+        event["path"] = "coalesced"
+        event.setdefault("coalesced", []).append("plan")
+        if plan is not None:
+            plan = copy.deepcopy(plan)
+            event["plan"] = plan
+    return plan, reply
+
+def _build_plan(query: str, history: List[Dict[str, str]] | None, llm: ChatOllama,
+                clock: Stopwatch, event: dict) -> Tuple[Dict[str, Any] | None, str | None]:
+    """
+    LLM plan -> JSON extraction -> auto-corrections -> column resolution -> validation.
+    """
+    messages = [SystemMessage(content=system_prompt())]
     
     # Add history if provided
     if history:
@@ -143,11 +351,14 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
 
         # ---------------- STEP 1: PLAN ----------------
     try:
+        clock.skip()
         response = llm.invoke(messages)
+        event["llm_calls"] += 1
+        clock.lap("llm_plan")
         plan_raw = response.content if response else ""
 
         if not plan_raw.strip():
-            return "I couldn't generate a plan for that query. Please try rephrasing."
+            return None, "I couldn't generate a plan for that query. Please try rephrasing."
 
         # Robust JSON Extraction
         def extract_first_json(text):
@@ -183,14 +394,24 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
         if not plan_json:
              # If no JSON found, treat the whole response as a 'chat' reply if it looks like text
              if len(plan_raw.strip()) > 0 and "{" not in plan_raw:
-                 return plan_raw.strip()
-             return f"I received an invalid response from the AI. Raw response: {plan_raw[:100]}"
+                 return None, plan_raw.strip()
+             return None, f"I received an invalid response from the AI. Raw response: {plan_raw[:100]}"
 
         plan = json.loads(plan_json)
+        clock.lap("json_extract")
         
         # ---------------- HANDLE 'CHAT' EARLY ----------------
         if plan.get("operation") == "chat":
-            return plan.get("message", "I am a data agent.")
+            return None, plan.get("message", "I am a data agent.")
+
+        # Common synonyms for the statistics
+        aliases = {"average": "avg", "mean": "avg", "median": "percentile", "distinct_count": "nunique",
+                   "count_distinct": "nunique", "distribution": "histogram",
+                   "time_series": "trend", "timeseries": "trend"}
+        if plan.get("operation") in aliases:
+            if plan["operation"] == "median":
+                plan["percentile"] = 50
+            plan["operation"] = aliases[plan["operation"]]
 
         # Ensure operation exists
         if not plan.get("operation") or plan.get("operation") == "None":
@@ -207,24 +428,25 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
         if "dataset" not in plan:
             plan["dataset"] = "processed"
             
-        allowed_datasets = ["processed", "transformed"]
-        if plan["dataset"] not in allowed_datasets:
+        if plan["dataset"] not in registry.names():
              plan["dataset"] = "processed"
 
         # ---------------- DOUBLE CHECK 'CHAT' AFTER AUTO-CORRECT ----------------
         if plan.get("operation") == "chat":
-            return plan.get("message", "I am a data agent.")
+            return None, plan.get("message", "I am a data agent.")
  
     except Exception as e:
-        return f"I couldn't understand your question. Error: {str(e)}"
+        return None, f"I couldn't understand your question. Error: {str(e)}"
 
     # ---------------- STEP 2: LOAD DATA ----------------
     # We load data here to get the list of available columns for resolution
     try:
+        clock.skip()
         df = load_dataset(plan.get("dataset", "processed"))
         columns = df.columns.tolist()
+        clock.lap("dataset_load")
     except Exception as e:
-        return f"Error loading data: {str(e)}"
+        return None, f"Error loading data: {str(e)}"
 
     # ---------------- STEP 3: COLUMN RESOLUTION ----------------
     def resolve_or_ask(field: str):
@@ -245,7 +467,7 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
     if plan.get("metric") is not None:
         result = resolve_or_ask(plan["metric"])
         if isinstance(result, str) and result.startswith("Which column"):
-            return result
+            return None, result
         plan["metric"] = result
 
     # Resolve 'group_by'
@@ -254,7 +476,7 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
         if isinstance(gb, str):
             result = resolve_or_ask(gb)
             if isinstance(result, str) and result.startswith("Which column"):
-                return result
+                return None, result
             plan["group_by"] = result
         elif isinstance(gb, list):
             new_gb = []
@@ -262,7 +484,7 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
                 if col is None: continue
                 result = resolve_or_ask(col)
                 if isinstance(result, str) and result.startswith("Which column"):
-                    return result
+                    return None, result
                 new_gb.append(result)
             plan["group_by"] = new_gb
 
@@ -301,15 +523,19 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
                 
             result = resolve_or_ask(col)
             if isinstance(result, str) and result.startswith("Which column"):
-                return result
+                return None, result
             new_filters[result] = cond
         plan["filters"] = new_filters
 
+    clock.lap("column_resolution")
+
     # ---------------- STEP 4: VALIDATE ----------------
     try:
-        validate_query_plan(plan, columns)
+        validate_query_plan(plan, columns, registry.names())
     except Exception as e:
-        return f"Invalid query: {str(e)}"
+        return None, f"Invalid query: {str(e)}"
+    finally:
+        clock.lap("validation")
 
     # AUTO-CORRECT: If operation is top_n/bottom_n and metric is a known ID column, remove it to force Count mode
     if plan.get("operation") in ["top_n", "bottom_n"]:
@@ -317,29 +543,56 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
             id_cols = ["Orderkey", "Orderno", "Article Number"]
             if plan["metric"] in id_cols:
                 del plan["metric"]
+    event["plan"] = plan
+    return plan, None
+
+def _execute_and_summarize(query: str, plan: Dict[str, Any], llm: ChatOllama,
+                           clock: Stopwatch, event: dict, approximate: bool = False,
+                           summarize: bool = True) -> str:
+    precision = None
     try:
-        with open("agent_debug.log", "a") as f:
-            f.write(f"\nQUERY: {query}\n")
-            f.write(f"PLAN: {json.dumps(plan)}\n")
-        result_df = execute_query_plan(plan)
+        clock.skip()
+        # The sample is drawn from the processed file only; other datasets are always exact
+        estimable = (approximate and plan["operation"] in APPROX_OPERATIONS
+                     and plan.get("dataset", "processed") == "processed")
+        sample = current_version().get_sample() if estimable else None
+        if sample is not None:
+            result_df, precision = estimate_plan(plan, sample)
+            event["approximate"] = precision
+            event["exact_id"] = _remember_exact(query, plan)
+            clock.lap("estimate")
+        else:
+            key = (current_version().name, json.dumps(plan, sort_keys=True, default=str))
+            result_df, shared = _execute_flight.do(key, lambda: execute_query_plan(plan))
+            if shared:
+                event.setdefault("coalesced", []).append("execution")
+            # The frame may be shared with concurrent requests; format a copy
+            result_df = result_df.copy()
+            clock.lap("execution")
     except Exception as e:
-        with open("agent_debug.log", "a") as f:
-            f.write(f"EXECUTION ERROR: {str(e)}\n")
+        event["error"] = str(e)
         return f"Calculation Error: {str(e)}"
 
     # Format numeric columns with commas for readability
     for col in result_df.select_dtypes(include=['number']).columns:
         # Use comma separator for thousands
-        result_df[col] = result_df[col].apply(lambda x: f"{x:,.0f}" if x == int(x) else f"{x:,.2f}")
+        result_df[col] = result_df[col].apply(
+            lambda x: "n/a" if pd.isna(x) else f"{x:,.0f}" if x == int(x) else f"{x:,.2f}")
 
     # Return as Markdown table for better UI rendering
-    if len(result_df) > 1 or len(result_df.columns) > 1:
+    if precision is not None and len(result_df) == 1 and len(result_df.columns) == 2:
+        col = result_df.columns[0]
+        data_str = f"Result Value: about {result_df.iloc[0, 0]} (± {result_df.iloc[0, 1]}) (Metric: {col})"
+    elif len(result_df) > 1 or len(result_df.columns) > 1:
         data_str = result_df.to_markdown(index=False)
     else:
         # For single values, provide a very explicit format to avoid LLM confusion
         val = result_df.iloc[0, 0]
         col = result_df.columns[0]
         data_str = f"Result Value: {val} (Metric: {col})"
+    clock.lap("formatting")
+    if not summarize:
+        return data_str
         
     # ---------------- STEP 6: SUMMARIZE (Natural Language) ----------------
     try:
@@ -371,7 +624,10 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
         """
         
         summary_msg = [HumanMessage(content=instruction)]
+        clock.skip()
         summary_resp = llm.invoke(summary_msg)
+        event["llm_calls"] += 1
+        clock.lap("llm_summary")
         
         final_text = summary_resp.content.strip() if summary_resp else data_str
         
@@ -382,8 +638,14 @@ def run_pandas_query(query: str, history: List[Dict[str, str]] | None = None) ->
                 final_text = final_text[len(prefix):].strip()
         
         if not final_text:
-            return data_str
-            
-        return final_text
+            final_text = data_str
+
+        return final_text + _estimate_note(precision)
     except:
-        return data_str
+        return data_str + _estimate_note(precision)
+
+def _estimate_note(precision: Dict[str, Any] | None) -> str:
+    if precision is None:
+        return ""
+    return (f"\n\n_Estimated from a {precision['sample_rows']:,}-row sample of {precision['population_rows']:,} rows; "
+            f"'{MARGIN_SUFFIX.strip()}' is the 95% margin of error. The exact answer is available on request._")
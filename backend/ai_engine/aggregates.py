@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Statistics the executor computes with the kernels below (on top of sum/count)
+STAT_OPERATIONS = {"avg", "min", "max", "percentile", "nunique", "histogram"}
+STAT_LABELS = {"avg": "avg", "min": "min", "max": "max", "nunique": "distinct"}
+
+# Default histogram: the ETL's Ageing_Group buckets (0-3, 4-7, 8-11, 12 & above)
+HISTOGRAM_METRIC = "Ageing "
+AGEING_BINS = [0, 4, 8, 12, float("inf")]
+MAX_BINS = 50
+BIN_COLUMN = "Bin"
+
+
+def group_codes(df: pd.DataFrame, group_cols: List[str]) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    Dense group number per row (-1 for rows with a missing key, which
+    groupby drops) and the group keys in that order. No group columns means
+    one group.
+    """
+    if not group_cols:
+        return np.zeros(len(df), dtype=np.int64), pd.DataFrame(index=[0])
+    grouped = df.groupby(group_cols, observed=True, sort=True)
+    # ngroup() is NaN for dropped rows, so it comes back as float
+    codes = grouped.ngroup().to_numpy(dtype="float64", na_value=-1).astype(np.int64)
+    keys = grouped.size().index.to_frame(index=False)
+    return codes, keys
+
+
+def _numeric(df: pd.DataFrame, metric: str, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # (values, codes) of the rows that have both a group and a numeric value
+    values = pd.to_numeric(df[metric], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    keep = (codes >= 0) & ~np.isnan(values)
+    return values[keep], codes[keep]
+
+
+def _segments(values: np.ndarray, codes: np.ndarray, n_groups: int):
+    # Values sorted by (group, value), plus each group's start offset and size
+    order = np.lexsort((values, codes))
+    sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    return values[order], starts, sizes
+
+
+def group_avg(values: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    sizes = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / sizes
+
+
+def group_extreme(values: np.ndarray, codes: np.ndarray, n_groups: int, largest: bool) -> np.ndarray:
+    ordered, starts, sizes = _segments(values, codes, n_groups)
+    out = np.full(n_groups, np.nan)
+    present = sizes > 0
+    # Sorted within each group: the min is its first value, the max its last
+    positions = starts + (sizes - 1 if largest else 0)
+    out[present] = ordered[positions[present]]
+    return out
+
+
+def group_percentile(values: np.ndarray, codes: np.ndarray, n_groups: int, q: float) -> np.ndarray:
+    """
+    q-th percentile (0-100) per group, interpolated linearly between the
+    closest ranks like numpy.percentile and pandas' quantile.
+    """
+    ordered, starts, sizes = _segments(values, codes, n_groups)
+    out = np.full(n_groups, np.nan)
+    present = sizes > 0
+    rank = (sizes[present] - 1) * (q / 100.0)
+    low = np.floor(rank).astype(np.int64)
+    high = np.minimum(low + 1, sizes[present] - 1)
+    base = starts[present]
+    lower, upper = ordered[base + low], ordered[base + high]
+    out[present] = lower + (upper - lower) * (rank - low)
+    return out
+
+
+def group_nunique(series: pd.Series, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    # Distinct (group, value) pairs, counted per group; missing values don't count
+    value_codes, uniques = pd.factorize(series, sort=False)
+    keep = (codes >= 0) & (value_codes >= 0)
+    pairs = np.unique(codes[keep] * max(len(uniques), 1) + value_codes[keep])
+    return np.bincount(pairs // max(len(uniques), 1), minlength=n_groups)
+
+
+def histogram_edges(values: np.ndarray, bins: Any) -> np.ndarray:
+    """
+    Bin edges: an explicit increasing list, a number of equal-width bins over
+    the values' range, or (None) the Ageing_Group buckets.
+    """
+    if bins is None:
+        return np.asarray(AGEING_BINS, dtype="float64")
+    if isinstance(bins, int):
+        low, high = (float(values.min()), float(values.max())) if len(values) else (0.0, 1.0)
+        return np.linspace(low, high if high > low else low + 1, bins + 1)
+    return np.asarray(bins, dtype="float64")
+
+
+def bin_labels(edges: np.ndarray) -> List[str]:
+    labels = []
+    for i, (low, high) in enumerate(zip(edges[:-1], edges[1:])):
+        if np.isinf(high):
+            labels.append(f">= {low:g}")
+        else:
+            closing = "]" if i == len(edges) - 2 else ")"
+            labels.append(f"[{low:g}, {high:g}{closing}")
+    return labels
+
+
+def group_histogram(values: np.ndarray, codes: np.ndarray, n_groups: int, edges: np.ndarray) -> np.ndarray:
+    """
+    Row counts per (group, bin) as an n_groups x n_bins array. Bins are
+    half-open except the last, which includes its upper edge (as in
+    numpy.histogram); values outside the edges are not counted.
+    """
+    n_bins = len(edges) - 1
+    bins = np.searchsorted(edges, values, side="right") - 1
+    bins[values == edges[-1]] = n_bins - 1
+    keep = (bins >= 0) & (bins < n_bins)
+    flat = np.bincount(codes[keep] * n_bins + bins[keep], minlength=n_groups * n_bins)
+    return flat.reshape(n_groups, n_bins)
+
+
+def stat_column(plan: Dict[str, Any]) -> str:
+    """
+    Output column of a statistic, e.g. 'Ageing (median)' or 'Sitecode (distinct)'.
+    """
+    operation, metric = plan["operation"], plan["metric"].strip()
+    if operation == "percentile":
+        q = plan.get("percentile", 50)
+        return f"{metric} ({'median' if q == 50 else f'p{q:g}'})"
+    return f"{metric} ({STAT_LABELS[operation]})"
+
+
+def compute_statistic(df: pd.DataFrame, plan: Dict[str, Any]) -> pd.DataFrame:
+    """
+    avg / min / max / percentile / nunique / histogram over `plan["metric"]`,
+    optionally per `group_by`, computed with whole-column numpy kernels
+    (bincount and sorted-segment reductions) rather than per-group Python.
+    """
+    operation = plan["operation"]
+    group_by = plan.get("group_by") or []
+    group_cols = [group_by] if isinstance(group_by, str) else list(group_by)
+    codes, keys = group_codes(df, group_cols)
+    n_groups = len(keys)
+
+    if operation == "histogram":
+        metric = plan.get("metric") or HISTOGRAM_METRIC
+        values, value_codes = _numeric(df, metric, codes)
+        edges = histogram_edges(values, plan.get("bins"))
+        counts = group_histogram(values, value_codes, n_groups, edges)
+        out = keys.loc[keys.index.repeat(len(edges) - 1), group_cols].reset_index(drop=True)
+        out[BIN_COLUMN] = bin_labels(edges) * n_groups
+        out["count"] = counts.ravel()
+        return out
+
+    column = stat_column(plan)
+    if operation == "nunique":
+        result = group_nunique(df[plan["metric"]], codes, n_groups)
+    else:
+        values, value_codes = _numeric(df, plan["metric"], codes)
+        if operation == "avg":
+            result = group_avg(values, value_codes, n_groups)
+        elif operation == "percentile":
+            result = group_percentile(values, value_codes, n_groups, float(plan.get("percentile", 50)))
+        else:
+            result = group_extreme(values, value_codes, n_groups, largest=operation == "max")
+
+    out = keys[group_cols].copy()
+    out[column] = result
+    # Groups without a numeric value have no statistic
+    return out.dropna(subset=[column]).reset_index(drop=True) if group_cols else out.reset_index(drop=True)
@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .filters import apply_filters
+
+# Same layout as etl/sample.py writes to transformed/sample.parquet
+STRATA = ["Store Status", "Region"]
+STRATUM_ROWS = "_stratum_rows"
+STRATUM_SAMPLE = "_stratum_sample"
+
+# Plans the sample can answer: sums and counts, optionally grouped and ranked
+APPROX_OPERATIONS = {"sum", "count", "group_sum", "group_count", "top_n", "bottom_n"}
+Z_95 = 1.96
+MARGIN_SUFFIX = " ±"
+
+
+def _value_column(plan: Dict[str, Any]) -> Tuple[str | None, str]:
+    # (metric summed or None for a row count, output column name), as the executor names them
+    operation = plan["operation"]
+    if operation in ("sum", "group_sum") or (operation in ("top_n", "bottom_n") and plan.get("metric")):
+        return plan["metric"], plan["metric"]
+    return None, "count"
+
+
+def _group_columns(plan: Dict[str, Any]) -> List[str]:
+    if plan["operation"] in ("sum", "count"):
+        return []
+    group_by = plan.get("group_by") or []
+    return [group_by] if isinstance(group_by, str) else list(group_by)
+
+
+def estimate_plan(plan: Dict[str, Any], sample: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """
+    Answers a sum/count plan from the stratified sample with the standard
+    stratified estimator: each sampled row stands for N_h / n_h rows of its
+    stratum, and the variance adds up per stratum (with the finite population
+    correction). Returns the executor's result shape plus a '<value> ±'
+    column (95% margin), and a summary of the estimate's precision.
+    """
+    metric, value_col = _value_column(plan)
+    group_cols = _group_columns(plan)
+    df = apply_filters(sample, plan.get("filters", {}))
+
+    y = pd.to_numeric(df[metric], errors="coerce").fillna(0).astype("float64") if metric else pd.Series(1.0, index=df.index)
+    keys = list(dict.fromkeys(STRATA + group_cols))
+    frame = df[keys].copy()
+    frame["y"] = y
+    frame["y2"] = y * y
+    sums = frame.groupby(keys, observed=True, dropna=False)[["y", "y2"]].sum().reset_index()
+
+    # Stratum sizes from the whole sample, not the filtered rows: rows outside
+    # the filter or group count as zeros of their stratum
+    sizes = sample.groupby(STRATA, observed=True, dropna=False)[[STRATUM_ROWS, STRATUM_SAMPLE]].first().reset_index()
+    sums = sums.merge(sizes, on=STRATA, how="left")
+    big_n = sums[STRATUM_ROWS].astype("float64")
+    n = sums[STRATUM_SAMPLE].astype("float64")
+    sums["estimate"] = big_n / n * sums["y"]
+    spread = (sums["y2"] - sums["y"] ** 2 / n) / (n - 1).where(n > 1)
+    sums["variance"] = (big_n ** 2 * (1 - n / big_n) / n * spread).fillna(0).clip(lower=0)
+
+    if group_cols:
+        result = sums.groupby(group_cols, observed=True, dropna=False)[["estimate", "variance"]].sum().reset_index()
+    else:
+        result = pd.DataFrame({"estimate": [sums["estimate"].sum()], "variance": [sums["variance"].sum()]})
+    margin = Z_95 * np.sqrt(result["variance"])
+
+    out = result[group_cols].copy()
+    out[value_col] = result["estimate"].round(0 if metric is None else 2)
+    out[value_col + MARGIN_SUFFIX] = margin.round(0 if metric is None else 2)
+    if plan["operation"] in ("top_n", "bottom_n"):
+        out = out.sort_values(value_col, ascending=plan["operation"] == "bottom_n").head(plan.get("limit", plan.get("n", 5)))
+
+    totals = out[value_col].abs()
+    relative = (out[value_col + MARGIN_SUFFIX] / totals.where(totals > 0)).max()
+    precision = {
+        "sample_rows": int(len(sample)),
+        "population_rows": int(sizes[STRATUM_ROWS].sum()),
+        "confidence": 0.95,
+        "max_relative_error": None if pd.isna(relative) else round(float(relative), 4),
+    }
+    return out.reset_index(drop=True), precision
@@ -0,0 +1,264 @@
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .metrics import record_scan
+
+# Same layout as etl/bitmaps.py writes to transformed/bitmaps.parquet
+BITMAP_COLUMNS = ["Store Status", "Region", "Zone", "Division", "Section", "Department",
+                  "Ageing_Group", "Month", "Warehouse", "Seasonal Flag"]
+CHUNK_BITS = 16
+CHUNK_ROWS = 1 << CHUNK_BITS
+ARRAY_MAX = 4096
+ROWS_METADATA = b"processed_rows"
+BYTES_METADATA = b"processed_bytes"
+COLUMNS_METADATA = b"bitmap_columns"
+
+if hasattr(np, "bitwise_count"):
+    def _popcount(words: np.ndarray) -> int:
+        return int(np.bitwise_count(words).sum())
+else:  # numpy < 2.0
+    _BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcount(words: np.ndarray) -> int:
+        return int(_BYTE_COUNTS[words.view(np.uint8)].sum(dtype=np.int64))
+
+
+class Bitmap:
+    """
+    A set of row positions, as 65536-bit chunks (1024 uint64 words each).
+    Only non-empty chunks are kept, so a selective bitmap costs little, and
+    AND / OR / ANDNOT only touch the chunks involved.
+    """
+
+    def __init__(self, chunks: Dict[int, np.ndarray], n_rows: int):
+        self.chunks = chunks
+        self.n_rows = n_rows
+
+    @classmethod
+    def full(cls, n_rows: int) -> "Bitmap":
+        chunks = {}
+        for chunk in range((n_rows + CHUNK_ROWS - 1) // CHUNK_ROWS):
+            bits = np.zeros(CHUNK_ROWS, dtype=bool)
+            bits[:min(CHUNK_ROWS, n_rows - chunk * CHUNK_ROWS)] = True
+            chunks[chunk] = np.packbits(bits, bitorder="little").view("<u8")
+        return cls(chunks, n_rows)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap({chunk: words & other.chunks[chunk]
+                       for chunk, words in self.chunks.items() if chunk in other.chunks}, self.n_rows)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        chunks = dict(self.chunks)
+        for chunk, words in other.chunks.items():
+            chunks[chunk] = chunks[chunk] | words if chunk in chunks else words
+        return Bitmap(chunks, self.n_rows)
+
+    def __sub__(self, other: "Bitmap") -> "Bitmap":
+        # ANDNOT
+        return Bitmap({chunk: words & ~other.chunks[chunk] if chunk in other.chunks else words
+                       for chunk, words in self.chunks.items()}, self.n_rows)
+
+    def count(self) -> int:
+        return sum(_popcount(words) for words in self.chunks.values())
+
+    def positions(self) -> np.ndarray:
+        """
+        Row positions in the set, ascending.
+        """
+        parts = []
+        for chunk in sorted(self.chunks):
+            bits = np.unpackbits(self.chunks[chunk].view(np.uint8), bitorder="little")
+            parts.append(np.flatnonzero(bits) + chunk * CHUNK_ROWS)
+        return np.concatenate(parts).astype(np.int64) if parts else np.empty(0, dtype=np.int64)
+
+
+def _container_words(kind: str, data: bytes) -> np.ndarray:
+    if kind == "bitmap":
+        return np.frombuffer(data, dtype="<u8").copy()
+    bits = np.zeros(CHUNK_ROWS, dtype=bool)
+    bits[np.frombuffer(data, dtype="<u2")] = True
+    return np.packbits(bits, bitorder="little").view("<u8")
+
+
+def _containers_from_parquet(processed_path: str, columns: List[str]) -> pd.DataFrame:
+    # Fallback for data written before the ETL produced bitmaps
+    n_rows = pq.read_metadata(processed_path).num_rows
+    records = []
+    for col in columns:
+        values = pd.read_parquet(processed_path, columns=[col])[col].astype(str).to_numpy()
+        codes, uniques = pd.factorize(values, sort=True)
+        for chunk, start in enumerate(range(0, n_rows, CHUNK_ROWS)):
+            chunk_codes = codes[start:start + CHUNK_ROWS]
+            order = np.argsort(chunk_codes, kind="stable")
+            sorted_codes = chunk_codes[order]
+            bounds = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1], True])
+            for begin, end in zip(bounds[:-1], bounds[1:]):
+                offsets = order[begin:end].astype("<u2")
+                if end - begin <= ARRAY_MAX:
+                    kind, data = "array", offsets.tobytes()
+                else:
+                    bits = np.zeros(CHUNK_ROWS, dtype=bool)
+                    bits[offsets] = True
+                    kind, data = "bitmap", np.packbits(bits, bitorder="little").tobytes()
+                records.append((col, uniques[sorted_codes[begin]], chunk, kind, int(end - begin), data))
+    return pd.DataFrame(records, columns=["Column", "Value", "Chunk", "Kind", "Cardinality", "Data"])
+
+
+def _order_sensitive(condition: Any) -> bool:
+    # A string "=" falls back to a partial match depending on the rows left before it
+    return isinstance(condition, dict) and condition.get("op") == "=" and isinstance(condition.get("value"), str)
+
+
+class BitmapIndex:
+    """
+    Roaring-style bitmaps per distinct value of the low-cardinality
+    dimensions, over row positions in the processed file. Plan filters on
+    those columns become bitmap AND / OR / ANDNOT, and row counts come from
+    popcount without reading any row data.
+    """
+
+    def __init__(self, containers: pd.DataFrame, n_rows: int, columns: List[str]):
+        self.n_rows = n_rows
+        self.columns = list(columns)
+        # column -> value -> [(chunk, kind, data)], decoded on use
+        self._values: Dict[str, Dict[str, List[Tuple[int, str, bytes]]]] = {col: {} for col in self.columns}
+        for col, value, chunk, kind, data in zip(containers["Column"], containers["Value"], containers["Chunk"],
+                                                 containers["Kind"], containers["Data"]):
+            self._values[col].setdefault(value, []).append((int(chunk), kind, data))
+        self._all: Optional[Bitmap] = None
+
+    @classmethod
+    def load(cls, bitmaps_path: str, processed_path: str) -> "BitmapIndex":
+        """
+        The ETL's persisted bitmaps, or ones built from the processed file when
+        they are missing or were written for a different file.
+        """
+        processed_rows = pq.read_metadata(processed_path).num_rows
+        if os.path.exists(bitmaps_path):
+            table = pq.read_table(bitmaps_path)
+            metadata = table.schema.metadata or {}
+            written_for = (metadata.get(ROWS_METADATA), metadata.get(BYTES_METADATA))
+            if written_for == (str(processed_rows).encode(), str(os.path.getsize(processed_path)).encode()):
+                return cls(table.to_pandas(), processed_rows, json.loads(metadata[COLUMNS_METADATA]))
+            print(f"[data] bitmap index at {bitmaps_path} is stale; rebuilding from the processed file")
+        names = pq.read_schema(processed_path).names
+        columns = [col for col in BITMAP_COLUMNS if col in names]
+        return cls(_containers_from_parquet(processed_path, columns), processed_rows, columns)
+
+    def covers(self, col: str) -> bool:
+        return col in self._values
+
+    def values(self, col: str) -> List[str]:
+        return sorted(self._values.get(col, {}))
+
+    def all_rows(self) -> Bitmap:
+        if self._all is None:
+            self._all = Bitmap.full(self.n_rows)
+        return self._all
+
+    def bitmap(self, col: str, values: List[str]) -> Bitmap:
+        """
+        Rows whose `col` is any of `values` (OR of their bitmaps).
+        """
+        chunks: Dict[int, np.ndarray] = {}
+        for value in values:
+            for chunk, kind, data in self._values[col].get(value, []):
+                words = _container_words(kind, data)
+                chunks[chunk] = chunks[chunk] | words if chunk in chunks else words
+        return Bitmap(chunks, self.n_rows)
+
+    def _matching(self, col: str, op: str, val: Any, selected: Optional[Bitmap]) -> Optional[Bitmap]:
+        # Same semantics as filters.build_mask; None when the bitmaps can't answer it.
+        # `selected` holds the rows left by the earlier filters (None: all rows).
+        keys = self._values[col]
+        if isinstance(val, str) and op in ("=", "!=", "in", "not in"):
+            # Case-insensitive, as build_mask compares strings
+            lowered = val.lower()
+            matches = [key for key in keys if key.lower() == lowered]
+            if op == "=":
+                exact = self.bitmap(col, matches)
+                # build_mask falls back to a partial match when no remaining row matches exactly
+                if (exact if selected is None else exact & selected).count():
+                    return exact
+                try:
+                    pattern = re.compile(lowered)
+                except re.error:
+                    return None
+                return self.bitmap(col, [key for key in keys if pattern.search(key.lower())])
+            selected_values = self.bitmap(col, matches)
+            return self.all_rows() - selected_values if op in ("!=", "not in") else selected_values
+        if op == "eq" and isinstance(val, str):
+            return self.bitmap(col, [val] if val in keys else [])
+        if op in ("in", "not in") and isinstance(val, list) and all(isinstance(v, str) for v in val):
+            selected_values = self.bitmap(col, [v for v in val if v in keys])
+            return self.all_rows() - selected_values if op == "not in" else selected_values
+        return None
+
+    def evaluate(self, filters: Optional[dict]) -> Tuple[Optional[Bitmap], dict]:
+        """
+        (rows matching every filter the bitmaps can answer, or None when they
+        answer none; the filters left for a row scan).
+        apply_filters runs the filters in order and decides "=" against the
+        rows left at that point, so a string "=" is only answered here when
+        every earlier filter was, and once one is left for the row scan the
+        filters after it are left too.
+        """
+        result: Optional[Bitmap] = None
+        remaining = {}
+        for col, condition in (filters or {}).items():
+            matched = None
+            if self.covers(col) and isinstance(condition, dict):
+                blocked = any(_order_sensitive(c) for c in remaining.values()) or (
+                    _order_sensitive(condition) and remaining)
+                if not blocked:
+                    matched = self._matching(col, condition.get("op"), condition.get("value"), result)
+            if matched is None:
+                remaining[col] = condition
+            else:
+                result = matched if result is None else result & matched
+        return result, remaining
+
+    def group_counts(self, col: str, rows: Optional[Bitmap]) -> pd.DataFrame:
+        """
+        Row count per value of `col` among `rows` (all rows if None), by
+        popcount of each value's bitmap AND the selection; empty groups and
+        missing values are left out, as groupby does.
+        """
+        counts = []
+        for value in self.values(col):
+            if value in ("nan", "None", "<NA>"):
+                continue
+            selected = self.bitmap(col, [value])
+            n = (selected if rows is None else selected & rows).count()
+            if n:
+                counts.append((value, n))
+        return pd.DataFrame(counts, columns=[col, "count"])
+
+
+def read_rows(processed_path: str, positions: np.ndarray, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Rows at `positions` (ascending) of the processed file. Only the row groups
+    holding them are read.
+    """
+    parquet = pq.ParquetFile(processed_path)
+    offsets = np.cumsum([0] + [parquet.metadata.row_group(i).num_rows for i in range(parquet.num_row_groups)])
+    groups = np.searchsorted(offsets, positions, side="right") - 1
+    tables = []
+    nbytes = 0
+    for row_group in np.unique(groups):
+        rows = positions[groups == row_group] - offsets[row_group]
+        table = parquet.read_row_group(int(row_group), columns=columns)
+        tables.append(table.take(pa.array(rows)))
+        nbytes += parquet.metadata.row_group(int(row_group)).total_byte_size
+    if not tables:
+        return parquet.schema_arrow.empty_table().select(columns or parquet.schema_arrow.names).to_pandas()
+    df = pa.concat_tables(tables).to_pandas()
+    record_scan("bitmaps", len(df), nbytes)
+    return df
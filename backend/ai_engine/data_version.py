@@ -0,0 +1,351 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .bitmaps import BitmapIndex
+from .facets import compute_facets, FACET_COLUMNS, QUANTITY_COLUMNS, STATUS_COL
+from .metrics import record_cache
+from .order_index import OrderIndex
+from .partitions import PartitionIndex, get_partition_index
+from .rollups import Rollups
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+LEGACY = "legacy"
+POLL_INTERVAL_S = 2.0
+
+
+class DataVersion:
+    """
+    One published ETL output (data/versions/v<N>/) or the legacy data/ folder.
+    Warming preloads the summary, facet counts, rollups and bitmaps, discovers
+    partitions and reads parquet footers so the first request after a swap
+    doesn't pay for it.
+    """
+
+    def __init__(self, name: str, root: str):
+        self.name = name
+        self.root = root
+        self.processed_path = os.path.join(root, "processed", "SO_Order_Ageing.parquet")
+        self.summary_path = os.path.join(root, "transformed", "summary.parquet")
+        self.facets_path = os.path.join(root, "transformed", "facets.parquet")
+        self.order_index_path = os.path.join(root, "transformed", "order_index.parquet")
+        self.rollups_path = os.path.join(root, "transformed", "rollups.parquet")
+        self.sample_path = os.path.join(root, "transformed", "sample.parquet")
+        self.bitmaps_path = os.path.join(root, "transformed", "bitmaps.parquet")
+        self.partitioned_dir = os.path.join(root, "transformed", "partitioned")
+        self.manifest_path = os.path.join(root, "transformed", "manifest.json")
+
+        self.manifest: dict = {}
+        self.summary_df: Optional[pd.DataFrame] = None
+        self._partition_index: Optional[PartitionIndex] = None
+        self._facets: Optional[tuple] = None
+        self._order_index: Optional[tuple] = None
+        self._rollups: Optional[tuple] = None
+        self._sample: Optional[tuple] = None
+        self._bitmaps: Optional[tuple] = None
+        self._modified_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._retired = False
+        self.released = False
+
+    @property
+    def dataset_version(self) -> int:
+        return int(self.manifest.get("dataset_version", 0))
+
+    @property
+    def partition_index(self) -> PartitionIndex:
+        # Published versions are immutable; the legacy folder is rewritten in place
+        if self.name == LEGACY:
+            return get_partition_index(self.partitioned_dir)
+        if self._partition_index is None:
+            self._partition_index = PartitionIndex(self.partitioned_dir)
+        return self._partition_index
+
+    def modified_at(self) -> float:
+        """
+        Newest mtime of the manifest, summary and processed file, for HTTP
+        validators. Published versions never change, so it is read once;
+        the legacy folder is rewritten in place and is re-checked.
+        """
+        if self._modified_at is not None and self.name != LEGACY:
+            return self._modified_at
+        paths = (self.manifest_path, self.summary_path, self.processed_path)
+        self._modified_at = max((os.path.getmtime(p) for p in paths if os.path.exists(p)), default=0.0)
+        return self._modified_at
+
+    def get_summary(self) -> pd.DataFrame:
+        if self.name == LEGACY or self.summary_df is None:
+            record_cache("summary", False)
+            return pd.read_parquet(self.summary_path)
+        record_cache("summary", True)
+        return self.summary_df
+
+    def get_facets(self) -> pd.DataFrame:
+        """
+        Facet counts written by the ETL (transformed/facets.parquet). Data
+        written before facets existed gets them computed from the processed
+        file on first use. Kept until the source file changes.
+        """
+        source = self.facets_path if os.path.exists(self.facets_path) else self.processed_path
+        signature = (source, os.path.getmtime(source) if os.path.exists(source) else None)
+        cached = self._facets
+        if cached is not None and cached[0] == signature:
+            record_cache("facets", True)
+            return cached[1]
+        record_cache("facets", False)
+        if source == self.facets_path:
+            facets = pd.read_parquet(source)
+        elif os.path.exists(source):
+            stored = set(pq.read_schema(source).names)
+            wanted = [c for c in [STATUS_COL] + FACET_COLUMNS + QUANTITY_COLUMNS if c in stored]
+            facets = compute_facets(pd.read_parquet(source, columns=wanted))
+        else:
+            facets = compute_facets(pd.DataFrame())
+        self._facets = (signature, facets)
+        return facets
+
+    def get_order_index(self) -> OrderIndex:
+        """
+        Orderkey / Set Barcode index into the processed file (built by the
+        ETL, or from the processed file when missing or stale).
+        """
+        signature = tuple(os.path.getmtime(p) if os.path.exists(p) else None
+                          for p in (self.order_index_path, self.processed_path))
+        cached = self._order_index
+        if cached is not None and cached[0] == signature:
+            record_cache("order_index", True)
+            return cached[1]
+        record_cache("order_index", False)
+        index = OrderIndex.load(self.order_index_path, self.processed_path)
+        self._order_index = (signature, index)
+        return index
+
+    def get_bitmaps(self) -> BitmapIndex:
+        """
+        Bitmap index over the processed file's low-cardinality dimensions
+        (built by the ETL, or from the processed file when missing or stale).
+        """
+        signature = tuple(os.path.getmtime(p) if os.path.exists(p) else None
+                          for p in (self.bitmaps_path, self.processed_path))
+        cached = self._bitmaps
+        if cached is not None and cached[0] == signature:
+            record_cache("bitmaps", True)
+            return cached[1]
+        record_cache("bitmaps", False)
+        index = BitmapIndex.load(self.bitmaps_path, self.processed_path)
+        self._bitmaps = (signature, index)
+        return index
+
+    def get_rollups(self) -> Rollups:
+        """
+        Drill-down rollups written by the ETL (transformed/rollups.parquet),
+        computed from the processed file for data written before them.
+        Kept until the source file changes.
+        """
+        source = self.rollups_path if os.path.exists(self.rollups_path) else self.processed_path
+        signature = (source, os.path.getmtime(source) if os.path.exists(source) else None)
+        cached = self._rollups
+        if cached is not None and cached[0] == signature:
+            record_cache("rollups", True)
+            return cached[1]
+        record_cache("rollups", False)
+        rollups = Rollups.load(self.rollups_path, self.processed_path)
+        self._rollups = (signature, rollups)
+        return rollups
+
+    def get_sample(self) -> Optional[pd.DataFrame]:
+        """
+        Stratified sample written by the ETL (transformed/sample.parquet) for
+        approximate answers; None when this version has none.
+        """
+        signature = os.path.getmtime(self.sample_path) if os.path.exists(self.sample_path) else None
+        cached = self._sample
+        if cached is not None and cached[0] == signature:
+            record_cache("sample", True)
+            return cached[1]
+        record_cache("sample", False)
+        sample = pd.read_parquet(self.sample_path) if signature is not None else None
+        self._sample = (signature, sample)
+        return sample
+
+    def warm(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        if os.path.exists(self.summary_path):
+            self.summary_df = pd.read_parquet(self.summary_path)
+        if os.path.exists(self.facets_path):
+            self.get_facets()
+        if os.path.exists(self.rollups_path):
+            self.get_rollups()
+        if os.path.exists(self.bitmaps_path):
+            self.get_bitmaps()
+        index = self.partition_index
+        for path in [self.processed_path] + [p.path for p in index.partitions]:
+            if os.path.exists(path):
+                pq.read_metadata(path)
+        return self
+
+    # ---- reference counting for in-flight requests ----
+
+    def _enter(self) -> bool:
+        with self._lock:
+            if self.released:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _exit(self):
+        with self._lock:
+            self._in_flight -= 1
+            release = self._retired and self._in_flight == 0
+        if release:
+            self._release()
+
+    def retire(self):
+        with self._lock:
+            self._retired = True
+            release = self._in_flight == 0
+        if release:
+            self._release()
+
+    def _release(self):
+        self.summary_df = None
+        self._partition_index = None
+        self._facets = None
+        self._order_index = None
+        self._rollups = None
+        self._sample = None
+        self._bitmaps = None
+        self.released = True
+        print(f"[data] released version {self.name}")
+
+
+_pinned: contextvars.ContextVar[Optional[DataVersion]] = contextvars.ContextVar("pinned_data_version", default=None)
+
+
+class VersionManager:
+    """
+    Tracks the 'CURRENT' pointer written by the ETL. A new version is loaded
+    and warmed in the background, then swapped in atomically; the old one is
+    released once the requests that pinned it have finished.
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        self.data_dir = data_dir
+        self._current: Optional[DataVersion] = None
+        self._swap_lock = threading.Lock()
+        self._loading = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _read_pointer(self) -> str:
+        path = os.path.join(self.data_dir, CURRENT_FILE)
+        try:
+            with open(path) as f:
+                name = f.read().strip()
+        except OSError:
+            return LEGACY
+        if name and os.path.isdir(os.path.join(self.data_dir, VERSIONS_DIR, name)):
+            return name
+        return LEGACY
+
+    def _build(self, name: str) -> DataVersion:
+        root = self.data_dir if name == LEGACY else os.path.join(self.data_dir, VERSIONS_DIR, name)
+        return DataVersion(name, root).warm()
+
+    def current(self) -> DataVersion:
+        if self._current is None:
+            with self._loading:
+                if self._current is None:
+                    self._current = self._build(self._read_pointer())
+        return self._current
+
+    def refresh(self) -> bool:
+        """
+        Load, warm and swap in the pointed-to version if it changed.
+        Returns True when a swap happened.
+        """
+        name = self._read_pointer()
+        if self._current is not None and self._current.name == name:
+            return False
+        with self._loading:
+            if self._current is not None and self._current.name == name:
+                return False
+            start = time.perf_counter()
+            new = self._build(name)
+            with self._swap_lock:
+                old, self._current = self._current, new
+            print(f"[data] swapped in version {name} ({time.perf_counter() - start:.2f}s warmup)")
+        if old is not None:
+            old.retire()
+        return True
+
+    def use_data_dir(self, data_dir: str):
+        """
+        Serve another data folder (benchmarks, local experiments). The current
+        version is retired like on a normal swap.
+        """
+        with self._loading:
+            self.data_dir = data_dir
+            new = self._build(self._read_pointer())
+            with self._swap_lock:
+                old, self._current = self._current, new
+        if old is not None:
+            old.retire()
+
+    @contextmanager
+    def acquire(self):
+        """
+        Pin the current version for the duration of a request, so every read
+        in it (and in the executor) sees one consistent dataset.
+        """
+        version = self.current()
+        # A swap may retire and release the version between the two calls
+        while not version._enter():
+            version = self.current()
+        token = _pinned.set(version)
+        try:
+            yield version
+        finally:
+            _pinned.reset(token)
+            version._exit()
+
+    def start_watcher(self, interval: float = POLL_INTERVAL_S):
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while not self._stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    # Keep serving the old version if the new one can't be loaded
+                    print(f"[data] failed to load new version: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="data-version-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+
+manager = VersionManager()
+
+
+def current_version() -> DataVersion:
+    """
+    The version pinned by the current request, or the latest one.
+    """
+    return _pinned.get() or manager.current()
@@ -1,62 +1,84 @@
-import pandas as pd
 import os
+import pandas as pd
+
+from .aggregates import STAT_OPERATIONS, compute_statistic
+from .bitmaps import BitmapIndex, read_rows
+from .filters import apply_filters
+from .data_version import current_version
+from .registry import registry
+from .schema import TREND_OPERATIONS
+from .trends import compute_trend
+
+def _reads_partitions(version, filters: dict | None) -> bool:
+    index = version.partition_index
+    return bool(filters) and any(index.is_partition_key(col) for col in filters)
 
-BASE_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+def load_dataset(name: str, filters: dict | None = None):
+    """
+    Loads a registered dataset (resident in memory while the budget allows).
+    For the row-level dataset, when `filters` touch a partition key, only the
+    matching partitions are read instead of the full processed file.
+    """
+    version = current_version()
+    if name == "processed" and _reads_partitions(version, filters):
+        index = version.partition_index
+        return index.read(index.prune(filters))
+    return registry.get(name)
 
-def load_dataset(name: str):
-    path = os.path.join(BASE_PATH, "processed", "SO_Order_Ageing.parquet")
-    return pd.read_parquet(path)
+def count_with_bitmaps(plan: dict, bitmaps: BitmapIndex) -> pd.DataFrame | None:
+    """
+    count, group_count and top/bottom-n by count answered by popcount alone,
+    when the bitmaps cover every filter (and the single group column).
+    None when the rows have to be read.
+    """
+    operation = plan["operation"]
+    counting = operation in ("count", "group_count") or (operation in ("top_n", "bottom_n") and not plan.get("metric"))
+    if not counting:
+        return None
+    rows, remaining = bitmaps.evaluate(plan.get("filters"))
+    if remaining:
+        return None
+    if operation == "count":
+        return pd.DataFrame({"count": [bitmaps.n_rows if rows is None else rows.count()]})
+
+    group_by = plan.get("group_by") or []
+    group_cols = [group_by] if isinstance(group_by, str) else list(group_by)
+    if len(group_cols) != 1 or not bitmaps.covers(group_cols[0]):
+        return None
+    counts = bitmaps.group_counts(group_cols[0], rows)
+    if operation == "group_count":
+        return counts
+    limit = plan.get("limit", plan.get("n", 5))
+    return counts.sort_values("count", ascending=operation == "bottom_n").head(limit)
 
 def execute_query_plan(plan: dict):
-    df = load_dataset(plan.get("dataset", "processed"))
+    if plan["operation"] in TREND_OPERATIONS:
+        # From the ETL's daily aggregate series; no snapshot is read
+        return compute_trend(plan)
 
-    # apply filters
+    version = current_version()
+    dataset = plan.get("dataset", "processed")
     filters = plan.get("filters", {})
-    if filters:
-        for col, condition in filters.items():
-            op = condition.get("op")
-            val = condition.get("value")
-            
-            # Helper for case-insensitive string comparison
-            def get_mask(df, col, op, val):
-                if isinstance(val, str) and op in ["=", "!=", "in", "not in"]:
-                    col_str = df[col].astype(str)
-                    if op in ["=", "eq"]: 
-                        exact = col_str.str.lower() == val.lower()
-                        if not exact.any():
-                            # Fallback to partial match if no exact match found
-                            return col_str.str.lower().str.contains(val.lower())
-                        return exact
-                    if op == "!=": return col_str.str.lower() != val.lower()
-                    if op == "in": 
-                        vals = [v.lower() for v in (val if isinstance(val, list) else [val])]
-                        return col_str.str.lower().isin(vals)
-                    if op == "not in":
-                        vals = [v.lower() for v in (val if isinstance(val, list) else [val])]
-                        return ~col_str.str.lower().isin(vals)
-                
-                # Standard comparisons (with numeric conversion safety)
-                target_val = val
-                is_num = pd.api.types.is_numeric_dtype(df[col])
-                if not isinstance(val, (int, float, list)) and is_num:
-                    try:
-                        target_val = float(val) if "." in str(val) else int(val)
-                    except:
-                        pass
-                
-                if op in ["=", "eq"]: return df[col] == target_val
-                if op == "!=": return df[col] != target_val
-                if op == ">": return df[col] > target_val
-                if op == "<": return df[col] < target_val
-                if op == ">=": return df[col] >= target_val
-                if op == "<=": return df[col] <= target_val
-                if op == "in": return df[col].isin(val if isinstance(val, list) else [val])
-                if op == "not in": return ~df[col].isin(val if isinstance(val, list) else [val])
-                return None
+    # Bitmaps index positions in the processed file, so they serve that dataset only
+    bitmaps = version.get_bitmaps() if dataset == "processed" and os.path.exists(version.processed_path) else None
+    if bitmaps is not None:
+        counted = count_with_bitmaps(plan, bitmaps)
+        if counted is not None:
+            return counted
 
-            mask = get_mask(df, col, op, val)
-            if mask is not None:
-                df = df[mask]
+    rows, remaining = bitmaps.evaluate(filters) if bitmaps is not None else (None, filters)
+    if rows is not None and not _reads_partitions(version, filters):
+        # Bitmap-selected rows of the processed file: taken from memory when it
+        # is resident, otherwise only their row groups are read
+        resident = registry.peek("processed")
+        positions = rows.positions()
+        df = resident.take(positions) if resident is not None else read_rows(version.processed_path, positions)
+        filters = remaining
+    else:
+        df = load_dataset(dataset, filters)
+
+    # apply filters
+    df = apply_filters(df, filters)
 
     if plan["operation"] == "sum":
         return pd.DataFrame({
@@ -66,13 +88,13 @@ def execute_query_plan(plan: dict):
         return pd.DataFrame({"count": [len(df)]})
 
     if plan["operation"] == "group_sum":
-        res = df.groupby(plan["group_by"])[plan["metric"]].sum()
+        res = df.groupby(plan["group_by"], observed=True)[plan["metric"]].sum()
         if isinstance(res, pd.Series):
             return res.reset_index()
         return res.reset_index()
     elif plan["operation"] == "group_count":
         return (
-            df.groupby(plan["group_by"])
+            df.groupby(plan["group_by"], observed=True)
             .size()
             .reset_index(name="count")
         )
@@ -83,16 +105,18 @@ def execute_query_plan(plan: dict):
         if "metric" in plan and plan["metric"]:
             # Summation Mode
             metric_col = plan["metric"]
-            agg = df.groupby(group_cols)[metric_col].sum().reset_index()
+            agg = df.groupby(group_cols, observed=True)[metric_col].sum().reset_index()
             sort_col = metric_col
         else:
             # Count Mode
-            agg = df.groupby(group_cols).size().reset_index(name="count")
+            agg = df.groupby(group_cols, observed=True).size().reset_index(name="count")
             sort_col = "count"
 
         ascending = (plan["operation"] == "bottom_n")
         limit = plan.get("limit", plan.get("n", 5))
         
         return agg.sort_values(sort_col, ascending=ascending).head(limit)
+    elif plan["operation"] in STAT_OPERATIONS:
+        return compute_statistic(df, plan)
 
     raise ValueError(f"Unsupported operation: {plan['operation']}")
@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+# Same layout as etl/facets.py writes to transformed/facets.parquet
+STATUS_COL = "Store Status"
+FACET_COLUMNS = ["Region", "Division", "Zone", "Warehouse", "Ageing_Group", "Month", "Seasonal Flag"]
+QUANTITY_COLUMNS = ["Open Qty Pcs", "Allocated Qty Pcs", "Picked Qty Pcs", "Unallocated Qty Pcs"]
+KEYS = [STATUS_COL, "Column", "Value"]
+
+
+def compute_facets(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Facet table (Store Status | Column | Value | Rows | quantity sums) for
+    row-level data, for versions written before the ETL produced facets and
+    for search-scoped requests. Rows without a status column count under ''.
+    """
+    quantity_cols = [col for col in QUANTITY_COLUMNS if col in df.columns]
+    quantities = df[quantity_cols].apply(pd.to_numeric, errors="coerce").fillna(0).astype("int64")
+    quantities["Rows"] = 1
+    status = df[STATUS_COL] if STATUS_COL in df.columns else pd.Series("", index=df.index)
+    frames = []
+    for col in [c for c in FACET_COLUMNS if c in df.columns]:
+        facet = quantities.groupby([status, df[col]], observed=True, dropna=False).sum()
+        facet.index.names = [STATUS_COL, "Value"]
+        facet = facet.reset_index()
+        facet[STATUS_COL] = facet[STATUS_COL].astype(str)
+        facet["Value"] = facet["Value"].astype(str)
+        facet.insert(1, "Column", col)
+        frames.append(facet[KEYS + ["Rows"] + quantity_cols])
+    if not frames:
+        return pd.DataFrame(columns=KEYS + ["Rows"] + quantity_cols)
+    return pd.concat(frames, ignore_index=True)
+
+
+def facet_counts(facets: pd.DataFrame, status: Optional[str] = None,
+                 columns: Optional[List[str]] = None) -> Dict[str, List[dict]]:
+    """
+    {column: [{"value", "rows", <quantity sums>}, ...]} ordered by row count,
+    summed over every status or scoped to one ('Grand Total' = all).
+    """
+    if status and status != "Grand Total":
+        facets = facets[facets[STATUS_COL] == status]
+    if columns:
+        facets = facets[facets["Column"].isin(columns)]
+    value_cols = [col for col in facets.columns if col not in KEYS]
+    totals = facets.groupby(["Column", "Value"], observed=True, sort=False)[value_cols].sum().reset_index()
+    totals = totals.sort_values(["Column", "Rows", "Value"], ascending=[True, False, True])
+
+    result: Dict[str, List[dict]] = {col: [] for col in (columns or FACET_COLUMNS) if col in set(facets["Column"])}
+    for col, group in totals.groupby("Column", sort=False):
+        records = group.drop(columns="Column").rename(columns={"Value": "value", "Rows": "rows"})
+        result[col] = records.to_dict(orient="records")
+    return result
+
+
+def common_values(facets: pd.DataFrame, columns: List[str], limit: int) -> Dict[str, List[str]]:
+    """
+    Most frequent values per column (by row count), for the planner prompt.
+    """
+    counts = facet_counts(facets, columns=columns)
+    return {col: [entry["value"] for entry in entries[:limit]] for col, entries in counts.items()}
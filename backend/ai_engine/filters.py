@@ -0,0 +1,55 @@
+import pandas as pd
+
+
+def build_mask(df: pd.DataFrame, col: str, op: str, val):
+    """
+    Boolean mask for one plan filter {"op": ..., "value": ...} on `col`.
+    String comparisons are case-insensitive; "=" falls back to a partial
+    match when nothing matches exactly. Returns None for unknown operators.
+    """
+    # Helper for case-insensitive string comparison
+    if isinstance(val, str) and op in ["=", "!=", "in", "not in"]:
+        col_str = df[col].astype(str)
+        if op in ["=", "eq"]: 
+            exact = col_str.str.lower() == val.lower()
+            if not exact.any():
+                # Fallback to partial match if no exact match found
+                return col_str.str.lower().str.contains(val.lower())
+            return exact
+        if op == "!=": return col_str.str.lower() != val.lower()
+        if op == "in": 
+            vals = [v.lower() for v in (val if isinstance(val, list) else [val])]
+            return col_str.str.lower().isin(vals)
+        if op == "not in":
+            vals = [v.lower() for v in (val if isinstance(val, list) else [val])]
+            return ~col_str.str.lower().isin(vals)
+    
+    # Standard comparisons (with numeric conversion safety)
+    target_val = val
+    is_num = pd.api.types.is_numeric_dtype(df[col])
+    if not isinstance(val, (int, float, list)) and is_num:
+        try:
+            target_val = float(val) if "." in str(val) else int(val)
+        except:
+            pass
+    
+    if op in ["=", "eq"]: return df[col] == target_val
+    if op == "!=": return df[col] != target_val
+    if op == ">": return df[col] > target_val
+    if op == "<": return df[col] < target_val
+    if op == ">=": return df[col] >= target_val
+    if op == "<=": return df[col] <= target_val
+    if op == "in": return df[col].isin(val if isinstance(val, list) else [val])
+    if op == "not in": return ~df[col].isin(val if isinstance(val, list) else [val])
+    return None
+
+
+def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    """
+    Applies plan filters one by one (AND semantics).
+    """
+    for col, condition in (filters or {}).items():
+        mask = build_mask(df, col, condition.get("op"), condition.get("value"))
+        if mask is not None:
+            df = df[mask]
+    return df
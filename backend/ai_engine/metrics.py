@@ -0,0 +1,229 @@
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# ===============================
+# METRIC TYPES
+# ===============================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = list(key) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (non-cumulative), then sum, count
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for i, bound in enumerate(self.buckets):
+                    cumulative += series[i]
+                    lines.append(f"{self.name}_bucket{_format_labels(key, {'le': repr(bound)})} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, {'le': '+Inf'})} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        update_cache_ratios()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+STAGE_LATENCY = registry.register(Histogram(
+    "so_stage_latency_seconds", "Latency of individual request stages (chat pipeline, /details)"))
+HTTP_LATENCY = registry.register(Histogram(
+    "so_http_request_duration_seconds", "End-to-end HTTP request latency"))
+CACHE_REQUESTS = registry.register(Counter(
+    "so_cache_requests_total", "Cache lookups by cache and result (hit/miss)"))
+CACHE_HIT_RATIO = registry.register(Gauge(
+    "so_cache_hit_ratio", "Hit ratio per cache since process start"))
+ROWS_SCANNED = registry.register(Counter(
+    "so_rows_scanned_total", "Rows materialized from parquet, by source"))
+BYTES_READ = registry.register(Counter(
+    "so_bytes_read_total", "Parquet bytes read from disk, by source"))
+
+
+# ===============================
+# RECORDING HELPERS
+# ===============================
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def update_cache_ratios():
+    totals: Dict[str, list] = {}
+    for key, value in list(CACHE_REQUESTS._values.items()):
+        labels = dict(key)
+        entry = totals.setdefault(labels["cache"], [0, 0])
+        entry[0 if labels["result"] == "hit" else 1] += value
+    for cache, (hits, misses) in totals.items():
+        if hits + misses:
+            CACHE_HIT_RATIO.set(hits / (hits + misses), cache=cache)
+
+
+def record_scan(source: str, rows: int, nbytes: int):
+    ROWS_SCANNED.inc(rows, source=source)
+    BYTES_READ.inc(nbytes, source=source)
+
+
+class Stopwatch:
+    """
+    Lap timer for a multi-stage request: each lap() records the time since the
+    previous lap as one stage of `path` and keeps it for the structured log.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.stages: Dict[str, float] = {}
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> float:
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        self.stages[stage] = round(self.stages.get(stage, 0) + elapsed, 6)
+        STAGE_LATENCY.observe(elapsed, path=self.path, stage=stage)
+        return elapsed
+
+    def skip(self):
+        # Exclude time spent outside any named stage
+        self._last = time.perf_counter()
+
+    def total(self) -> float:
+        return time.perf_counter() - self._start
+
+
+# ===============================
+# OFF-REQUEST-PATH LOGGING
+# ===============================
+
+DEBUG_LOG_PATH = "agent_debug.log"
+
+_log_queue: "queue.Queue" = queue.Queue(-1)
+_logger = logging.getLogger("so_order.agent_debug")
+_logger.propagate = False
+_logger.setLevel(logging.INFO)
+_logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    global _listener
+    if _listener is not None:
+        return
+    with _listener_lock:
+        if _listener is None:
+            handler = logging.FileHandler(DEBUG_LOG_PATH, delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _listener = logging.handlers.QueueListener(_log_queue, handler)
+            _listener.start()
+
+
+def log_event(event: dict):
+    """
+    Queue one JSON line for agent_debug.log; a background thread does the write.
+    """
+    _ensure_listener()
+    _logger.info(json.dumps(event, default=str))
+
+
+def flush_log():
+    """
+    Drain the queue (tests / shutdown).
+    """
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,96 @@
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .metrics import record_scan
+
+# Same layout as etl/order_index.py writes to transformed/order_index.parquet
+INDEX_KEYS = ["Orderkey", "Set Barcode"]
+ROWS_METADATA = b"processed_rows"
+BYTES_METADATA = b"processed_bytes"
+
+
+def _entries_from_parquet(processed_path: str) -> pd.DataFrame:
+    # Fallback for data written before the ETL produced an index
+    parquet = pq.ParquetFile(processed_path)
+    frames = []
+    for row_group in range(parquet.num_row_groups):
+        table = parquet.read_row_group(row_group, columns=INDEX_KEYS)
+        rows = np.arange(table.num_rows, dtype=np.int32)
+        for kind in INDEX_KEYS:
+            frames.append(pd.DataFrame({"Kind": kind, "Key": table[kind].to_pandas().astype(str),
+                                        "Row Group": np.int32(row_group), "Row": rows}))
+    if not frames:
+        return pd.DataFrame({"Kind": [], "Key": [], "Row Group": [], "Row": []})
+    return pd.concat(frames, ignore_index=True).sort_values(["Kind", "Key"], kind="stable")
+
+
+class OrderIndex:
+    """
+    Hash index from Orderkey / Set Barcode to (row group, row) positions in
+    the processed file. Entries are sorted by key, so each key maps (through
+    a hashed pandas Index) to one contiguous run of positions: a lookup is
+    O(1) and reading an order only touches the row groups holding its lines.
+    """
+
+    def __init__(self, entries: pd.DataFrame, processed_rows: int):
+        self.processed_rows = processed_rows
+        self._by_kind: Dict[str, Tuple[pd.Index, np.ndarray, np.ndarray, np.ndarray]] = {}
+        for kind, group in entries.groupby("Kind", observed=True, sort=False):
+            keys = group["Key"].to_numpy()
+            # Start of each run of equal keys (entries are sorted by key)
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=int)
+            ends = np.r_[starts[1:], len(keys)]
+            positions = np.stack([group["Row Group"].to_numpy(np.int32), group["Row"].to_numpy(np.int32)], axis=1)
+            self._by_kind[str(kind)] = (pd.Index(keys[starts]), starts, ends, positions)
+
+    @classmethod
+    def load(cls, index_path: str, processed_path: str) -> "OrderIndex":
+        """
+        The ETL's persisted index, or one built from the processed file when
+        the index is missing or was written for a different file.
+        """
+        processed_rows = pq.read_metadata(processed_path).num_rows
+        if os.path.exists(index_path):
+            table = pq.read_table(index_path)
+            metadata = table.schema.metadata or {}
+            written_for = (metadata.get(ROWS_METADATA), metadata.get(BYTES_METADATA))
+            if written_for == (str(processed_rows).encode(), str(os.path.getsize(processed_path)).encode()):
+                return cls(table.to_pandas(), processed_rows)
+            print(f"[data] order index at {index_path} is stale; rebuilding from the processed file")
+        return cls(_entries_from_parquet(processed_path), processed_rows)
+
+    def lookup(self, key: str, kind: str = "Orderkey") -> np.ndarray:
+        """
+        (row group, row) pairs of every line with this key, in file order.
+        """
+        entry = self._by_kind.get(kind)
+        if entry is None:
+            return np.empty((0, 2), dtype=np.int32)
+        keys, starts, ends, positions = entry
+        slot = keys.get_indexer([key])[0]
+        if slot < 0:
+            return np.empty((0, 2), dtype=np.int32)
+        return positions[starts[slot]:ends[slot]]
+
+    def read(self, processed_path: str, positions: np.ndarray, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Reads only the row groups holding `positions` and takes the rows.
+        """
+        parquet = pq.ParquetFile(processed_path)
+        tables = []
+        nbytes = 0
+        for row_group in np.unique(positions[:, 0]):
+            rows = positions[positions[:, 0] == row_group, 1]
+            table = parquet.read_row_group(int(row_group), columns=columns)
+            tables.append(table.take(pa.array(rows)))
+            nbytes += parquet.metadata.row_group(int(row_group)).total_byte_size
+        if not tables:
+            return pd.DataFrame(columns=columns or parquet.schema_arrow.names)
+        df = pa.concat_tables(tables).to_pandas()
+        record_scan("order_index", len(df), nbytes)
+        return df
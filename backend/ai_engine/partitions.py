@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional
+from urllib.parse import unquote
+
+import pandas as pd
+
+from .filters import build_mask
+from .metrics import record_cache, record_scan
+
+PARTITIONING_FILE = "_partitioning.json"
+DATA_FILE = "data.parquet"
+
+
+class Partition(NamedTuple):
+    values: Dict[str, object]
+    path: str
+
+
+def _parse_segment(segment: str):
+    # 'Store Status=New%20Store' -> ('Store Status', 'New Store')
+    if "=" not in segment:
+        return None
+    key, value = segment.split("=", 1)
+    return key, unquote(value)
+
+
+def _typed(values: List[str]) -> pd.Series:
+    # Folder names are strings; numeric keys (e.g. 'Ageing ') compare as numbers
+    series = pd.Series(values, dtype=object)
+    numeric = pd.to_numeric(series, errors="coerce")
+    return numeric if numeric.notna().all() and len(series) else series
+
+
+class PartitionIndex:
+    """
+    Discovers a hive-style partition tree (<key>=<value>/.../data.parquet) and
+    prunes it against plan filters before any parquet file is opened.
+    Shared by the /details reader and the query executor.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.keys: List[str] = []
+        self.columns: Optional[List[str]] = None
+        self.partitions: List[Partition] = []
+        self._discover()
+
+    def _discover(self):
+        descriptor = os.path.join(self.root, PARTITIONING_FILE)
+        if os.path.exists(descriptor):
+            with open(descriptor) as f:
+                meta = json.load(f)
+            self.keys = list(meta.get("keys", []))
+            self.columns = meta.get("columns")
+
+        if not os.path.isdir(self.root):
+            return
+
+        raw = []
+        for dirpath, _, files in os.walk(self.root):
+            if DATA_FILE not in files:
+                continue
+            rel = os.path.relpath(dirpath, self.root)
+            parsed = [_parse_segment(seg) for seg in rel.split(os.sep)]
+            if rel == "." or any(p is None for p in parsed):
+                continue
+            raw.append((dict(parsed), os.path.join(dirpath, DATA_FILE)))
+
+        # Older trees have no descriptor: infer keys from the folder names
+        if not self.keys and raw:
+            self.keys = list(raw[0][0].keys())
+
+        raw = [(values, path) for values, path in raw if list(values.keys()) == self.keys]
+        if not raw:
+            return
+
+        # Type the partition values once (per key) so numeric keys compare numerically
+        frame = pd.DataFrame({key: _typed([values[key] for values, _ in raw]) for key in self.keys})
+        for i, (_, path) in enumerate(raw):
+            self.partitions.append(Partition({key: frame[key].iloc[i] for key in self.keys}, path))
+        self._frame = frame
+
+    def is_partition_key(self, col: str) -> bool:
+        return col in self.keys
+
+    def prune(self, filters: Optional[dict] = None) -> List[Partition]:
+        """
+        Partitions that can contain rows matching `filters`
+        ({"Column": {"op": ..., "value": ...}}). Filters on non-key columns
+        don't prune. Uses the executor's own mask semantics (case-insensitive,
+        partial fallback) on the table of partition values.
+        """
+        if not self.partitions:
+            return []
+        selected = self._frame
+        for col, condition in (filters or {}).items():
+            if col not in self.keys or not isinstance(condition, dict):
+                continue
+            mask = build_mask(selected, col, condition.get("op"), condition.get("value"))
+            if mask is not None:
+                selected = selected[mask]
+        return [self.partitions[i] for i in selected.index]
+
+    def read(self, partitions: List[Partition], columns: Optional[List[str]] = None,
+             row_filters: Optional[list] = None) -> pd.DataFrame:
+        """
+        Reads the given partitions and restores the partition key columns.
+        `row_filters` (pyarrow filter tuples on stored columns) are pushed down
+        to the parquet reader so row-group statistics can skip data.
+        """
+        stored_columns = None
+        if columns is not None:
+            stored_columns = [c for c in columns if c not in self.keys]
+
+        frames = []
+        nbytes = 0
+        for part in partitions:
+            df = pd.read_parquet(part.path, engine="pyarrow", columns=stored_columns, filters=row_filters)
+            nbytes += os.path.getsize(part.path)
+            for key, value in part.values.items():
+                if columns is None or key in columns:
+                    df[key] = value
+            frames.append(df)
+
+        if not frames:
+            return pd.DataFrame(columns=columns or self.columns or [])
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        record_scan("partitions", len(df), nbytes)
+
+        order = columns or self.columns
+        if order:
+            df = df[[c for c in order if c in df.columns] + [c for c in df.columns if c not in order]]
+        return df
+
+
+_cache: Dict[str, tuple] = {}
+_cache_lock = threading.Lock()
+
+
+def _signature(root: str):
+    # The ETL rewrites the descriptor (and the manifest) on every run
+    stamps = []
+    for path in (os.path.join(root, PARTITIONING_FILE), os.path.join(root, "..", "manifest.json")):
+        stamps.append(os.path.getmtime(path) if os.path.exists(path) else None)
+    return tuple(stamps)
+
+
+def get_partition_index(root: str) -> PartitionIndex:
+    """
+    Cached PartitionIndex for `root`, rediscovered whenever the ETL output changes.
+    """
+    root = os.path.abspath(root)
+    signature = _signature(root)
+    with _cache_lock:
+        cached = _cache.get(root)
+        if cached and cached[0] == signature and cached[0] != (None, None):
+            record_cache("partition_index", True)
+            return cached[1]
+    record_cache("partition_index", False)
+    index = PartitionIndex(root)
+    with _cache_lock:
+        _cache[root] = (signature, index)
+    return index
@@ -0,0 +1,206 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import metrics
+from .data_version import DataVersion, current_version, manager
+from .schema import DATASETS
+from .singleflight import SingleFlight
+
+# ---------------------------
+# CONFIG
+# ---------------------------
+
+# Memory the resident datasets may hold together; least recently used ones are evicted beyond it
+MEMORY_BUDGET = int(float(os.environ.get("SO_DATASET_BUDGET_MB", "2048")) * 1024 * 1024)
+# Datasets never evicted (comma-separated names)
+PINNED = [name.strip() for name in os.environ.get("SO_PINNED_DATASETS", "transformed").split(",") if name.strip()]
+
+# Extra datasets, in the data folder: {"<name>": {"path": "...", "description": "...", "pin": false}}
+# Relative paths are resolved against the data folder.
+DATASETS_FILE = "datasets.json"
+
+# Outputs of the current data version, resolved per request
+BUILTIN = {
+    "processed": (DATASETS["processed"]["description"], lambda version: version.processed_path),
+    "transformed": (DATASETS["transformed"]["description"], lambda version: version.summary_path),
+}
+
+RESIDENT_BYTES = metrics.registry.register(metrics.Gauge(
+    "so_dataset_resident_bytes", "Memory held by resident datasets, by dataset"))
+EVICTIONS = metrics.registry.register(metrics.Counter(
+    "so_dataset_evictions_total", "Datasets evicted to stay under the memory budget, by dataset"))
+
+
+class UnknownDataset(ValueError):
+    pass
+
+
+class DatasetRegistry:
+    """
+    Named datasets that plans and /details can target: the current
+    version's processed file and summary, plus extracts registered in
+    data/datasets.json or with register() (per-warehouse files, earlier
+    snapshots). Loaded frames stay resident under a shared memory budget;
+    beyond it the least recently used unpinned ones are evicted and re-read
+    on their next use.
+    """
+
+    def __init__(self, budget_bytes: int = MEMORY_BUDGET, pinned=PINNED):
+        self.budget_bytes = budget_bytes
+        self._pinned = set(pinned)
+        self._registered: Dict[str, dict] = {}
+        self._configured: Tuple[Any, Dict[str, dict]] = (None, {})
+        # name -> ((path, mtime), frame, bytes), least recently used first
+        self._resident: "OrderedDict[str, Tuple[tuple, pd.DataFrame, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loads = SingleFlight("dataset_load")
+
+    # ---- catalogue ----
+
+    def _config(self) -> Dict[str, dict]:
+        path = os.path.join(manager.data_dir, DATASETS_FILE)
+        signature = (path, os.path.getmtime(path)) if os.path.exists(path) else None
+        cached_signature, specs = self._configured
+        if signature == cached_signature:
+            return specs
+        specs = {}
+        if signature is not None:
+            try:
+                with open(path) as f:
+                    entries = json.load(f)
+                for name, entry in entries.items():
+                    specs[name] = {"path": os.path.join(manager.data_dir, entry["path"]),
+                                   "description": entry.get("description", ""), "pin": bool(entry.get("pin"))}
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                print(f"[data] ignoring {path}: {e}")
+                specs = {}
+        self._configured = (signature, specs)
+        return specs
+
+    def specs(self, version: Optional[DataVersion] = None) -> Dict[str, dict]:
+        """
+        name -> {"path", "description", "pin"} for every dataset, builtins
+        resolved against `version` (default: the pinned or current one).
+        """
+        version = version or current_version()
+        specs = {name: {"path": resolve(version), "description": description, "pin": False}
+                 for name, (description, resolve) in BUILTIN.items()}
+        for name, spec in {**self._config(), **self._registered}.items():
+            specs[name] = dict(spec)
+        for name, spec in specs.items():
+            spec["pin"] = spec["pin"] or name in self._pinned
+        return specs
+
+    def names(self) -> Dict[str, str]:
+        return {name: spec["description"] for name, spec in self.specs().items()}
+
+    def register(self, name: str, path: str, description: str = "", pin: bool = False):
+        with self._lock:
+            self._registered[name] = {"path": path, "description": description, "pin": pin}
+
+    def pin(self, name: str, pinned: bool = True):
+        with self._lock:
+            if pinned:
+                self._pinned.add(name)
+            else:
+                self._pinned.discard(name)
+            self._evict()
+
+    def _spec(self, name: str) -> dict:
+        specs = self.specs()
+        if name not in specs:
+            raise UnknownDataset(f"Unknown dataset '{name}'. Available datasets: {sorted(specs)}")
+        return specs[name]
+
+    def modified_at(self, name: str) -> float:
+        path = self._spec(name)["path"]
+        return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+    # ---- residency ----
+
+    def get(self, name: str) -> pd.DataFrame:
+        """
+        The dataset as a DataFrame, from memory when resident. Shared by every
+        caller: treat it as read-only.
+        """
+        path = self._spec(name)["path"]
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Dataset '{name}' not found at {path}")
+        key = (path, os.path.getmtime(path))
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is not None and entry[0] == key:
+                self._resident.move_to_end(name)
+                metrics.record_cache("dataset", True)
+                return entry[1]
+        metrics.record_cache("dataset", False)
+
+        (df, nbytes), _ = self._loads.do(key, lambda: self._load(name, path))
+        with self._lock:
+            # A newer file replaces the older copy
+            self._resident[name] = (key, df, nbytes)
+            self._resident.move_to_end(name)
+            self._evict()
+        return df
+
+    def peek(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        The dataset if it is resident and current, without loading it.
+        """
+        path = self._spec(name)["path"]
+        key = (path, os.path.getmtime(path)) if os.path.exists(path) else None
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is None or entry[0] != key:
+                return None
+            self._resident.move_to_end(name)
+            return entry[1]
+
+    def _load(self, name: str, path: str) -> Tuple[pd.DataFrame, int]:
+        # Sized by the Arrow buffers rather than memory_usage(deep=True), which
+        # walks every string; dimensions load as categoricals, so the two are close
+        table = pq.read_table(path)
+        df = table.to_pandas()
+        metrics.record_scan(name, len(df), os.path.getsize(path))
+        return df, int(table.nbytes)
+
+    def _is_pinned(self, name: str) -> bool:
+        spec = self._registered.get(name) or self._configured[1].get(name)
+        return name in self._pinned or bool(spec and spec["pin"])
+
+    def _evict(self):
+        # Caller holds the lock. Oldest unpinned first; pinned datasets stay
+        # even if they alone exceed the budget.
+        total = sum(nbytes for _, _, nbytes in self._resident.values())
+        for name in list(self._resident):
+            if total <= self.budget_bytes:
+                break
+            if self._is_pinned(name):
+                continue
+            total -= self._resident.pop(name)[2]
+            EVICTIONS.inc(dataset=name)
+            RESIDENT_BYTES.set(0, dataset=name)
+        for name, (_, _, nbytes) in self._resident.items():
+            RESIDENT_BYTES.set(nbytes, dataset=name)
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(nbytes for _, _, nbytes in self._resident.values())
+
+    def snapshot(self) -> dict:
+        specs = self.specs()
+        with self._lock:
+            resident = {name: nbytes for name, (_, _, nbytes) in self._resident.items()}
+        datasets = {name: {"description": spec["description"], "path": spec["path"], "pinned": spec["pin"],
+                           "resident": name in resident, "resident_bytes": resident.get(name, 0)}
+                    for name, spec in specs.items()}
+        return {"budget_bytes": self.budget_bytes, "resident_bytes": sum(resident.values()), "datasets": datasets}
+
+
+registry = DatasetRegistry()
@@ -0,0 +1,103 @@
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .facets import QUANTITY_COLUMNS
+
+# Same layout as etl/rollups.py writes to transformed/rollups.parquet
+HIERARCHIES = {
+    "status": ["Store Status", "Zone", "Region", "Sitealias"],
+    "merchandise": ["Division", "Section", "Department"],
+}
+HIERARCHIES_METADATA = b"hierarchies"
+
+
+def encode_path(values) -> str:
+    return json.dumps([str(v) for v in values])
+
+
+def compute_rollups(df: pd.DataFrame, hierarchies: Dict[str, List[str]] = HIERARCHIES) -> pd.DataFrame:
+    """
+    Rollup table (Hierarchy | Parent | Value | Depth | Rows | quantity sums)
+    for row-level data, for versions written before the ETL produced rollups.
+    """
+    quantity_cols = [col for col in QUANTITY_COLUMNS if col in df.columns]
+    quantities = df[quantity_cols].apply(pd.to_numeric, errors="coerce").fillna(0).astype("int64")
+    quantities["Rows"] = 1
+    value_cols = ["Rows"] + quantity_cols
+    frames = []
+    for name, levels in hierarchies.items():
+        if not all(col in df.columns for col in levels):
+            continue
+        deepest = quantities.groupby([df[col] for col in levels], observed=True, dropna=False).sum()
+        deepest.index.names = levels
+        deepest = deepest.reset_index()
+        for col in levels:
+            deepest[col] = deepest[col].astype(str)
+        for depth in range(len(levels)):
+            level = deepest.groupby(levels[:depth + 1], sort=False)[value_cols].sum().reset_index()
+            parents = zip(*[level[col] for col in levels[:depth]]) if depth else ((),) * len(level)
+            frames.append(pd.DataFrame({
+                "Hierarchy": name,
+                "Parent": [encode_path(values) for values in parents],
+                "Value": level[levels[depth]],
+                "Depth": depth,
+                **{col: level[col] for col in value_cols},
+            }))
+    if not frames:
+        return pd.DataFrame(columns=["Hierarchy", "Parent", "Value", "Depth"] + value_cols)
+    order_col = "Open Qty Pcs" if "Open Qty Pcs" in quantity_cols else "Rows"
+    rollups = pd.concat(frames, ignore_index=True)
+    return rollups.sort_values(["Hierarchy", "Parent", order_col, "Value"],
+                               ascending=[True, True, False, True]).reset_index(drop=True)
+
+
+class Rollups:
+    """
+    Drill-down rollups indexed by (hierarchy, parent path). Rows are sorted
+    by that key, so the children of any node are one contiguous slice found
+    through a hashed pandas Index: expanding a node is an O(1) lookup plus a
+    slice of a few rows, never a scan.
+    """
+
+    def __init__(self, table: pd.DataFrame, hierarchies: Dict[str, List[str]]):
+        self.hierarchies = {name: levels for name, levels in hierarchies.items()
+                            if name in set(table["Hierarchy"])}
+        self._table = table.drop(columns=["Hierarchy", "Parent", "Depth"]).reset_index(drop=True)
+        keys = (table["Hierarchy"].astype(str) + "\x00" + table["Parent"].astype(str)).to_numpy()
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.array([], dtype=int)
+        self._starts = starts
+        self._ends = np.r_[starts[1:], len(keys)]
+        self._keys = pd.Index(keys[starts])
+
+    @classmethod
+    def load(cls, rollups_path: str, processed_path: str) -> "Rollups":
+        """
+        The ETL's rollups, or ones computed from the processed file (default
+        hierarchies) when the file is missing.
+        """
+        if os.path.exists(rollups_path):
+            table = pq.read_table(rollups_path)
+            metadata = table.schema.metadata or {}
+            hierarchies = json.loads(metadata[HIERARCHIES_METADATA]) if HIERARCHIES_METADATA in metadata else HIERARCHIES
+            return cls(table.to_pandas(), hierarchies)
+        if not os.path.exists(processed_path):
+            return cls(compute_rollups(pd.DataFrame()), HIERARCHIES)
+        stored = set(pq.read_schema(processed_path).names)
+        wanted = {col for levels in HIERARCHIES.values() for col in levels} | set(QUANTITY_COLUMNS)
+        df = pd.read_parquet(processed_path, columns=[col for col in wanted if col in stored])
+        return cls(compute_rollups(df), HIERARCHIES)
+
+    def children(self, hierarchy: str, path: List[str]) -> Optional[pd.DataFrame]:
+        """
+        Nodes one level below `path` (top level for an empty path), largest
+        open quantity first; None when the path doesn't exist.
+        """
+        slot = self._keys.get_indexer([f"{hierarchy}\x00{encode_path(path)}"])[0]
+        if slot < 0:
+            return None
+        return self._table.iloc[self._starts[slot]:self._ends[slot]]
@@ -7,6 +7,9 @@ from typing import Dict, List, Any
 # DATASET REGISTRY
 # ===============================
 
+# Built-in datasets (paths inside the current data version); more are
+# registered at runtime, see registry.py
+
 DATASETS = {
     "processed": {
         "path": "data/processed/SO_Order_Ageing.parquet",
@@ -31,9 +34,25 @@ ALLOWED_OPERATIONS = {
     "top_n",
     "top_n",
     "bottom_n",
+    "avg",
+    "min",
+    "max",
+    "percentile",
+    "nunique",
+    "histogram",
+    "trend",
     "chat"
 }
 
+# Operations that need a "metric" column (histogram defaults to 'Ageing ')
+METRIC_OPERATIONS = {"avg", "min", "max", "percentile", "nunique"}
+MAX_HISTOGRAM_BINS = 50
+
+# Answered from the daily snapshot series (see trends.py)
+TREND_OPERATIONS = {"trend"}
+TREND_PERIODS = {"day", "week", "month"}
+MAX_TREND_DAYS = 730
+
 
 # ===============================
 # ALLOWED FILTER OPERATORS
@@ -58,19 +77,22 @@ ALLOWED_FILTER_OPERATORS = {
 
 def validate_query_plan(
     plan: Dict[str, Any],
-    available_columns: List[str]
+    available_columns: List[str],
+    datasets: Dict[str, Any] | None = None
 ) -> None:
     """
-    Validates an LLM-generated query plan.
+    Validates an LLM-generated query plan against `datasets` (the registered
+    dataset names; DATASETS by default).
     Raises ValueError if anything is invalid.
     """
 
     # ---------- Dataset ----------
+    datasets = DATASETS if datasets is None else datasets
     dataset = plan.get("dataset")
-    if dataset not in DATASETS:
+    if dataset not in datasets:
         raise ValueError(
             f"Invalid dataset '{dataset}'. "
-            f"Allowed datasets: {list(DATASETS.keys())}"
+            f"Allowed datasets: {list(datasets.keys())}"
         )
 
     # ---------- Operation ----------
@@ -90,6 +112,40 @@ def validate_query_plan(
                 f"Available columns: {available_columns}"
             )
 
+    if operation in METRIC_OPERATIONS and not metric:
+        raise ValueError(f"Operation '{operation}' needs a 'metric' column")
+
+    # ---------- Percentile ----------
+    if operation == "percentile":
+        q = plan.get("percentile", 50)
+        if isinstance(q, bool) or not isinstance(q, (int, float)) or not 0 <= q <= 100:
+            raise ValueError("percentile must be a number between 0 and 100")
+
+    # ---------- Histogram Bins ----------
+    bins = plan.get("bins")
+    if operation == "histogram" and bins is not None:
+        if isinstance(bins, int) and not isinstance(bins, bool):
+            if not 1 <= bins <= MAX_HISTOGRAM_BINS:
+                raise ValueError(f"bins must be between 1 and {MAX_HISTOGRAM_BINS}")
+        elif isinstance(bins, list):
+            if not 2 <= len(bins) <= MAX_HISTOGRAM_BINS + 1:
+                raise ValueError(f"bins must list between 2 and {MAX_HISTOGRAM_BINS + 1} edges")
+            if not all(isinstance(b, (int, float)) and not isinstance(b, bool) for b in bins):
+                raise ValueError("bins edges must be numbers")
+            if any(low >= high for low, high in zip(bins, bins[1:])):
+                raise ValueError("bins edges must be strictly increasing")
+        else:
+            raise ValueError("bins must be a number of bins or a list of edges")
+
+    # ---------- Trend Window ----------
+    if operation in TREND_OPERATIONS:
+        if plan.get("period", "day") not in TREND_PERIODS:
+            raise ValueError(f"period must be one of {sorted(TREND_PERIODS)}")
+        days = plan.get("days")
+        if days is not None:
+            if isinstance(days, bool) or not isinstance(days, int) or not 1 <= days <= MAX_TREND_DAYS:
+                raise ValueError(f"days must be a whole number of days between 1 and {MAX_TREND_DAYS}")
+
     # ---------- Group By ----------
     group_by = plan.get("group_by", [])
     if group_by:
@@ -0,0 +1,78 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from fastapi import HTTPException
+
+from .metrics import registry, Counter
+
+COALESCED = registry.register(Counter(
+    "so_coalesced_requests_total", "Requests that shared another request's in-flight computation, by flight"))
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+def _copy_error(error: BaseException) -> BaseException | None:
+    """
+    A fresh copy of `error` for one waiter, or None when it can't be rebuilt.
+    """
+    if isinstance(error, HTTPException):
+        # Rebuilt from its fields: depending on the version, its args are empty
+        return HTTPException(error.status_code, error.detail, error.headers)
+    try:
+        return type(error)(*error.args)
+    except Exception:
+        return None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical work: while a computation for `key` is in
+    flight, further callers with the same key wait for it and get its result
+    (or a copy of its exception) instead of running their own. Nothing is kept after the
+    computation finishes, so this never serves stale results.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Returns (result, shared); `shared` is True when the result came from
+        another caller's computation. The same object goes to every caller,
+        so treat results as read-only.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            COALESCED.inc(flight=self.name)
+            call.done.wait()
+            if call.error is not None:
+                # A fresh exception per waiter, chained to the leader's, so
+                # concurrent re-raises don't pile tracebacks onto one object
+                error = _copy_error(call.error)
+                if error is None:
+                    raise call.error
+                raise error from call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
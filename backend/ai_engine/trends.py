@@ -0,0 +1,134 @@
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .data_version import manager
+from .filters import apply_filters
+from .metrics import record_cache, record_scan
+
+# Same layout as etl/snapshots.py writes to data/snapshots/trends.parquet
+SNAPSHOTS_DIR = "snapshots"
+TRENDS_FILE = "trends.parquet"
+TREND_DIMENSIONS = ["Store Status", "Region", "Zone", "Division", "Warehouse", "Ageing_Group"]
+TREND_MAX_DIMENSIONS = 2
+AGEING_COL = "Ageing "
+
+# Days looked back when the plan gives none
+DEFAULT_DAYS = {"day": 30, "week": 91, "month": 365}
+TREND_GROUP_LIMIT = 10
+DATE_COL = "Date"
+
+
+def trends_path() -> str:
+    # Shared by every data version, so it lives next to them rather than inside one
+    return os.path.join(manager.data_dir, SNAPSHOTS_DIR, TRENDS_FILE)
+
+
+_series: Tuple[Any, Optional[pd.DataFrame]] = (None, None)
+_series_lock = threading.Lock()
+
+
+def load_series() -> pd.DataFrame:
+    """
+    The ETL's daily aggregate series (a few thousand rows per day), cached
+    until the file changes.
+    """
+    global _series
+    path = trends_path()
+    if not os.path.exists(path):
+        raise ValueError("No daily snapshots yet: trends need the ETL to have run on at least one day")
+    signature = (path, os.path.getmtime(path))
+    with _series_lock:
+        cached_signature, series = _series
+        if cached_signature == signature:
+            record_cache("trends", True)
+            return series
+    record_cache("trends", False)
+    series = pd.read_parquet(path)
+    record_scan("trends", len(series), os.path.getsize(path))
+    with _series_lock:
+        _series = (signature, series)
+    return series
+
+
+def _value_column(metric: Optional[str]) -> str:
+    if not metric:
+        return "count"
+    if metric == AGEING_COL:
+        return "Ageing (avg)"
+    return metric
+
+
+def _period_ends(dates: pd.Series, period: str) -> pd.Series:
+    # Quantities are stock levels, not flows: a week or month is its last snapshot
+    if period == "day":
+        return dates
+    periods = pd.to_datetime(dates).dt.to_period("W" if period == "week" else "M")
+    return dates.groupby(periods).transform("max")
+
+
+def compute_trend(plan: Dict[str, Any], series: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """
+    Daily (or weekly / monthly) series of a quantity sum, the row count or
+    the average ageing over the last `days` snapshots, optionally per one
+    `group_by` dimension, with the change from the previous point. Answered
+    from the ETL's pre-aggregated series of the grouping that covers the
+    filtered and grouped dimensions; no snapshot rows are read.
+    """
+    series = load_series() if series is None else series
+    filters = plan.get("filters") or {}
+    group_by = plan.get("group_by") or []
+    group_cols = [group_by] if isinstance(group_by, str) else list(group_by)
+    if len(group_cols) > 1:
+        raise ValueError("A trend can be broken down by one column only")
+
+    dims = set(filters) | set(group_cols)
+    unknown = sorted(dims - set(TREND_DIMENSIONS))
+    if unknown:
+        raise ValueError(f"Trends are recorded per {TREND_DIMENSIONS} only, not {unknown}")
+    if len(dims) > TREND_MAX_DIMENSIONS:
+        raise ValueError(f"A trend can combine at most {TREND_MAX_DIMENSIONS} of {TREND_DIMENSIONS}")
+
+    metric = plan.get("metric")
+    if metric and metric not in series.columns:
+        metrics = [col for col in series.columns if col not in TREND_DIMENSIONS + [DATE_COL, "Grouping", "Rows"]]
+        raise ValueError(f"No daily series for '{metric}'. Trend metrics: {metrics}")
+    period = plan.get("period", "day")
+    days = plan.get("days", DEFAULT_DAYS[period])
+
+    grouping = ",".join(col for col in TREND_DIMENSIONS if col in dims)
+    rows = series[series["Grouping"] == grouping]
+    all_dates = sorted(series.loc[series["Grouping"] == "", DATE_COL].unique())
+    if not all_dates:
+        return pd.DataFrame(columns=[DATE_COL] + group_cols + [_value_column(metric), "Change", "Change %"])
+    start = (pd.Timestamp(all_dates[-1]) - pd.Timedelta(days=days - 1)).date().isoformat()
+    dates = [date for date in all_dates if date >= start]
+    rows = apply_filters(rows[rows[DATE_COL] >= start], filters)
+
+    sum_cols = ["Rows"] + ([metric] if metric else [])
+    keys = [DATE_COL] + group_cols
+    totals = rows.groupby(keys)[sum_cols].sum()
+    # A group with no rows on a day has nothing open: zero, not a gap
+    groups = sorted(rows[group_cols[0]].dropna().unique()) if group_cols else [None]
+    index = pd.MultiIndex.from_product([dates, groups], names=keys) if group_cols else pd.Index(dates, name=DATE_COL)
+    totals = totals.reindex(index, fill_value=0).reset_index()
+
+    value = _value_column(metric)
+    if metric == AGEING_COL:
+        totals[value] = (totals[metric] / totals["Rows"].where(totals["Rows"] > 0)).round(1)
+    else:
+        totals[value] = totals[metric] if metric else totals["Rows"]
+    totals = totals[totals[DATE_COL] == _period_ends(totals[DATE_COL], period)]
+
+    if group_cols:
+        # Largest groups at the latest point
+        latest = totals[totals[DATE_COL] == totals[DATE_COL].max()]
+        top = latest.sort_values(value, ascending=False)[group_cols[0]].head(plan.get("limit", TREND_GROUP_LIMIT))
+        totals = totals[totals[group_cols[0]].isin(top)].sort_values(group_cols + [DATE_COL])
+    result = totals[keys + [value]].reset_index(drop=True)
+    previous = result.groupby(group_cols)[value].shift() if group_cols else result[value].shift()
+    result["Change"] = result[value] - previous
+    result["Change %"] = (result["Change"] / previous.where(previous != 0) * 100).round(1)
+    return result
@@ -0,0 +1,184 @@
+import email.utils
+import gzip
+import hashlib
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from backend.ai_engine import metrics
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# ---------------------------
+# CONFIG
+# ---------------------------
+
+# Responses smaller than this are sent as-is; compressing them costs more than it saves
+MIN_COMPRESS_BYTES = int(os.environ.get("SO_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+# Larger bodies are compressed in the threadpool instead of on the event loop
+THREADPOOL_BYTES = 256 * 1024
+
+# Cache-Control per endpoint. Summary-level data may be reused briefly
+# without asking; row-level pages are always revalidated, which costs a
+# 304 with no body while the data version is unchanged.
+POLICIES = {
+    "summary": "public, max-age=15",
+    "facets": "public, max-age=60",
+    "hierarchies": "public, max-age=60",
+    "drilldown": "public, max-age=60",
+    "details": "private, no-cache",
+    "orders": "private, no-cache",
+}
+
+COMPRESSED_BYTES = metrics.registry.register(metrics.Counter(
+    "so_http_compressed_bytes_total", "Response bytes before (raw) and after (sent) compression, by encoding"))
+
+
+# ---------------------------
+# CONDITIONAL REQUESTS
+# ---------------------------
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2): the W/ prefix is ignored
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def conditional(request: Request, response: Response, version, endpoint: str,
+                modified: Optional[float] = None) -> Optional[Response]:
+    """
+    Sets ETag, Last-Modified and Cache-Control for a GET on `version`. The
+    ETag hashes the data version and the request path and query, so it is
+    known before any data is read: returns a 304 response when the client's
+    copy is current (the handler returns it as-is), None otherwise.
+    ETags are weak because the body may be sent gzip/brotli encoded.
+    `modified` overrides the version's modification time (for data that
+    changes on its own, like registered extracts).
+    """
+    modified = version.modified_at() if modified is None else modified
+    key = f"{version.name}:{modified:.6f}:{request.url.path}?{request.url.query}"
+    headers = {
+        "ETag": f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"',
+        "Last-Modified": email.utils.formatdate(modified, usegmt=True),
+        "Cache-Control": POLICIES[endpoint],
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, headers["ETag"])
+    else:
+        since = request.headers.get("if-modified-since")
+        try:
+            fresh = since is not None and int(modified) <= email.utils.parsedate_to_datetime(since).timestamp()
+        except (TypeError, ValueError):
+            fresh = False
+
+    metrics.record_cache(f"http_{endpoint}", fresh)
+    if fresh:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+# ---------------------------
+# COMPRESSION
+# ---------------------------
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    'br' when the client accepts it and brotli is installed, else 'gzip'
+    if accepted, else None. q=0 entries count as refused.
+    """
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        try:
+            q = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            q = 0.0
+        if q > 0:
+            accepted.add(coding.strip())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Compresses complete JSON/text responses of at least `minimum_size` bytes
+    with brotli or gzip, per the request's Accept-Encoding. Streamed bodies
+    (more than one chunk) pass through untouched so they aren't held back.
+    """
+
+    def __init__(self, app, minimum_size: int = MIN_COMPRESS_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        encoding = choose_encoding(headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held until the first body chunk shows whether it's complete
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            held, start = start, None
+            body = message.get("body", b"")
+            response_headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in held["headers"]}
+            content_type = response_headers.get("content-type", "")
+            if (message.get("more_body", False) or len(body) < self.minimum_size
+                    or "content-encoding" in response_headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                await send(held)
+                await send(message)
+                return
+
+            if len(body) >= THREADPOOL_BYTES:
+                compressed = await run_in_threadpool(compress, body, encoding)
+            else:
+                compressed = compress(body, encoding)
+            COMPRESSED_BYTES.inc(len(body), encoding=encoding, side="raw")
+            COMPRESSED_BYTES.inc(len(compressed), encoding=encoding, side="sent")
+            raw_headers = [(k, v) for k, v in held["headers"] if k.lower() not in (b"content-length", b"vary")]
+            vary = response_headers.get("vary")
+            raw_headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", (f"{vary}, Accept-Encoding" if vary else "Accept-Encoding").encode("latin-1")),
+            ]
+            await send({**held, "headers": raw_headers})
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,34 +1,68 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import List, Optional
+import json
 import os
 import sys
+import time
 import pandas as pd
 
 # Add project root to path so 'backend' module can be found
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import the clean agent
-from backend.ai_engine.agent import run_pandas_query
+# The chat agent (and langchain with it) is imported lazily, see load_agent()
+from backend.ai_engine.filters import apply_filters
+from backend.ai_engine.bitmaps import read_rows
+from backend.ai_engine.registry import UnknownDataset, registry as datasets
+from backend.ai_engine.data_version import manager as data_versions
+from backend.ai_engine import metrics
+from backend.ai_engine.singleflight import SingleFlight
+from backend.ai_engine.facets import FACET_COLUMNS, compute_facets, facet_counts
+from backend import admission
+from backend import http_cache
+from backend import profiling
+from backend import warmup
 
 print("\n*** SO ORDER BACKEND - REWRITTEN & VERIFIED ***\n")
 
 app = FastAPI()
 
+# Priority classes (interactive / chat / bulk) with their own concurrency and
+# queue budgets; inside CORS so shed responses still carry CORS headers
+app.add_middleware(admission.AdmissionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the validators and the shed Retry-After
+    expose_headers=["ETag", "Last-Modified", "Retry-After"],
 )
+# gzip / brotli for JSON payloads above a size threshold (details pages are MBs)
+app.add_middleware(http_cache.CompressionMiddleware)
 
-# Constants - paths relative to backend/ (where main.py is run from)
-DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
-SUMMARY_PATH = os.path.join(DATA_DIR, "transformed", "summary.parquet")
-PARTITIONED_DIR = os.path.join(DATA_DIR, "transformed", "partitioned")
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (/details/{status}), not the raw path
+    route = request.scope.get("route")
+    metrics.HTTP_LATENCY.observe(
+        time.perf_counter() - start,
+        route=getattr(route, "path", "unmatched"), method=request.method, status=response.status_code,
+    )
+    # Set by profiling.profile_request when the request was profiled
+    profile_id = getattr(request.state, "profile_id", None)
+    if profile_id:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
+# Data paths come from the current data version (see ai_engine/data_version.py):
+# data/versions/<CURRENT>/... once the ETL publishes, the legacy data/ folder before that.
 
 # Ensure static directory exists
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
@@ -49,75 +83,363 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     query: str
     history: List[ChatMessage] = []
+    # Answer sums/counts from the stratified sample first (with error bounds)
+    approximate: bool = False
+
+# ---------------------------
+# STARTUP
+# ---------------------------
+
+def load_agent():
+    """
+    The chat agent module. Importing it pulls in langchain, which takes
+    seconds, so it happens in the warmup thread or on the first /chat.
+    """
+    from backend.ai_engine import agent
+    return agent
+
+def ping_model():
+    agent = load_agent()
+    return warmup.ping_model(agent.MODEL, agent.KEEP_ALIVE)
+
+startup = warmup.Warmup([
+    ("data", lambda: warmup.warm_data(data_versions)),
+    ("indexes", lambda: warmup.warm_indexes(data_versions)),
+    ("datasets", lambda: warmup.warm_datasets(datasets)),
+    ("hot_partitions", lambda: warmup.warm_hot_partitions(data_versions)),
+    ("ai_stack", lambda: {"module": load_agent().__name__}),
+] + ([("model", ping_model)] if warmup.WARM_MODEL else []))
 
 # ---------------------------
 # ROUTES
 # ---------------------------
 
+@app.on_event("startup")
+def start_data_watcher():
+    # Pick up new ETL output without a restart
+    data_versions.start_watcher()
+    # Serve right away; data, indexes and the model warm up in the background
+    startup.start()
+
+@app.on_event("shutdown")
+def stop_data_watcher():
+    data_versions.stop_watcher()
+
 @app.get("/")
 def root():
-    return {"status": "OK", "service": "SO Order Ageing API"}
+    version = data_versions.current()
+    return {
+        "status": "OK",
+        "service": "SO Order Ageing API",
+        "data_version": version.name,
+        "dataset_version": version.dataset_version,
+    }
+
+@app.get("/ready")
+def ready():
+    """
+    Readiness probe: 200 once the data and indexes are warm, 503 before.
+    Reports each warmup component, and whether chat is warm too.
+    """
+    report = startup.report()
+    components = report["components"]
+    report["chat_ready"] = all(components.get(name, {}).get("state") == "ready" for name in ("ai_stack", "model") if name in components)
+    report["admission"] = admission.snapshot()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Prometheus text exposition: stage latency histograms, cache hit ratios,
+    rows scanned and bytes read.
+    """
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles")
+def list_profiles(request: Request):
+    """
+    Recent request profiles (opt-in via `X-Profile: 1` or `?profile=1`,
+    `cprofile` for a deterministic profile). Allowlisted clients only.
+    """
+    if not profiling.is_allowed(request):
+        raise HTTPException(status_code=403, detail="Profiling not allowed for this client")
+    return profiling.list_profiles()
+
+@app.get("/profiles/{profile_id}")
+def download_profile(profile_id: str, request: Request):
+    """
+    Download one profile: collapsed stacks (flamegraph.pl / speedscope) or pstats.
+    """
+    if not profiling.is_allowed(request):
+        raise HTTPException(status_code=403, detail="Profiling not allowed for this client")
+    meta = profiling.get_profile(profile_id)
+    if meta is None:
+        raise HTTPException(status_code=404, detail=f"Profile not found: {profile_id}")
+    return FileResponse(os.path.join(profiling.PROFILE_DIR, meta["file"]), filename=meta["file"])
+
+# Identical requests arriving together (dashboard opened by several users at once)
+# share one read instead of each doing it. Handlers are sync so they run in the
+# threadpool and can wait on each other.
+summary_flight = SingleFlight("summary")
+details_flight = SingleFlight("details")
+facets_flight = SingleFlight("facets")
+orders_flight = SingleFlight("orders")
+drilldown_flight = SingleFlight("drilldown")
+
+ORDER_KEY_KINDS = {"auto": ["Orderkey", "Set Barcode"], "orderkey": ["Orderkey"], "barcode": ["Set Barcode"]}
 
 @app.get("/summary")
-async def get_summary():
+def get_summary(request: Request, response: Response):
     """
     Serve pre-computed summary data.
     """
-    if not os.path.exists(SUMMARY_PATH):
-        raise HTTPException(status_code=500, detail=f"Summary file not found at {SUMMARY_PATH}")
+    with data_versions.acquire() as version:
+        not_modified = http_cache.conditional(request, response, version, "summary")
+        if not_modified:
+            return not_modified
+        result, _ = summary_flight.do(version.name, lambda: read_summary(version))
+        return result
+
+def read_summary(version):
+    if not os.path.exists(version.summary_path):
+        raise HTTPException(status_code=500, detail=f"Summary file not found at {version.summary_path}")
     
     try:
-        df = pd.read_parquet(SUMMARY_PATH)
+        df = version.get_summary()
         return df.to_dict(orient="records")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading summary: {str(e)}")
 
+@app.get("/facets")
+def get_facets(request: Request, response: Response, status: str = "Grand Total", columns: str = "", search: str = "", filters: str = ""):
+    """
+    Distinct values with row counts and quantity sums per filter column
+    (Region, Division, Zone, Warehouse, Ageing_Group, Month, Seasonal Flag),
+    optionally scoped to one Store Status. Served from the ETL's precomputed
+    facet table; `search` / `filters` scope it to matching rows instead
+    (computed from the rows, like a /details query).
+    """
+    wanted = [c.strip() for c in columns.split(",") if c.strip()] or FACET_COLUMNS
+    unknown = [c for c in wanted if c not in FACET_COLUMNS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facet column(s): {unknown}")
+
+    with data_versions.acquire() as version:
+        not_modified = http_cache.conditional(request, response, version, "facets")
+        if not_modified:
+            return not_modified
+        key = (version.name, status, tuple(wanted), search.strip(), filters)
+        result, _ = facets_flight.do(key, lambda: read_facets(version, status, wanted, search, filters))
+        return result
+
+def read_facets(version, status: str, columns: List[str], search: str, filters: str):
+    try:
+        if search.strip() or filters:
+            df = search_rows(load_rows(version, status, parse_filters(filters)), search)
+            facets = facet_counts(compute_facets(df), columns=columns)
+            total_rows = len(df)
+        else:
+            facets = facet_counts(version.get_facets(), status=status, columns=columns)
+            total_rows = sum(entry["rows"] for entry in next(iter(facets.values()), []))
+        return {"status": status, "total_rows": total_rows, "facets": facets}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing facets: {str(e)}")
+
+@app.get("/datasets")
+def get_datasets():
+    """
+    Registered datasets (targets of `dataset` in chat plans and /details)
+    with their residency: memory budget, resident bytes per dataset, pins.
+    """
+    with data_versions.acquire():
+        return datasets.snapshot()
+
+@app.get("/hierarchies")
+def get_hierarchies(request: Request, response: Response):
+    """
+    Drill-down hierarchies available in /drilldown: {name: [levels, top first]}.
+    """
+    with data_versions.acquire() as version:
+        not_modified = http_cache.conditional(request, response, version, "hierarchies")
+        if not_modified:
+            return not_modified
+        return version.get_rollups().hierarchies
+
+@app.get("/drilldown/{hierarchy}")
+def get_drilldown(request: Request, response: Response, hierarchy: str, path: List[str] = Query([])):
+    """
+    One level of a drill-down hierarchy (e.g. Store Status > Zone > Region >
+    Sitealias): the children of `path` (repeat `path` per level, empty for
+    the top level) with row counts and quantity sums. Served lazily from
+    the ETL's precomputed rollups, one indexed slice per expand.
+    """
+    with data_versions.acquire() as version:
+        not_modified = http_cache.conditional(request, response, version, "drilldown")
+        if not_modified:
+            return not_modified
+        key = (version.name, hierarchy, tuple(path))
+        result, _ = drilldown_flight.do(key, lambda: read_drilldown(version, hierarchy, path))
+        return result
+
+def read_drilldown(version, hierarchy: str, path: List[str]):
+    try:
+        rollups = version.get_rollups()
+        levels = rollups.hierarchies.get(hierarchy)
+        if levels is None:
+            raise HTTPException(status_code=404, detail=f"Unknown hierarchy: {hierarchy} (available: {list(rollups.hierarchies)})")
+        if len(path) >= len(levels):
+            raise HTTPException(status_code=400, detail=f"'{hierarchy}' has {len(levels)} levels; path is too deep")
+
+        children = rollups.children(hierarchy, path)
+        if children is None:
+            raise HTTPException(status_code=404, detail=f"Path not found in '{hierarchy}': {path}")
+        value_cols = [col for col in children.columns if col != "Value"]
+        records = children.rename(columns={"Value": "value", "Rows": "rows"}).to_dict(orient="records")
+        has_children = len(path) + 1 < len(levels)
+        for record in records:
+            record["has_children"] = has_children
+        return {
+            "hierarchy": hierarchy,
+            "levels": levels,
+            "path": path,
+            "level": levels[len(path)],
+            "total": {("rows" if col == "Rows" else col): int(children[col].sum()) for col in value_cols},
+            "children": records,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading drill-down: {str(e)}")
+
+@app.get("/orders/{orderkey}")
+def get_order(request: Request, response: Response, orderkey: str, by: str = "auto"):
+    """
+    All lines of one order, looked up by Orderkey (or by Set Barcode with
+    `by=barcode`; `auto` tries Orderkey first). Served from the order index:
+    only the row groups holding the order's lines are read.
+    """
+    if by not in ORDER_KEY_KINDS:
+        raise HTTPException(status_code=400, detail=f"by must be one of {list(ORDER_KEY_KINDS)}")
+    key = orderkey.strip()
+    with data_versions.acquire() as version:
+        not_modified = http_cache.conditional(request, response, version, "orders")
+        if not_modified:
+            return not_modified
+        result, _ = orders_flight.do((version.name, key, by), lambda: read_order(version, key, by))
+        return result
+
+def read_order(version, key: str, by: str):
+    if not os.path.exists(version.processed_path):
+        raise HTTPException(status_code=404, detail="Data file not found")
+    try:
+        index = version.get_order_index()
+        for kind in ORDER_KEY_KINDS[by]:
+            positions = index.lookup(key, kind)
+            if len(positions):
+                break
+        else:
+            raise HTTPException(status_code=404, detail=f"Order not found: {key}")
+
+        df = index.read(version.processed_path, positions)
+        lines = df.fillna("").to_dict(orient="records")
+        return {
+            "key": key,
+            "matched_on": kind,
+            "orderkey": str(df["Orderkey"].iloc[0]) if "Orderkey" in df.columns else key,
+            "total_lines": len(lines),
+            "lines": lines,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error reading order: {str(e)}")
+
+def parse_filters(filters: str) -> dict:
+    """
+    Parse the optional JSON `filters` query param, same shape as chat plan filters:
+    {"Region": {"op": "=", "value": "JHK1"}}.
+    """
+    if not filters:
+        return {}
+    try:
+        parsed = json.loads(filters)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="filters must be valid JSON")
+    if not isinstance(parsed, dict) or not all(isinstance(c, dict) for c in parsed.values()):
+        raise HTTPException(status_code=400, detail='filters must look like {"Column": {"op": "=", "value": "..."}}')
+    return parsed
+
 @app.get("/details/{status}")
-async def get_details(status: str, page: int = 1, page_size: int = 1000, search: str = ""):
+def get_details(request: Request, response: Response, status: str, page: int = 1, page_size: int = 1000, search: str = "", filters: str = "",
+                sort_by: str = "", sort_dir: str = "asc", dataset: str = "processed"):
     """
     Serve data for a specific Store Status from partitioned data with pagination.
+    Optional `filters` on partition keys (e.g. Region, Month, Warehouse) prune
+    partition folders before any file is read. `sort_by` / `sort_dir` sort the
+    rows before paging, so clients can page through a sorted view. `dataset`
+    reads another registered dataset (see /datasets) instead.
     """
+    with data_versions.acquire() as version:
+        try:
+            # Registered extracts change independently of the data version
+            modified = None if dataset == "processed" else max(version.modified_at(), datasets.modified_at(dataset))
+        except UnknownDataset as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        # Answered from the data version alone, before any partition is touched
+        not_modified = http_cache.conditional(request, response, version, "details", modified)
+        if not_modified:
+            return not_modified
+        with profiling.profile_request(request, "details"):
+            key = (version.name, dataset, status, page, page_size, search, filters, sort_by, sort_dir)
+            result, _ = details_flight.do(
+                key, lambda: read_details(version, status, page, page_size, search, filters, sort_by, sort_dir, dataset))
+            return result
+
+def read_details(version, status: str, page: int, page_size: int, search: str, filters: str,
+                 sort_by: str = "", sort_dir: str = "asc", dataset: str = "processed"):
+    clock = metrics.Stopwatch("details")
     try:
         # Validate pagination parameters
         if page < 1:
             raise HTTPException(status_code=400, detail="Page must be >= 1")
         if page_size < 1 or page_size > 10000:
             raise HTTPException(status_code=400, detail="Page size must be between 1 and 10000")
+        if sort_dir not in ("asc", "desc"):
+            raise HTTPException(status_code=400, detail="sort_dir must be 'asc' or 'desc'")
         
-        # Handle Grand Total - return paginated rows from all data
-        if status == 'Grand Total':
-            all_data_path = os.path.join(DATA_DIR, "processed", "SO_Order_Ageing.parquet")
-            if not os.path.exists(all_data_path):
-                raise HTTPException(status_code=404, detail="Data file not found")
-            
-            df = pd.read_parquet(all_data_path, engine='pyarrow')
-        else:
-             # Read from partitioned data - use URL encoding for folder name
-            safe_status = status.replace(' ', '%20').replace('/', '%2F') 
-            partition_folder = os.path.join(PARTITIONED_DIR, f"Store Status={safe_status}")
-            partition_file = os.path.join(partition_folder, "data.parquet")
-            
-            if not os.path.exists(partition_file):
-                raise HTTPException(status_code=404, detail=f"No data found for status: {status}")
-            
-            df = pd.read_parquet(partition_file, engine='pyarrow')
-
-        # Apply fast vectorized search on text-like columns
-        if search and search.strip() and not df.empty:
-            search_lower = search.lower()
-            mask = pd.Series(False, index=df.index)
-            for col in df.columns:
-                # Only search non-numeric columns for speed and stability
-                if not pd.api.types.is_numeric_dtype(df[col]):
-                    mask |= df[col].astype(str).str.contains(search_lower, case=False, na=False)
-            df = df[mask]
-            
-        total_rows = len(df)
-        
+        column_filters = parse_filters(filters)
+
         # Calculate pagination
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
-        
+
+        # Unsearched, unsorted pages come straight from the bitmaps when they can
+        direct = dataset == "processed" and not search.strip() and not sort_by
+        page_rows = bitmap_page(version, status, column_filters, start_idx, end_idx) if direct else None
+        if page_rows is not None:
+            total_rows, df_page = page_rows
+            clock.lap("read")
+        else:
+            df = load_rows(version, status, column_filters, dataset)
+            clock.lap("read")
+
+            # Apply fast vectorized search on text-like columns
+            df = search_rows(df, search)
+            clock.lap("search")
+
+            total_rows = len(df)
+
+            if sort_by:
+                if sort_by not in df.columns:
+                    raise HTTPException(status_code=400, detail=f"Unknown sort column: {sort_by}")
+                df = sort_rows(df, sort_by, sort_dir == "asc", end_idx)
+                clock.lap("sort")
+
+            df_page = df.iloc[start_idx:end_idx]
+            clock.lap("slice")
+
         if start_idx >= total_rows:
             return {
                 "data": [],
@@ -128,15 +450,14 @@ async def get_details(status: str, page: int = 1, page_size: int = 1000, search:
                 "returned_rows": 0,
                 "status": status
             }
-        
-        df_page = df.iloc[start_idx:end_idx]
-        
+
         # Convert to dict and ensure any 'nan' strings (if any) are empty
         results = df_page.fillna("").to_dict(orient="records")
         for row in results:
             for key, value in row.items():
                 if value == "nan":
                     row[key] = ""
+        clock.lap("serialize")
                     
         return {
             "data": results,
@@ -153,18 +474,138 @@ async def get_details(status: str, page: int = 1, page_size: int = 1000, search:
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
+def bitmap_page(version, status: str, column_filters: dict, start: int, end: int):
+    """
+    (total rows, rows[start:end]) of a Grand Total view answered from the
+    bitmap index: the total is a popcount and only the row groups holding the
+    page are read. None when the bitmaps don't cover every filter, or the
+    rows would come from partitions (whose row order differs).
+    """
+    if status != 'Grand Total' or not os.path.exists(version.processed_path):
+        return None
+    index = version.partition_index
+    if column_filters and any(index.is_partition_key(col) for col in column_filters):
+        return None
+    bitmaps = version.get_bitmaps()
+    rows, remaining = bitmaps.evaluate(column_filters)
+    if remaining:
+        return None
+    if rows is None:
+        rows = bitmaps.all_rows()
+    positions = rows.positions()
+    return len(positions), read_rows(version.processed_path, positions[start:end])
+
+def load_rows(version, status: str, column_filters: dict, dataset: str = "processed") -> pd.DataFrame:
+    """
+    Row-level data of one Store Status (or 'Grand Total'), with the filters
+    applied: partition keys prune folders, other columns filter rows.
+    Other registered datasets are filtered in memory.
+    """
+    index = version.partition_index
+
+    if dataset != "processed":
+        df = datasets.get(dataset)
+        if status != 'Grand Total':
+            if "Store Status" not in df.columns:
+                raise HTTPException(status_code=400, detail=f"Dataset '{dataset}' has no Store Status column")
+            df = df[df["Store Status"].astype(str) == status].drop(columns=["Store Status"])
+    # Handle Grand Total - return paginated rows from all data
+    elif status == 'Grand Total':
+        if column_filters and any(index.is_partition_key(col) for col in column_filters):
+            df = index.read(index.prune(column_filters))
+        else:
+            all_data_path = version.processed_path
+            if not os.path.exists(all_data_path):
+                raise HTTPException(status_code=404, detail="Data file not found")
+            
+            rows, remaining = version.get_bitmaps().evaluate(column_filters)
+            if rows is not None:
+                # Bitmap-selected rows: from memory when resident, otherwise
+                # only the row groups holding them are read
+                resident = datasets.peek("processed")
+                positions = rows.positions()
+                df = resident.take(positions) if resident is not None else read_rows(all_data_path, positions)
+                column_filters = remaining
+            else:
+                df = datasets.get("processed")
+    else:
+        status_filter = {"Store Status": {"op": "in", "value": [status]}}
+        if index.is_partition_key("Store Status"):
+            partitions = index.prune({**column_filters, **status_filter})
+            if not partitions and not index.prune(status_filter):
+                raise HTTPException(status_code=404, detail=f"No data found for status: {status}")
+            df = index.read(partitions)
+        else:
+            # Status is a regular column here: push the match down to the parquet reader
+            df = index.read(index.prune(column_filters), row_filters=[("Store Status", "=", status)])
+            if df.empty and not column_filters:
+                raise HTTPException(status_code=404, detail=f"No data found for status: {status}")
+        
+        # The status is implied by the request (and was never part of the partition files)
+        df = df.drop(columns=["Store Status"], errors="ignore")
+    
+    unknown = [col for col in column_filters if col not in df.columns and col != "Store Status"]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown filter column(s): {unknown}")
+    
+    # Row-level part of the filters (partition keys are already pruned)
+    df = apply_filters(df, {col: cond for col, cond in column_filters.items() if col in df.columns})
+    return df
+
+def search_rows(df: pd.DataFrame, search: str) -> pd.DataFrame:
+    """
+    Case-insensitive substring match over the text-like columns.
+    """
+    if not search or not search.strip() or df.empty:
+        return df
+    search_lower = search.lower()
+    mask = pd.Series(False, index=df.index)
+    for col in df.columns:
+        # Only search non-numeric columns for speed and stability
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            mask |= df[col].astype(str).str.contains(search_lower, case=False, na=False)
+    return df[mask]
+
+def sort_rows(df: pd.DataFrame, column: str, ascending: bool, needed: int) -> pd.DataFrame:
+    """
+    Rows ordered by `column` (nulls last). Only the first `needed` rows have to
+    be in order, so early pages of a numeric column use a partial selection
+    instead of a full sort.
+    """
+    if needed < len(df) // 4 and pd.api.types.is_numeric_dtype(df[column]):
+        values = df[column]
+        head = values.nsmallest(needed, keep="first") if ascending else values.nlargest(needed, keep="first")
+        if len(head) == needed:
+            return df.loc[head.index]
+    return df.sort_values(column, ascending=ascending, kind="stable", na_position="last")
+
 @app.post("/chat")
-def chat(request: ChatRequest):
+def chat(request: ChatRequest, http_request: Request):
     try:
         # Convert pydantic models to dicts for history
-        response = run_pandas_query(
-            query=request.query,
-            history=[m.model_dump() for m in request.history]
-        )
-        return {"response": response}
+        trace = {}
+        with data_versions.acquire(), profiling.profile_request(http_request, "chat"):
+            response = load_agent().run_pandas_query(
+                query=request.query,
+                history=[m.model_dump() for m in request.history],
+                trace=trace,
+                approximate=request.approximate,
+            )
+        return {"response": response, "approximate": "exact_id" in trace, "exact_id": trace.get("exact_id")}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/chat/exact/{exact_id}")
+def chat_exact(exact_id: str, http_request: Request):
+    """
+    Exact answer for an earlier approximate /chat answer, reusing its plan.
+    """
+    with data_versions.acquire(), profiling.profile_request(http_request, "chat"):
+        response = load_agent().run_exact_query(exact_id)
+    if response is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired exact_id: {exact_id}")
+    return {"response": response, "approximate": False, "exact_id": None}
+
 if __name__ == "__main__":
     import uvicorn
     # If run as script (python backend/main.py), this is executed.
@@ -0,0 +1,179 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Optional
+
+from fastapi import Request
+
+# ---------------------------
+# CONFIG
+# ---------------------------
+
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), "profiles")
+MAX_PROFILES = 50
+SAMPLE_INTERVAL_S = 0.005
+
+# Clients allowed to request a profile (comma-separated hosts), plus an optional shared token
+ALLOWLIST = {h.strip() for h in os.environ.get("SO_PROFILE_ALLOWLIST", "127.0.0.1,::1,localhost").split(",") if h.strip()}
+TOKEN = os.environ.get("SO_PROFILE_TOKEN", "")
+
+MODES = {"1": "sample", "true": "sample", "sample": "sample", "cprofile": "cprofile"}
+
+
+def requested_mode(request: Request) -> Optional[str]:
+    """
+    'sample' or 'cprofile' when the client asked for a profile via the
+    X-Profile header or the ?profile= query flag.
+    """
+    flag = request.headers.get("x-profile") or request.query_params.get("profile")
+    return MODES.get(str(flag).lower()) if flag else None
+
+
+def is_allowed(request: Request) -> bool:
+    host = request.client.host if request.client else ""
+    if TOKEN and request.headers.get("x-profile-token") == TOKEN:
+        return True
+    return host in ALLOWLIST
+
+
+# ---------------------------
+# SAMPLING PROFILER
+# ---------------------------
+
+class SamplingProfiler:
+    """
+    Samples one thread's stack every few milliseconds from a helper thread and
+    aggregates collapsed stacks ('a;b;c count'). The profiled code runs
+    unmodified, so the overhead is a dict lookup and a stack walk per sample.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_S):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common()) + "\n"
+
+
+# ---------------------------
+# STORAGE
+# ---------------------------
+
+def _meta_path(profile_id: str) -> str:
+    return os.path.join(PROFILE_DIR, f"{profile_id}.json")
+
+
+def _prune():
+    metas = sorted(f for f in os.listdir(PROFILE_DIR) if f.endswith(".json"))
+    for name in metas[:-MAX_PROFILES]:
+        profile_id = name[:-len(".json")]
+        for ext in (".json", ".collapsed", ".pstats"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, profile_id + ext))
+            except OSError:
+                pass
+
+
+def list_profiles() -> List[dict]:
+    """
+    Most recent profiles first.
+    """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if name.endswith(".json"):
+            with open(os.path.join(PROFILE_DIR, name)) as f:
+                profiles.append(json.load(f))
+    return profiles
+
+
+def get_profile(profile_id: str) -> Optional[dict]:
+    # ids are generated here; refuse anything that could escape the directory
+    if not profile_id.replace("-", "").isalnum() or not os.path.exists(_meta_path(profile_id)):
+        return None
+    with open(_meta_path(profile_id)) as f:
+        return json.load(f)
+
+
+@contextmanager
+def profile_request(request: Request, name: str):
+    """
+    Profile the enclosed block if the request asked for it and is allowed to.
+    The stored profile id is exposed to the client via the X-Profile-Id header.
+    """
+    mode = requested_mode(request)
+    if mode is None or not is_allowed(request):
+        yield
+        return
+
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    start = time.perf_counter()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    else:
+        profiler = SamplingProfiler(threading.get_ident())
+        profiler.start()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        if mode == "cprofile":
+            profiler.disable()
+            filename = f"{profile_id}.pstats"
+            profiler.dump_stats(os.path.join(PROFILE_DIR, filename))
+            samples = None
+        else:
+            profiler.stop()
+            filename = f"{profile_id}.collapsed"
+            with open(os.path.join(PROFILE_DIR, filename), "w") as f:
+                f.write(profiler.collapsed())
+            samples = profiler.samples
+
+        meta = {
+            "id": profile_id,
+            "name": name,
+            "mode": mode,
+            "path": request.url.path,
+            "query": str(request.url.query),
+            "duration_s": round(duration, 6),
+            "samples": samples,
+            "file": filename,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        with open(_meta_path(profile_id), "w") as f:
+            json.dump(meta, f, indent=2)
+        _prune()
+        request.state.profile_id = profile_id
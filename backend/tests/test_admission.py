@@ -0,0 +1,54 @@
+import sys
+import os
+import asyncio
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend.admission import PriorityClass, Shed, classify
+
+def test_requests_are_classified():
+    assert classify("/chat", b"") == "chat"
+    assert classify("/summary", b"") == "interactive"
+    assert classify("/details/Active", b"page=2&page_size=1000") == "interactive"
+    assert classify("/details/Active", b"page_size=10000") == "bulk"
+    assert classify("/details/Grand Total", b"search=JHK") == "bulk"
+    assert classify("/details/Grand Total", b"search=") == "interactive"
+    assert classify("/ready", b"") is None
+    assert classify("/metrics", b"") is None
+
+def test_queue_limit_timeout_and_fifo_handover():
+    async def scenario():
+        priority = PriorityClass("chat", concurrency=1, queue_limit=1, max_wait_s=0.2, retry_after_s=7)
+        assert await priority.acquire() == 0.0
+
+        # Second request queues; a third finds the queue full
+        waiting = asyncio.ensure_future(priority.acquire())
+        await asyncio.sleep(0)
+        try:
+            await priority.acquire()
+            assert False, "expected a 429"
+        except Shed as shed:
+            assert (shed.status, shed.retry_after) == (429, 7)
+
+        # Releasing hands the slot to the waiter, which reports its wait
+        await asyncio.sleep(0.05)
+        priority.release()
+        assert await waiting >= 0.05
+        assert priority.snapshot()["in_flight"] == 1 and priority.snapshot()["queued"] == 0
+
+        # Nobody releases now: the next waiter times out with a 503
+        try:
+            await priority.acquire()
+            assert False, "expected a 503"
+        except Shed as shed:
+            assert shed.status == 503
+        priority.release()
+        assert priority.snapshot()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+if __name__ == "__main__":
+    test_requests_are_classified()
+    test_queue_limit_timeout_and_fifo_handover()
+    print("OK")
@@ -0,0 +1,77 @@
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.aggregates import compute_statistic
+from ai_engine.schema import validate_query_plan
+
+rng = np.random.default_rng(7)
+ROWS = pd.DataFrame({
+    "Region": pd.Categorical(rng.choice(["WB1", "JHK1", "BR1", None], size=500)),
+    "Sitecode": rng.choice([f"S{i}" for i in range(40)] + [None], size=500),
+    "Ageing ": np.where(rng.random(500) < 0.05, np.nan, rng.integers(0, 60, size=500)),
+})
+
+def test_statistics_match_pandas():
+    grouped = ROWS.groupby("Region", observed=True)
+    expected = {
+        "avg": grouped["Ageing "].mean(),
+        "min": grouped["Ageing "].min(),
+        "max": grouped["Ageing "].max(),
+        "percentile": grouped["Ageing "].quantile(0.9),
+        "nunique": grouped["Sitecode"].nunique(),
+    }
+    for operation, want in expected.items():
+        plan = {"operation": operation, "metric": "Sitecode" if operation == "nunique" else "Ageing ",
+                "group_by": ["Region"], "percentile": 90}
+        result = compute_statistic(ROWS, plan)
+        got = result.set_index("Region").iloc[:, 0]
+        assert list(got.index) == list(want.index)
+        assert np.allclose(got.to_numpy(dtype=float), want.to_numpy(dtype=float)), operation
+
+    median = compute_statistic(ROWS, {"operation": "percentile", "metric": "Ageing "})
+    assert median.columns.tolist() == ["Ageing (median)"]
+    assert median.iloc[0, 0] == ROWS["Ageing "].median()
+
+def test_histogram_bins():
+    # Default bins are the Ageing_Group buckets; every bin is listed, empty or not
+    result = compute_statistic(ROWS, {"operation": "histogram"})
+    ageing = ROWS["Ageing "].dropna()
+    assert result["Bin"].tolist() == ["[0, 4)", "[4, 8)", "[8, 12)", ">= 12"]
+    assert result["count"].tolist() == [(ageing < 4).sum(), ((ageing >= 4) & (ageing < 8)).sum(),
+                                        ((ageing >= 8) & (ageing < 12)).sum(), (ageing >= 12).sum()]
+
+    edges = [0, 10, 30, 59]
+    per_region = compute_statistic(ROWS, {"operation": "histogram", "metric": "Ageing ", "bins": edges,
+                                          "group_by": ["Region"]})
+    for region, rows in per_region.groupby("Region", observed=True):
+        counts, _ = np.histogram(ROWS.loc[ROWS["Region"] == region, "Ageing "].dropna(), bins=edges)
+        assert rows["count"].tolist() == counts.tolist()
+    assert per_region["Bin"].tolist()[:3] == ["[0, 10)", "[10, 30)", "[30, 59]"]
+
+    counted = compute_statistic(ROWS, {"operation": "histogram", "bins": 6})
+    assert len(counted) == 6 and counted["count"].sum() == len(ageing)
+
+def test_validation():
+    columns = ROWS.columns.tolist()
+    validate_query_plan({"dataset": "processed", "operation": "histogram", "bins": [0, 7, 30]}, columns)
+    validate_query_plan({"dataset": "processed", "operation": "percentile", "metric": "Ageing ", "percentile": 95}, columns)
+    for bad in [{"operation": "avg"},
+                {"operation": "percentile", "metric": "Ageing ", "percentile": 150},
+                {"operation": "histogram", "bins": [0, 30, 7]},
+                {"operation": "histogram", "bins": 500}]:
+        try:
+            validate_query_plan({"dataset": "processed", **bad}, columns)
+            assert False, f"expected {bad} to be rejected"
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_statistics_match_pandas()
+    test_histogram_bins()
+    test_validation()
+    print("OK")
@@ -0,0 +1,78 @@
+import sys
+import os
+import json
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine import agent
+from ai_engine.approximate import estimate_plan
+from ai_engine.data_version import manager
+from ai_engine.metrics import Stopwatch
+
+ROWS = pd.DataFrame({
+    "Store Status": ["Active"] * 6 + ["Hold"] * 2,
+    "Region": ["WB1"] * 4 + ["JHK1"] * 2 + ["WB1"] * 2,
+    "Division": ["Men", "Women", "Men", "Men", "Women", "Men", "Men", "Women"],
+    "Open Qty Pcs": [10, 20, 30, 40, 5, 7, 100, 200],
+})
+
+def with_sizes(sample, population):
+    sizes = population.groupby(["Store Status", "Region"]).size().rename("_stratum_rows").reset_index()
+    counts = sample.groupby(["Store Status", "Region"]).size().rename("_stratum_sample").reset_index()
+    return sample.merge(sizes.merge(counts), on=["Store Status", "Region"])
+
+def test_census_sample_is_exact():
+    sample = with_sizes(ROWS, ROWS)
+    result, precision = estimate_plan({"operation": "group_sum", "metric": "Open Qty Pcs", "group_by": ["Division"]}, sample)
+    assert dict(zip(result["Division"], result["Open Qty Pcs"])) == {"Men": 187, "Women": 225}
+    assert result["Open Qty Pcs ±"].tolist() == [0, 0]
+    assert precision["population_rows"] == 8 and precision["max_relative_error"] == 0
+
+def test_rows_are_weighted_by_their_stratum():
+    # Every other Active/WB1 row sampled: each stands for two
+    sample = with_sizes(ROWS.drop(index=[1, 3]), ROWS)
+    result, _ = estimate_plan({"operation": "sum", "metric": "Open Qty Pcs",
+                               "filters": {"Region": {"op": "=", "value": "WB1"}}}, sample)
+    assert result["Open Qty Pcs"].iloc[0] == (10 + 30) * 2 + 100 + 200
+    assert result["Open Qty Pcs ±"].iloc[0] > 0
+
+    count, _ = estimate_plan({"operation": "count", "filters": {"Division": {"op": "=", "value": "Men"}}}, sample)
+    assert count["count"].iloc[0] == 2 * 2 + 1 + 1
+
+    top, _ = estimate_plan({"operation": "top_n", "group_by": ["Store Status"], "limit": 1}, sample)
+    assert top["Store Status"].tolist() == ["Active"] and top["count"].tolist() == [6]
+
+def test_only_processed_plans_are_estimated():
+    with tempfile.TemporaryDirectory() as data_dir:
+        previous_dir = manager.data_dir
+        os.makedirs(os.path.join(data_dir, "transformed"))
+        # Half of the processed rows sampled; a registered extract with other rows
+        with_sizes(ROWS.iloc[::2], ROWS).to_parquet(os.path.join(data_dir, "transformed", "sample.parquet"))
+        pd.DataFrame({"Warehouse": ["WH1"] * 3, "Open Qty Pcs": [1, 2, 3]}).to_parquet(os.path.join(data_dir, "wh1.parquet"))
+        with open(os.path.join(data_dir, "datasets.json"), "w") as f:
+            json.dump({"wh1": {"path": "wh1.parquet", "description": "Warehouse 1 extract"}}, f)
+        manager.use_data_dir(data_dir)
+        try:
+            def answer(plan):
+                event = {"llm_calls": 0}
+                text = agent._execute_and_summarize("q", plan, None, Stopwatch("chat"), event,
+                                                    approximate=True, summarize=False)
+                return text, event
+
+            text, event = answer({"operation": "sum", "metric": "Open Qty Pcs", "dataset": "wh1"})
+            assert "approximate" not in event and "exact_id" not in event
+            assert text == "Result Value: 6 (Metric: Open Qty Pcs)"
+
+            _, event = answer({"operation": "sum", "metric": "Open Qty Pcs"})
+            assert event["approximate"]["population_rows"] == len(ROWS) and event["exact_id"]
+        finally:
+            manager.use_data_dir(previous_dir)
+
+if __name__ == "__main__":
+    test_census_sample_is_exact()
+    test_rows_are_weighted_by_their_stratum()
+    test_only_processed_plans_are_estimated()
+    print("OK")
@@ -0,0 +1,79 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.bitmaps import BitmapIndex, read_rows
+from ai_engine.filters import apply_filters
+
+# More rows than one 65536-row chunk, in two row groups
+rng = np.random.default_rng(3)
+N = 70_000
+ROWS = pd.DataFrame({
+    "Store Status": pd.Categorical(rng.choice(["Active", "Hold", "Closed"], size=N, p=[0.9, 0.07, 0.03])),
+    "Region": pd.Categorical(rng.choice(["WB1", "JHK1", "DELHI NCR"], size=N)),
+    "Division": rng.choice(["Men", "Women Western", "Women Ethnic", "Kids"], size=N),
+    "Ageing ": rng.integers(0, 60, size=N),
+})
+
+def load_index(tmp, rows=ROWS):
+    processed_path = os.path.join(tmp, "processed.parquet")
+    rows.to_parquet(processed_path, row_group_size=40_000)
+    # No persisted bitmaps: built from the processed file
+    return BitmapIndex.load(os.path.join(tmp, "bitmaps.parquet"), processed_path), processed_path
+
+def test_filters_match_row_masks():
+    with tempfile.TemporaryDirectory() as tmp:
+        index, processed_path = load_index(tmp)
+        assert index.n_rows == N and index.columns == ["Store Status", "Region", "Division"]
+        cases = [
+            {"Store Status": {"op": "=", "value": "hold"}},
+            {"Division": {"op": "=", "value": "women"}},  # partial match fallback
+            {"Division": {"op": "in", "value": ["Men", "Kids"]}, "Region": {"op": "!=", "value": "wb1"}},
+            {"Store Status": {"op": "not in", "value": ["Active"]}, "Region": {"op": "in", "value": "jhk1"}},
+        ]
+        for filters in cases:
+            rows, remaining = index.evaluate(filters)
+            expected = apply_filters(ROWS, filters)
+            assert remaining == {}
+            assert rows.count() == len(expected)
+            assert rows.positions().tolist() == expected.index.tolist()
+
+        # Columns without bitmaps are left for the row scan
+        rows, remaining = index.evaluate({"Region": {"op": "=", "value": "WB1"}, "Ageing ": {"op": ">", "value": 30}})
+        assert list(remaining) == ["Ageing "]
+        taken = read_rows(processed_path, rows.positions())
+        assert taken["Region"].astype(str).eq("WB1").all() and len(taken) == rows.count()
+
+    # "=" only falls back to a partial match when none of the rows left by
+    # the earlier filters matches exactly
+    small = pd.DataFrame({"Zone": ["East", "East", "West"], "Region": ["WB1", "WB1", "WB"], "Ageing ": [5, 40, 7]})
+    with tempfile.TemporaryDirectory() as tmp:
+        index, _ = load_index(tmp, small)
+        cases = [
+            {"Zone": {"op": "=", "value": "East"}, "Region": {"op": "=", "value": "WB"}},
+            {"Region": {"op": "=", "value": "WB"}, "Zone": {"op": "=", "value": "East"}},
+            {"Ageing ": {"op": ">", "value": 30}, "Region": {"op": "=", "value": "WB"}},
+            {"Ageing ": {"op": "<", "value": 30}, "Region": {"op": "=", "value": "WB"}},
+        ]
+        for filters in cases:
+            rows, remaining = index.evaluate(filters)
+            selected = small if rows is None else small.iloc[rows.positions()]
+            assert apply_filters(selected, remaining).index.tolist() == apply_filters(small, filters).index.tolist()
+
+def test_group_counts_by_popcount():
+    with tempfile.TemporaryDirectory() as tmp:
+        index, _ = load_index(tmp)
+        rows, _ = index.evaluate({"Store Status": {"op": "!=", "value": "Active"}})
+        counts = index.group_counts("Region", rows)
+        expected = ROWS[ROWS["Store Status"] != "Active"].groupby("Region", observed=True).size()
+        assert dict(zip(counts["Region"], counts["count"])) == {str(k): v for k, v in expected.items()}
+
+if __name__ == "__main__":
+    test_filters_match_row_masks()
+    test_group_counts_by_popcount()
+    print("OK")
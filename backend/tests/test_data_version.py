@@ -0,0 +1,43 @@
+import sys
+import os
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.data_version import VersionManager, LEGACY
+
+def write_version(data_dir, name, total):
+    root = os.path.join(data_dir, "versions", name, "transformed")
+    os.makedirs(root)
+    pd.DataFrame({"Store Status": ["Grand Total"], "Open Qty Pcs": [total]}).to_parquet(
+        os.path.join(root, "summary.parquet"))
+    with open(os.path.join(data_dir, "CURRENT"), "w") as f:
+        f.write(name)
+
+def test_swap_waits_for_in_flight_requests():
+    with tempfile.TemporaryDirectory() as data_dir:
+        manager = VersionManager(data_dir)
+        assert manager.current().name == LEGACY
+
+        write_version(data_dir, "v1", 10)
+        assert manager.refresh()
+        assert manager.current().get_summary()["Open Qty Pcs"].iloc[0] == 10
+
+        with manager.acquire() as pinned:
+            write_version(data_dir, "v2", 20)
+            assert manager.refresh()
+            # The request keeps its version until it finishes
+            print(f"Pinned: {pinned.name}, current: {manager.current().name}")
+            assert pinned.name == "v1" and not pinned.released
+            assert pinned.get_summary()["Open Qty Pcs"].iloc[0] == 10
+        assert pinned.released
+        assert manager.current().get_summary()["Open Qty Pcs"].iloc[0] == 20
+
+        # Pointer unchanged: nothing to do
+        assert not manager.refresh()
+
+if __name__ == "__main__":
+    test_swap_waits_for_in_flight_requests()
+    print("OK")
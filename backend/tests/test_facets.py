@@ -0,0 +1,41 @@
+import sys
+import os
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.facets import compute_facets, facet_counts, common_values
+
+ROWS = pd.DataFrame({
+    "Store Status": ["Active", "Active", "Active", "Hold"],
+    "Region": ["JHK1", "WB1", "JHK1", "WB1"],
+    "Zone": pd.Categorical(["East", "East", "East", "East"]),
+    "Open Qty Pcs": [5, 3, 2, 10],
+    "Unallocated Qty Pcs": [1, 1, 1, 4],
+})
+
+def test_counts_by_status_and_grand_total():
+    facets = compute_facets(ROWS)
+
+    total = facet_counts(facets)
+    print(total)
+    assert list(total) == ["Region", "Zone"]
+    assert total["Region"] == [
+        {"value": "JHK1", "rows": 2, "Open Qty Pcs": 7, "Unallocated Qty Pcs": 2},
+        {"value": "WB1", "rows": 2, "Open Qty Pcs": 13, "Unallocated Qty Pcs": 5},
+    ]
+
+    active = facet_counts(facets, status="Active", columns=["Region"])
+    assert list(active) == ["Region"]
+    assert [(e["value"], e["rows"]) for e in active["Region"]] == [("JHK1", 2), ("WB1", 1)]
+    assert facet_counts(facets, status="Grand Total")["Zone"][0]["rows"] == 4
+
+def test_common_values_by_frequency():
+    facets = compute_facets(ROWS[ROWS["Store Status"] == "Active"])
+    assert common_values(facets, ["Region"], limit=1) == {"Region": ["JHK1"]}
+
+if __name__ == "__main__":
+    test_counts_by_status_and_grand_total()
+    test_common_values_by_frequency()
+    print("OK")
@@ -0,0 +1,64 @@
+import sys
+import os
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from backend import http_cache
+
+class FakeVersion:
+    name = "v7"
+    reads = 0
+
+    def modified_at(self):
+        return 1767225600.0
+
+version = FakeVersion()
+app = FastAPI()
+app.add_middleware(http_cache.CompressionMiddleware, minimum_size=100)
+
+@app.get("/summary")
+def summary(request: Request, response: Response, rows: int = 1):
+    not_modified = http_cache.conditional(request, response, version, "summary")
+    if not_modified:
+        return not_modified
+    version.reads += 1
+    return [{"Store Status": "Active", "Open Qty Pcs": i} for i in range(rows)]
+
+client = TestClient(app)
+
+def test_conditional_get_skips_the_read():
+    first = client.get("/summary")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+    assert first.headers["Cache-Control"] == http_cache.POLICIES["summary"]
+
+    reads = version.reads
+    again = client.get("/summary", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert version.reads == reads
+
+    # Other parameters, other ETag
+    assert client.get("/summary?rows=2", headers={"If-None-Match": etag}).status_code == 200
+    since = client.get("/summary", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+def test_compression_threshold_and_negotiation():
+    small = client.get("/summary", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    large = client.get("/summary?rows=500", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in large.headers["vary"]
+    assert len(large.json()) == 500
+
+    assert http_cache.choose_encoding("gzip;q=0, identity") is None
+    assert http_cache.choose_encoding("deflate, gzip;q=0.5") == "gzip"
+    assert http_cache.choose_encoding("br, gzip") == ("br" if http_cache.brotli else "gzip")
+
+if __name__ == "__main__":
+    test_conditional_get_skips_the_read()
+    test_compression_threshold_and_negotiation()
+    print("OK")
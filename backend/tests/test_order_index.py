@@ -0,0 +1,37 @@
+import sys
+import os
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.order_index import OrderIndex
+
+def test_lookup_reads_only_the_order_lines():
+    with tempfile.TemporaryDirectory() as root:
+        processed = os.path.join(root, "processed.parquet")
+        df = pd.DataFrame({
+            "Orderkey": ["O1", "O2", "O1", "O3", "O2", "O1"],
+            "Set Barcode": [f"B{i}" for i in range(6)],
+            "Openqty": [1, 2, 3, 4, 5, 6],
+        })
+        # Two rows per row group: O1's lines span all three
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), processed, row_group_size=2)
+
+        # No persisted index yet: built from the processed file
+        index = OrderIndex.load(os.path.join(root, "order_index.parquet"), processed)
+        positions = index.lookup("O1")
+        print(positions.tolist())
+        assert positions.tolist() == [[0, 0], [1, 0], [2, 1]]
+
+        lines = index.read(processed, positions)
+        assert lines["Openqty"].tolist() == [1, 3, 6]
+        assert index.read(processed, index.lookup("B4", "Set Barcode"))["Orderkey"].tolist() == ["O2"]
+        assert len(index.lookup("O9")) == 0
+
+if __name__ == "__main__":
+    test_lookup_reads_only_the_order_lines()
+    print("OK")
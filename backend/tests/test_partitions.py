@@ -0,0 +1,47 @@
+import sys
+import os
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.partitions import PartitionIndex
+
+def build_tree(root):
+    rows = [
+        ("Active", "JHK1", 10), ("Active", "WB1", 20),
+        ("Hold", "JHK1", 30), ("New Store", "DELHI NCR", 40),
+    ]
+    for status, region, qty in rows:
+        folder = os.path.join(root, f"Store Status={status.replace(' ', '%20')}", f"Region={region.replace(' ', '%20')}")
+        os.makedirs(folder)
+        pd.DataFrame({"Division": ["Men"], "Open Qty Pcs": [qty]}).to_parquet(os.path.join(folder, "data.parquet"))
+
+def test_prune_and_read():
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root)
+        index = PartitionIndex(root)
+        print(f"Keys: {index.keys}, partitions: {len(index.partitions)}")
+        assert index.keys == ["Store Status", "Region"]
+        assert len(index.partitions) == 4
+
+        # Case-insensitive equality on one level
+        parts = index.prune({"Store Status": {"op": "=", "value": "active"}})
+        assert {p.values["Region"] for p in parts} == {"JHK1", "WB1"}
+
+        # Partial fallback, like the executor
+        parts = index.prune({"Region": {"op": "=", "value": "DELHI"}})
+        assert [p.values["Store Status"] for p in parts] == ["New Store"]
+
+        # Non-key filters never prune
+        assert len(index.prune({"Division": {"op": "=", "value": "Women"}})) == 4
+
+        df = index.read(index.prune({"Region": {"op": "in", "value": ["JHK1"]}}))
+        print(df)
+        assert sorted(df["Open Qty Pcs"].tolist()) == [10, 30]
+        assert set(df["Store Status"]) == {"Active", "Hold"}
+
+if __name__ == "__main__":
+    test_prune_and_read()
+    print("OK")
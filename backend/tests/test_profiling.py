@@ -0,0 +1,31 @@
+import sys
+import os
+import threading
+import time
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profiling import SamplingProfiler
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        sum(range(1000))
+
+def test_sampler_collects_collapsed_stacks():
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.001)
+    profiler.start()
+    busy_loop(0.2)
+    profiler.stop()
+
+    assert profiler.samples > 0
+    collapsed = profiler.collapsed()
+    assert "busy_loop (test_profiling.py" in collapsed
+    # 'stack count' lines, root frame first
+    stack, count = collapsed.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and stack.index("test_sampler_collects_collapsed_stacks") < stack.index("busy_loop")
+
+if __name__ == "__main__":
+    test_sampler_collects_collapsed_stacks()
+    print("OK")
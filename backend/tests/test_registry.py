@@ -0,0 +1,74 @@
+import sys
+import os
+import json
+import tempfile
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.data_version import manager
+from ai_engine.registry import DatasetRegistry, UnknownDataset
+
+def write_dataset(data_dir, name, rows):
+    path = os.path.join(data_dir, f"{name}.parquet")
+    pd.DataFrame({"Warehouse": ["WH1"] * rows, "Open Qty Pcs": range(rows)}).to_parquet(path)
+    return path
+
+def test_lru_eviction_keeps_pinned_datasets():
+    with tempfile.TemporaryDirectory() as data_dir:
+        previous_dir = manager.data_dir
+        manager.use_data_dir(data_dir)
+        try:
+            registry = DatasetRegistry(budget_bytes=0, pinned=[])
+            for name in ("a", "b", "c"):
+                registry.register(name, write_dataset(data_dir, name, 1000))
+            registry.pin("a")
+
+            assert len(registry.get("a")) == 1000
+            registry.get("b")
+            # Over budget: b is evicted as soon as c comes in, a stays pinned
+            registry.get("c")
+            snapshot = registry.snapshot()["datasets"]
+            assert snapshot["a"]["resident"] and snapshot["a"]["pinned"]
+            assert not snapshot["b"]["resident"]
+            assert registry.peek("c") is None and registry.peek("a") is not None
+
+            registry.budget_bytes = 10 ** 9
+            registry.get("b")
+            registry.get("c")
+            assert registry.resident_bytes() == sum(d["resident_bytes"] for d in registry.snapshot()["datasets"].values())
+
+            try:
+                registry.get("missing")
+                assert False, "unknown dataset accepted"
+            except UnknownDataset:
+                pass
+        finally:
+            manager.use_data_dir(previous_dir)
+
+def test_datasets_file_and_reload_on_change():
+    with tempfile.TemporaryDirectory() as data_dir:
+        previous_dir = manager.data_dir
+        manager.use_data_dir(data_dir)
+        try:
+            write_dataset(data_dir, "wh1", 10)
+            with open(os.path.join(data_dir, "datasets.json"), "w") as f:
+                json.dump({"wh1": {"path": "wh1.parquet", "description": "Warehouse 1 extract", "pin": True}}, f)
+            registry = DatasetRegistry(pinned=[])
+            assert registry.names()["wh1"] == "Warehouse 1 extract"
+            assert "processed" in registry.names() and registry.specs()["wh1"]["pin"]
+
+            first = registry.get("wh1")
+            assert registry.get("wh1") is first
+            # A rewritten file is read again
+            path = write_dataset(data_dir, "wh1", 20)
+            os.utime(path, (os.path.getmtime(path) + 5,) * 2)
+            assert len(registry.get("wh1")) == 20
+        finally:
+            manager.use_data_dir(previous_dir)
+
+if __name__ == "__main__":
+    test_lru_eviction_keeps_pinned_datasets()
+    test_datasets_file_and_reload_on_change()
+    print("OK")
@@ -0,0 +1,44 @@
+import sys
+import os
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.rollups import Rollups, compute_rollups
+
+ROWS = pd.DataFrame({
+    "Store Status": pd.Categorical(["Active", "Active", "Active", "Hold"]),
+    "Zone": ["East", "East", "West", "East"],
+    "Region": ["JHK1", "WB1", "MH1", "WB1"],
+    "Open Qty Pcs": [5, 3, 20, 10],
+    "Picked Qty Pcs": [1, 1, 1, 4],
+})
+HIERARCHIES = {"status": ["Store Status", "Zone", "Region"], "missing": ["Division", "Section"]}
+
+def test_levels_are_served_from_the_rollups():
+    rollups = Rollups(compute_rollups(ROWS, HIERARCHIES), HIERARCHIES)
+    # Hierarchies whose columns aren't in the data are dropped
+    assert rollups.hierarchies == {"status": ["Store Status", "Zone", "Region"]}
+
+    top = rollups.children("status", [])
+    print(top)
+    assert top["Value"].tolist() == ["Active", "Hold"]
+    assert top["Rows"].tolist() == [3, 1]
+    assert top["Open Qty Pcs"].tolist() == [28, 10]
+
+    # Largest open quantity first
+    zones = rollups.children("status", ["Active"])
+    assert zones["Value"].tolist() == ["West", "East"]
+    assert zones["Open Qty Pcs"].tolist() == [20, 8]
+
+    regions = rollups.children("status", ["Active", "East"])
+    assert regions["Value"].tolist() == ["JHK1", "WB1"]
+    assert regions["Picked Qty Pcs"].tolist() == [1, 1]
+
+    assert rollups.children("status", ["Closed"]) is None
+    assert rollups.children("missing", []) is None
+
+if __name__ == "__main__":
+    test_levels_are_served_from_the_rollups()
+    print("OK")
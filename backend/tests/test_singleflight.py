@@ -0,0 +1,98 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+from ai_engine.singleflight import SingleFlight
+
+def test_concurrent_identical_calls_share_one_computation():
+    flight = SingleFlight("test")
+    calls = []
+    started = threading.Event()
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return {"rows": 42}
+
+    def leader():
+        return flight.do("details", slow)
+
+    def follower():
+        started.wait()
+        return flight.do("details", slow)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [pool.submit(leader)] + [pool.submit(follower) for _ in range(5)]
+        results = [f.result() for f in futures]
+
+    print(f"Computations: {len(calls)}, shared: {sum(shared for _, shared in results)}")
+    assert len(calls) == 1
+    assert all(result is results[0][0] for result, _ in results)
+    assert [shared for _, shared in results] == [False] + [True] * 5
+
+    # Nothing is kept once the flight has landed
+    assert flight.do("details", lambda: {"rows": 7}) == ({"rows": 7}, False)
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError("bad plan")
+
+    def follower():
+        started.wait()
+        return flight.do("plan", failing)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "plan", failing)] + [pool.submit(follower) for _ in range(2)]
+        errors = []
+        for future in futures:
+            try:
+                future.result()
+            except ValueError as e:
+                errors.append(e)
+    assert [str(e) for e in errors] == ["bad plan"] * 3
+    # Waiters get their own exception, chained to the leader's
+    leader_error = errors[0]
+    assert all(e is not leader_error and e.__cause__ is leader_error for e in errors[1:])
+
+def test_http_error_keeps_its_status_for_every_waiter():
+    flight = SingleFlight("test")
+    started = threading.Event()
+
+    def missing():
+        started.set()
+        time.sleep(0.1)
+        raise HTTPException(status_code=404, detail="Order not found: NOPE")
+
+    def follower():
+        started.wait()
+        return flight.do("orders", missing)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(flight.do, "orders", missing)] + [pool.submit(follower) for _ in range(3)]
+        errors = []
+        for future in futures:
+            try:
+                future.result()
+            except HTTPException as e:
+                errors.append(e)
+    assert [(e.status_code, e.detail) for e in errors] == [(404, "Order not found: NOPE")] * 4
+    assert all(e is not errors[0] for e in errors[1:])
+
+if __name__ == "__main__":
+    test_concurrent_identical_calls_share_one_computation()
+    test_error_reaches_every_waiter()
+    test_http_error_keeps_its_status_for_every_waiter()
+    print("OK")
@@ -0,0 +1,63 @@
+import sys
+import os
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_engine.trends import compute_trend
+
+# Daily series as etl/snapshots.py writes it: one row per day and grouping
+DAYS = ["2026-09-28", "2026-09-29", "2026-10-05", "2026-10-06"]
+def day_rows(date, wb1, jhk1):
+    # (Grouping, Store Status, Region) + (Rows, Unallocated Qty Pcs, summed Ageing)
+    total = tuple(a + b for a, b in zip(wb1, jhk1))
+    rows = [("", None, None) + total, ("Region", None, "WB1") + wb1, ("Region", None, "JHK1") + jhk1,
+            ("Store Status,Region", "Active", "WB1") + wb1]
+    if jhk1[0]:
+        rows.append(("Store Status,Region", "Hold", "JHK1") + jhk1)
+    return [(date,) + row for row in rows]
+
+SERIES = pd.DataFrame(
+    [row for date, wb1, jhk1 in zip(DAYS, [(10, 100, 50), (12, 150, 60), (15, 200, 75), (16, 240, 80)],
+                                    [(5, 40, 100), (0, 0, 0), (4, 30, 40), (2, 10, 30)])
+     for row in day_rows(date, wb1, jhk1)],
+    columns=["Date", "Grouping", "Store Status", "Region", "Rows", "Unallocated Qty Pcs", "Ageing "],
+)
+
+def test_daily_and_weekly_series():
+    plan = {"operation": "trend", "metric": "Unallocated Qty Pcs", "filters": {"Region": {"op": "=", "value": "wb1"}}}
+    daily = compute_trend(plan, SERIES)
+    assert daily["Date"].tolist() == DAYS
+    assert daily["Unallocated Qty Pcs"].tolist() == [100, 150, 200, 240]
+    assert daily["Change"].tolist()[1:] == [50, 50, 40]
+
+    # Weeks end on their last snapshot
+    weekly = compute_trend({**plan, "period": "week"}, SERIES)
+    assert weekly["Date"].tolist() == ["2026-09-29", "2026-10-06"]
+    assert weekly["Change %"].tolist()[1] == 60.0
+
+    # Window counted back from the latest snapshot
+    assert compute_trend({**plan, "days": 2}, SERIES)["Date"].tolist() == ["2026-10-05", "2026-10-06"]
+
+def test_groups_counts_and_average_ageing():
+    counts = compute_trend({"operation": "trend", "group_by": ["Region"]}, SERIES)
+    jhk1 = counts[counts["Region"] == "JHK1"]
+    assert jhk1["count"].tolist() == [5, 0, 4, 2]
+
+    ageing = compute_trend({"operation": "trend", "metric": "Ageing ",
+                            "filters": {"Store Status": {"op": "=", "value": "Hold"}, "Region": {"op": "=", "value": "JHK1"}}},
+                           SERIES)
+    # A day without rows has no average
+    assert ageing["Ageing (avg)"].tolist()[0] == 20.0 and pd.isna(ageing["Ageing (avg)"].iloc[1])
+
+    try:
+        compute_trend({"operation": "trend", "filters": {"Ageing ": {"op": ">", "value": 30}}}, SERIES)
+        assert False, "row-level filter accepted"
+    except ValueError as e:
+        assert "Ageing_Group" in str(e)
+
+if __name__ == "__main__":
+    test_daily_and_weekly_series()
+    test_groups_counts_and_average_ageing()
+    print("OK")
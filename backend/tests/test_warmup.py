@@ -0,0 +1,35 @@
+import sys
+import os
+import subprocess
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from warmup import Warmup
+
+def test_failed_step_is_reported_and_skipped():
+    def broken():
+        raise RuntimeError("connection refused")
+
+    warmup = Warmup([("data", lambda: {"version": "v1"}), ("model", broken), ("indexes", lambda: None)])
+    assert not warmup.report()["ready"]
+    warmup.run()
+
+    report = warmup.report()
+    assert report["ready"]
+    assert report["components"]["data"]["state"] == "ready"
+    assert report["components"]["data"]["version"] == "v1"
+    assert report["components"]["model"]["state"] == "failed"
+    assert "connection refused" in report["components"]["model"]["error"]
+    assert report["components"]["indexes"]["state"] == "ready"
+
+def test_data_modules_do_not_import_langchain():
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys; import ai_engine.data_version, ai_engine.executor; print('langchain_ollama' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=backend_dir, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
+
+if __name__ == "__main__":
+    test_failed_step_is_reported_and_skipped()
+    test_data_modules_do_not_import_langchain()
+    print("OK")
@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+from typing import Callable, List, Optional, Tuple
+
+# ---------------------------
+# CONFIG
+# ---------------------------
+
+# Bytes of parquet (processed file first, then the largest partitions) paged in at startup
+WARM_BYTES = int(os.environ.get("SO_WARM_BYTES", str(512 * 1024 * 1024)))
+READ_CHUNK = 8 * 1024 * 1024
+
+# Ping the model at startup so the first /chat doesn't pay for Ollama's cold load
+WARM_MODEL = os.environ.get("SO_WARM_MODEL", "1").lower() not in ("0", "false", "no")
+MODEL_PING_TIMEOUT_S = 300
+
+# Components that must be warm before the instance reports ready
+REQUIRED = ("data", "indexes")
+
+
+def ollama_url() -> str:
+    # Same variable the Ollama client honours; it may be given without a scheme
+    host = os.environ.get("OLLAMA_HOST", "").strip() or "http://localhost:11434"
+    if "://" not in host:
+        host = f"http://{host}"
+    return host.rstrip("/")
+
+
+# ---------------------------
+# STEPS
+# ---------------------------
+
+def warm_data(manager):
+    """
+    Load the current data version: manifest, summary and parquet footers.
+    """
+    version = manager.current()
+    return {"version": version.name, "summary_rows": 0 if version.summary_df is None else len(version.summary_df)}
+
+
+def warm_indexes(manager):
+    version = manager.current()
+    index = version.partition_index
+    details = {"partition_keys": index.keys, "partitions": len(index.partitions)}
+    if os.path.exists(version.processed_path):
+        details["order_index_rows"] = version.get_order_index().processed_rows
+        details["bitmap_columns"] = version.get_bitmaps().columns
+    details["rollup_hierarchies"] = list(version.get_rollups().hierarchies)
+    sample = version.get_sample()
+    details["sample_rows"] = 0 if sample is None else len(sample)
+    return details
+
+
+def warm_datasets(registry):
+    """
+    Load the pinned datasets so they are resident before the first request.
+    """
+    pinned = [name for name, spec in registry.specs().items() if spec["pin"]]
+    missing = []
+    for name in pinned:
+        try:
+            registry.get(name)
+        except FileNotFoundError:
+            missing.append(name)
+    return {"pinned": pinned, "missing": missing, "resident_bytes": registry.resident_bytes()}
+
+
+def warm_hot_partitions(manager, budget: int = WARM_BYTES):
+    """
+    Page the processed file and the largest partitions into the OS cache,
+    up to `budget` bytes, so the first full scans read from memory.
+    """
+    version = manager.current()
+    partitions = sorted((p.path for p in version.partition_index.partitions), key=os.path.getsize, reverse=True)
+    files, nbytes = 0, 0
+    for path in [version.processed_path] + partitions:
+        if not os.path.exists(path):
+            continue
+        size = os.path.getsize(path)
+        if nbytes + size > budget:
+            continue
+        with open(path, "rb") as f:
+            while f.read(READ_CHUNK):
+                pass
+        files += 1
+        nbytes += size
+    return {"files": files, "bytes": nbytes}
+
+
+def ping_model(model: str, keep_alive: str, timeout: float = MODEL_PING_TIMEOUT_S):
+    """
+    An empty /api/generate loads the model into memory and keeps it there
+    for `keep_alive`.
+    """
+    body = json.dumps({"model": model, "prompt": "", "keep_alive": keep_alive, "stream": False}).encode()
+    request = urllib.request.Request(f"{ollama_url()}/api/generate", data=body,
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        response.read()
+    return {"model": model, "keep_alive": keep_alive}
+
+
+# ---------------------------
+# RUNNER
+# ---------------------------
+
+class Warmup:
+    """
+    Runs the startup steps in order on a background thread and records the
+    state of each (pending, warming, ready, failed) for the readiness probe.
+    A failed step is logged and skipped; the next ones still run.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], Optional[dict]]]]):
+        self.steps = steps
+        self._lock = threading.Lock()
+        self._status = {name: {"state": "pending"} for name, _ in steps}
+        self._thread: Optional[threading.Thread] = None
+
+    def _set(self, name: str, **status):
+        with self._lock:
+            self._status[name] = status
+
+    def run(self):
+        for name, step in self.steps:
+            self._set(name, state="warming")
+            start = time.perf_counter()
+            try:
+                details = step() or {}
+            except Exception as e:
+                self._set(name, state="failed", seconds=round(time.perf_counter() - start, 3), error=str(e))
+                print(f"[warmup] {name} failed: {e}")
+                continue
+            seconds = round(time.perf_counter() - start, 3)
+            self._set(name, state="ready", seconds=seconds, **details)
+            print(f"[warmup] {name} ready ({seconds:.2f}s)")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def report(self) -> dict:
+        with self._lock:
+            components = {name: dict(status) for name, status in self._status.items()}
+        ready = all(components.get(name, {}).get("state") == "ready" for name in REQUIRED if name in components)
+        return {"ready": ready, "components": components}
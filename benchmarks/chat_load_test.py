@@ -0,0 +1,238 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+DEFAULT_BACKEND = "http://localhost:8008"
+SPAWN_BACKEND_PORT = 8010
+SPAWN_STANDIN_PORT = 11500
+
+# Each conversation is replayed turn by turn with the growing history, like the chat UI does
+CONVERSATIONS = [
+    ["How many orders have Ageing greater than 10?"],
+    ["Total Unallocated Qty for Division Men and Women."],
+    ["Top 5 Regions by count of orders."],
+    [
+        "Total Unallocated Qty for Region DELHI NCR?",
+        "Now show me that broken down by Department.",
+        "Which of those has the highest Ageing?",
+    ],
+    ["Open Qty Pcs for Hold stores"],
+    ["Count of orders by Warehouse"],
+    ["Bottom 3 Sections by Picked Qty Pcs"],
+]
+
+STAGE_METRIC = "so_stage_latency_seconds"
+LINE_RE = re.compile(r'^(\w+)\{(.*)\}\s+(\S+)$')
+LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+# ---------------------------
+# PROMETHEUS HISTOGRAMS
+# ---------------------------
+
+def scrape_stages(client, path="chat"):
+    """
+    {stage: {"buckets": {le: cumulative count}, "sum": s, "count": n}} for one path.
+    """
+    stages = defaultdict(lambda: {"buckets": {}, "sum": 0.0, "count": 0})
+    for line in client.get("/metrics").text.splitlines():
+        match = LINE_RE.match(line)
+        if not match or not match.group(1).startswith(STAGE_METRIC):
+            continue
+        name, labels, value = match.group(1), dict(LABEL_RE.findall(match.group(2))), float(match.group(3))
+        if labels.get("path") != path:
+            continue
+        entry = stages[labels["stage"]]
+        if name.endswith("_bucket"):
+            entry["buckets"][float(labels["le"])] = value
+        elif name.endswith("_sum"):
+            entry["sum"] = value
+        elif name.endswith("_count"):
+            entry["count"] = value
+    return stages
+
+def histogram_quantile(q, buckets):
+    """
+    Linear interpolation inside the bucket holding the q-th observation
+    (same estimate as PromQL histogram_quantile).
+    """
+    bounds = sorted(buckets)
+    total = buckets[bounds[-1]] if bounds else 0
+    if total <= 0:
+        return None
+    rank = q * total
+    previous_bound, previous_count = 0.0, 0.0
+    for bound in bounds:
+        count = buckets[bound]
+        if count >= rank:
+            if bound == float("inf"):
+                return previous_bound
+            if count == previous_count:
+                return bound
+            return previous_bound + (bound - previous_bound) * (rank - previous_count) / (count - previous_count)
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+def stage_report(before, after, elapsed_s):
+    report = {}
+    for stage, entry in after.items():
+        base = before.get(stage, {"buckets": {}, "sum": 0.0, "count": 0})
+        count = entry["count"] - base["count"]
+        if count <= 0:
+            continue
+        buckets = {le: value - base["buckets"].get(le, 0) for le, value in entry["buckets"].items()}
+        report[stage] = {
+            "count": int(count),
+            "throughput_per_s": round(count / elapsed_s, 3),
+            "mean_ms": round((entry["sum"] - base["sum"]) / count * 1000, 3),
+            "p50_ms": round(histogram_quantile(0.5, buckets) * 1000, 3),
+            "p95_ms": round(histogram_quantile(0.95, buckets) * 1000, 3),
+            "p99_ms": round(histogram_quantile(0.99, buckets) * 1000, 3),
+        }
+    return report
+
+def percentiles(samples_ms):
+    samples = np.array(samples_ms) if samples_ms else np.array([0.0])
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p90_ms": round(float(np.percentile(samples, 90)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+        "max_ms": round(float(samples.max()), 3),
+    }
+
+# ---------------------------
+# LOAD
+# ---------------------------
+
+def run_session(base_url, session_id, iterations, deadline, latencies, errors, lock):
+    with httpx.Client(base_url=base_url, timeout=300) as client:
+        done = 0
+        while (iterations is None or done < iterations) and time.perf_counter() < deadline:
+            conversation = CONVERSATIONS[(session_id + done) % len(CONVERSATIONS)]
+            history = []
+            for query in conversation:
+                start = time.perf_counter()
+                try:
+                    response = client.post("/chat", json={"query": query, "history": history})
+                    response.raise_for_status()
+                    answer = response.json()["response"]
+                except Exception as e:
+                    with lock:
+                        errors.append(f"{query}: {e}")
+                    break
+                with lock:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                history += [{"role": "user", "content": query}, {"role": "assistant", "content": answer}]
+            done += 1
+
+def run_load(base_url, sessions, iterations=None, duration_s=None):
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + (duration_s or float("inf"))
+    with httpx.Client(base_url=base_url, timeout=30) as client:
+        before = scrape_stages(client)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            for session_id in range(sessions):
+                pool.submit(run_session, base_url, session_id, iterations, deadline, latencies, errors, lock)
+        elapsed = time.perf_counter() - start
+        after = scrape_stages(client)
+
+    return {
+        "sessions": sessions,
+        "elapsed_s": round(elapsed, 3),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "throughput_rps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+        "end_to_end": percentiles(latencies),
+        "stages": stage_report(before, after, elapsed),
+    }
+
+# ---------------------------
+# SPAWNED SERVERS
+# ---------------------------
+
+def wait_until_up(url, timeout_s=120):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        try:
+            if httpx.get(url, timeout=2).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"{url} did not come up within {timeout_s}s")
+
+def spawn_servers(standin_args):
+    """
+    Start the Ollama stand-in and a backend pointed at it (OLLAMA_HOST).
+    """
+    standin = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT_DIR, "benchmarks", "ollama_standin.py"),
+         "--port", str(SPAWN_STANDIN_PORT)] + standin_args, cwd=ROOT_DIR)
+    env = dict(os.environ, OLLAMA_HOST=f"http://127.0.0.1:{SPAWN_STANDIN_PORT}")
+    backend = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(SPAWN_BACKEND_PORT),
+         "--log-level", "warning"], cwd=ROOT_DIR, env=env)
+    wait_until_up(f"http://127.0.0.1:{SPAWN_STANDIN_PORT}/api/version")
+    wait_until_up(f"http://127.0.0.1:{SPAWN_BACKEND_PORT}/")
+    return [standin, backend]
+
+def print_report(report):
+    e2e = report["end_to_end"]
+    print(f"\n{report['requests']} requests, {report['errors']} errors in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s) with {report['sessions']} sessions")
+    print(f"end-to-end  p50 {e2e['p50_ms']:.1f} ms | p95 {e2e['p95_ms']:.1f} ms | p99 {e2e['p99_ms']:.1f} ms")
+    print(f"\n{'stage':<20} {'count':>7} {'per s':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    for stage, entry in report["stages"].items():
+        print(f"{stage:<20} {entry['count']:>7} {entry['throughput_per_s']:>8} {entry['mean_ms']:>9} "
+              f"{entry['p50_ms']:>9} {entry['p95_ms']:>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent /chat load test.")
+    parser.add_argument("--url", default=DEFAULT_BACKEND, help="Backend base URL")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent chat sessions")
+    parser.add_argument("--iterations", type=int, default=None, help="Conversations per session")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run (when --iterations is not set)")
+    parser.add_argument("--spawn", action="store_true",
+                        help=f"Start the Ollama stand-in (:{SPAWN_STANDIN_PORT}) and a backend (:{SPAWN_BACKEND_PORT}) for the run")
+    parser.add_argument("--standin-args", default="",
+                        help="Extra stand-in arguments with --spawn, e.g. '--latency-ms 500 --tokens-per-s 25'")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/chat-<timestamp>.json)")
+    args = parser.parse_args()
+
+    processes = []
+    url = args.url
+    try:
+        if args.spawn:
+            processes = spawn_servers(args.standin_args.split())
+            url = f"http://127.0.0.1:{SPAWN_BACKEND_PORT}"
+        report = run_load(url, args.sessions, args.iterations, None if args.iterations else args.duration)
+        if args.spawn:
+            report["standin"] = httpx.get(f"http://127.0.0.1:{SPAWN_STANDIN_PORT}/stats").json()
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+    report["created_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+    print_report(report)
+    output = args.output or os.path.join(RESULTS_DIR, f"chat-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
@@ -0,0 +1,226 @@
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+
+from backend.ai_engine.agent import run_pandas_query, plan_query
+from backend.ai_engine.executor import execute_query_plan
+from backend.ai_engine.data_version import manager
+
+GOLDEN_PATH = os.path.join(ROOT_DIR, "benchmarks", "golden", "planner_golden.json")
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+DEFAULT_WORKERS = 4
+DEFAULT_LIMIT = 5
+
+NUMBER_RE = re.compile(r"-?\d[\d,]*(?:\.\d+)?")
+OP_ALIASES = {"eq": "=", "==": "=", "ne": "!=", "not_in": "not in"}
+
+# ---------------------------
+# PLAN COMPARISON
+# ---------------------------
+
+def _normalize_value(value):
+    if isinstance(value, list):
+        return sorted(_normalize_value(v) for v in value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value).strip().lower()
+
+def normalize_plan(plan):
+    """
+    Canonical form of a plan: only fields that change the result, with
+    equivalent spellings (eq / =, list order, case, default limit) unified.
+    """
+    if not plan:
+        return {}
+    operation = plan.get("operation")
+    normalized = {"operation": operation}
+    if operation not in ("count", "group_count") and plan.get("metric"):
+        normalized["metric"] = plan["metric"]
+    group_by = plan.get("group_by")
+    if group_by:
+        normalized["group_by"] = [group_by] if isinstance(group_by, str) else list(group_by)
+    filters = {}
+    for col, condition in (plan.get("filters") or {}).items():
+        if isinstance(condition, dict) and condition.get("value") is not None:
+            op = str(condition.get("op", "=")).lower()
+            filters[col] = [OP_ALIASES.get(op, op), _normalize_value(condition["value"])]
+    if filters:
+        normalized["filters"] = filters
+    if operation in ("top_n", "bottom_n"):
+        normalized["limit"] = int(plan.get("limit", plan.get("n", DEFAULT_LIMIT)))
+    return normalized
+
+def plan_diff(expected, actual):
+    """
+    Fields whose normalized values differ (empty list = match).
+    """
+    expected, actual = normalize_plan(expected), normalize_plan(actual)
+    return sorted(key for key in set(expected) | set(actual) if expected.get(key) != actual.get(key))
+
+# ---------------------------
+# ANSWER CHECKING
+# ---------------------------
+
+def reference_answer(turn, df):
+    """
+    Expected result: a hand-written pandas expression over the full dataset
+    ('df'), a literal value, or else the expected plan run through the executor.
+    """
+    expected = turn.get("expected_answer")
+    if isinstance(expected, dict) and "pandas" in expected:
+        return eval(expected["pandas"], {"pd": pd, "np": np}, {"df": df})
+    if expected is not None:
+        return expected
+    return execute_query_plan({"dataset": "processed", **turn["expected_plan"]})
+
+def _numbers(text):
+    return [float(n.replace(",", "")) for n in NUMBER_RE.findall(text)]
+
+def _has_number(numbers, value):
+    return any(abs(n - value) <= max(0.5, abs(value) * 1e-6) for n in numbers)
+
+def answer_correct(response, expected):
+    """
+    Every expected number (and group label, for tables) must appear in the response.
+    """
+    numbers = _numbers(response)
+    if isinstance(expected, pd.Series):
+        expected = expected.reset_index()
+    if isinstance(expected, pd.DataFrame):
+        if expected.shape == (1, 1):
+            expected = expected.iloc[0, 0]
+        else:
+            text = response.lower()
+            for _, row in expected.iterrows():
+                for value in row:
+                    if isinstance(value, (int, float, np.number)):
+                        if not _has_number(numbers, float(value)):
+                            return False
+                    elif str(value).lower() not in text:
+                        return False
+            return True
+    if isinstance(expected, (int, float, np.number)):
+        return _has_number(numbers, float(expected))
+    return str(expected).lower() in response.lower()
+
+def expected_as_text(expected):
+    # Stand-in for the assistant turn in planner-only runs
+    if isinstance(expected, (pd.DataFrame, pd.Series)):
+        return expected.to_string()
+    return str(expected)
+
+# ---------------------------
+# RUNNER
+# ---------------------------
+
+def run_case(case, mode, df):
+    history = []
+    results = []
+    for turn in case["turns"]:
+        trace = {}
+        expected = reference_answer(turn, df)
+        start = time.perf_counter()
+        if mode == "plan":
+            outcome = plan_query(turn["query"], history, trace=trace)
+            response = outcome.get("reply") or expected_as_text(expected)
+        else:
+            response = run_pandas_query(turn["query"], history, trace=trace)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        diff = plan_diff(turn["expected_plan"], trace.get("plan"))
+        result = {
+            "case": case["id"],
+            "query": turn["query"],
+            "path": trace.get("path", "unknown"),
+            "llm_calls": trace.get("llm_calls", 0),
+            "latency_ms": round(latency_ms, 3),
+            "plan_match": not diff,
+            "plan_diff": diff,
+            "plan": trace.get("plan"),
+        }
+        if mode == "full":
+            result["answer_correct"] = answer_correct(response, expected)
+            result["response"] = response
+        results.append(result)
+        history += [{"role": "user", "content": turn["query"]}, {"role": "assistant", "content": response}]
+    return results
+
+def summarize(results, mode):
+    def latency(samples):
+        return {"count": len(samples),
+                "p50_ms": round(float(np.percentile(samples, 50)), 3),
+                "p95_ms": round(float(np.percentile(samples, 95)), 3)}
+
+    by_path = defaultdict(list)
+    for result in results:
+        by_path[result["path"]].append(result["latency_ms"])
+    report = {
+        "questions": len(results),
+        "plan_match_rate": round(sum(r["plan_match"] for r in results) / len(results), 4),
+        "llm_calls_per_question": round(sum(r["llm_calls"] for r in results) / len(results), 3),
+        "latency_by_path": {path: latency(samples) for path, samples in sorted(by_path.items())},
+        "latency_all": latency([r["latency_ms"] for r in results]),
+    }
+    if mode == "full":
+        report["answer_accuracy"] = round(sum(r["answer_correct"] for r in results) / len(results), 4)
+    return report
+
+def evaluate(golden, mode="full", workers=DEFAULT_WORKERS):
+    df = pd.read_parquet(manager.current().processed_path)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        per_case = list(pool.map(lambda case: run_case(case, mode, df), golden))
+    results = [result for case_results in per_case for result in case_results]
+    return summarize(results, mode), results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Golden-set evaluation of the chat planner.")
+    parser.add_argument("--golden", default=GOLDEN_PATH, help="Golden set JSON")
+    parser.add_argument("--mode", choices=["full", "plan"], default="full",
+                        help="'full' runs run_pandas_query end to end; 'plan' only the planner")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Cases evaluated in parallel")
+    parser.add_argument("--data-dir", default=None, help="Data folder to evaluate against (default: the backend's)")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/eval-<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.data_dir:
+        manager.use_data_dir(args.data_dir)
+    with open(args.golden) as f:
+        golden = json.load(f)
+
+    report, results = evaluate(golden, args.mode, args.workers)
+
+    for result in results:
+        status = "OK  " if result["plan_match"] and result.get("answer_correct", True) else "FAIL"
+        detail = f" plan diff: {result['plan_diff']}" if result["plan_diff"] else ""
+        if result.get("answer_correct") is False:
+            detail += " | wrong answer"
+        print(f"{status} [{result['path']}] {result['latency_ms']:>9.1f} ms  {result['query']}{detail}")
+
+    print(f"\nPlan match: {report['plan_match_rate']:.1%} of {report['questions']} questions")
+    if "answer_accuracy" in report:
+        print(f"Answer accuracy: {report['answer_accuracy']:.1%}")
+    print(f"LLM calls per question: {report['llm_calls_per_question']}")
+    for path, stats in report["latency_by_path"].items():
+        print(f"  {path:<10} n={stats['count']:<4} p50 {stats['p50_ms']:.1f} ms | p95 {stats['p95_ms']:.1f} ms")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"eval-{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"created_at": datetime.datetime.now().isoformat(timespec="seconds"), "mode": args.mode,
+                   "report": report, "results": results}, f, indent=2, default=str)
+    print(f"\nResults saved to {output}")
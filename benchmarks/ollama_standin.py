@@ -0,0 +1,259 @@
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import os
+import random
+import re
+import time
+from collections import Counter
+from typing import List, Optional
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# ---------------------------
+# CONFIG
+# ---------------------------
+
+RECORDINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "recordings", "chat.jsonl")
+DEFAULT_PORT = 11500
+DEFAULT_LATENCY_MS = 300
+DEFAULT_TOKENS_PER_S = 40.0
+DEFAULT_PARALLEL = 1
+
+PLANNER_MARKER = "DATA QUERY PLANNER"
+SUMMARY_MARKER = "Data Result:"
+DEFAULT_PLAN = '{"dataset": "processed", "operation": "count"}'
+TOKEN_RE = re.compile(r"\S+\s*|\s+")
+
+
+def classify(messages: List[dict]) -> str:
+    """
+    'planner' (system prompt + conversation), 'summary' (single instruction
+    carrying the data result) or 'other'.
+    """
+    if messages and messages[0].get("role") == "system" and PLANNER_MARKER in messages[0].get("content", ""):
+        return "planner"
+    if len(messages) == 1 and SUMMARY_MARKER in messages[0].get("content", ""):
+        return "summary"
+    return "other"
+
+
+def last_user_message(messages: List[dict]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message.get("content", "")
+    return ""
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def messages_hash(messages: List[dict]) -> str:
+    payload = json.dumps([[m.get("role"), m.get("content")] for m in messages])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def match_key(kind: str, messages: List[dict]) -> str:
+    if kind == "summary":
+        # The question line identifies the summary; the data result varies with the dataset
+        match = re.search(r'Question:\s*"(.*?)"', messages[0].get("content", ""))
+        return normalize(match.group(1)) if match else ""
+    return normalize(last_user_message(messages))
+
+
+class Recordings:
+    """
+    Recorded model responses (JSON lines), looked up by exact conversation
+    first and by (kind, last question) second.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.by_hash = {}
+        self.by_question = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    if line.strip():
+                        self._index(json.loads(line))
+
+    def _index(self, entry: dict):
+        if entry.get("hash"):
+            self.by_hash[entry["hash"]] = entry["response"]
+        self.by_question[(entry["kind"], normalize(entry["match"]))] = entry["response"]
+
+    def lookup(self, kind: str, messages: List[dict]) -> Optional[str]:
+        response = self.by_hash.get(messages_hash(messages))
+        if response is None:
+            response = self.by_question.get((kind, match_key(kind, messages)))
+        return response
+
+    def add(self, kind: str, messages: List[dict], response: str):
+        entry = {"kind": kind, "match": match_key(kind, messages), "hash": messages_hash(messages), "response": response}
+        self._index(entry)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def fallback_response(kind: str, messages: List[dict]) -> str:
+    if kind == "planner":
+        return DEFAULT_PLAN
+    if kind == "summary":
+        # Echo the data result, like a terse summarizer would
+        content = messages[0].get("content", "")
+        match = re.search(r"Data Result:\s*(.*?)\n\s*\n\s*Your Goal:", content, re.S) or \
+            re.search(r"Data Result:\s*(.*)", content)
+        return match.group(1).strip() if match else ""
+    return "OK"
+
+
+# ---------------------------
+# SERVER
+# ---------------------------
+
+def create_app(recordings: Recordings, latency_ms: float = DEFAULT_LATENCY_MS,
+               tokens_per_s: float = DEFAULT_TOKENS_PER_S, parallel: int = DEFAULT_PARALLEL,
+               jitter: float = 0.1, upstream: Optional[str] = None, seed: int = 0) -> FastAPI:
+    """
+    Ollama-compatible app (/api/chat, /api/generate, /api/tags, /api/version).
+    Replays recordings with a latency model: `latency_ms` before the first
+    token, then `tokens_per_s`; at most `parallel` generations at a time
+    (like OLLAMA_NUM_PARALLEL). With `upstream`, requests are forwarded to a
+    real Ollama and the responses recorded instead.
+    """
+    app = FastAPI()
+    slots = asyncio.Semaphore(parallel)
+    rng = random.Random(seed)
+    stats = Counter()
+
+    def jittered(seconds: float) -> float:
+        return max(0.0, seconds * (1 + rng.uniform(-jitter, jitter)))
+
+    async def respond(model: str, messages: List[dict], options: dict) -> tuple:
+        kind = classify(messages)
+        stats[f"requests_{kind}"] += 1
+        if upstream:
+            async with httpx.AsyncClient(base_url=upstream, timeout=600) as client:
+                r = await client.post("/api/chat", json={"model": model, "messages": messages,
+                                                         "stream": False, "options": options})
+                r.raise_for_status()
+            content = r.json()["message"]["content"]
+            recordings.add(kind, messages, content)
+            stats["recorded"] += 1
+            return content, False
+
+        content = recordings.lookup(kind, messages)
+        stats[f"replay_{'hits' if content is not None else 'misses'}_{kind}"] += 1
+        return (content if content is not None else fallback_response(kind, messages)), True
+
+    def chunk(model: str, content: str, done: bool, **extra) -> dict:
+        return {
+            "model": model,
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+            **extra,
+        }
+
+    def final_stats(messages: List[dict], tokens: List[str], started: float, first_token: float) -> dict:
+        now = time.perf_counter()
+        return {
+            "done_reason": "stop",
+            "total_duration": int((now - started) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": sum(len(m.get("content", "")) for m in messages) // 4,
+            "prompt_eval_duration": int((first_token - started) * 1e9),
+            "eval_count": len(tokens),
+            "eval_duration": int((now - first_token) * 1e9),
+        }
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        model = body.get("model", "")
+        messages = body.get("messages", [])
+        stream = body.get("stream", True)
+        started = time.perf_counter()
+
+        await slots.acquire()
+        handed_off = False
+        try:
+            content, simulate = await respond(model, messages, body.get("options") or {})
+            tokens = TOKEN_RE.findall(content)
+            if simulate:
+                await asyncio.sleep(jittered(latency_ms / 1000))
+            first_token = time.perf_counter()
+            if not stream:
+                if simulate:
+                    await asyncio.sleep(jittered(len(tokens) / tokens_per_s))
+                return JSONResponse(chunk(model, content, True, **final_stats(messages, tokens, started, first_token)))
+
+            async def generate():
+                # The slot is held until the last token, like a real runner
+                try:
+                    for token in tokens:
+                        if simulate:
+                            await asyncio.sleep(jittered(1 / tokens_per_s))
+                        yield json.dumps(chunk(model, token, False)) + "\n"
+                    yield json.dumps(chunk(model, "", True, **final_stats(messages, tokens, started, first_token))) + "\n"
+                finally:
+                    slots.release()
+
+            handed_off = True
+            return StreamingResponse(generate(), media_type="application/x-ndjson")
+        finally:
+            if not handed_off:
+                slots.release()
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        # Used for warm-up pings (empty prompt + keep_alive): load the 'model' and return
+        body = await request.json()
+        prompt = body.get("prompt", "")
+        stats["requests_generate"] += 1
+        messages = [{"role": "user", "content": prompt}]
+        content = "" if not prompt else fallback_response("other", messages)
+        return JSONResponse({"model": body.get("model", ""), "response": content, "done": True, "done_reason": "load" if not prompt else "stop"})
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "llama3.2:latest", "model": "llama3.2:latest"}]}
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-standin"}
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Ollama chat API stand-in with record/replay.")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--recordings", default=RECORDINGS_PATH, help="JSON lines file of recorded responses")
+    parser.add_argument("--latency-ms", type=float, default=DEFAULT_LATENCY_MS,
+                        help="Simulated time to first token")
+    parser.add_argument("--tokens-per-s", type=float, default=DEFAULT_TOKENS_PER_S,
+                        help="Simulated generation speed")
+    parser.add_argument("--parallel", type=int, default=DEFAULT_PARALLEL,
+                        help="Concurrent generations (OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Relative random jitter on simulated delays")
+    parser.add_argument("--record", metavar="UPSTREAM", default=None,
+                        help="Forward to a real Ollama (e.g. http://localhost:11434) and record the responses")
+    args = parser.parse_args()
+
+    app = create_app(Recordings(args.recordings), args.latency_ms, args.tokens_per_s, args.parallel,
+                     args.jitter, upstream=args.record)
+    mode = f"recording from {args.record}" if args.record else f"replaying {args.recordings}"
+    print(f"Ollama stand-in on :{args.port} ({mode}); point the backend at it with OLLAMA_HOST=http://localhost:{args.port}")
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
@@ -0,0 +1,375 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ETL_DIR = os.path.join(ROOT_DIR, "etl")
+sys.path.append(ROOT_DIR)
+sys.path.append(ETL_DIR)
+
+from synthetic_data import generate_dataset
+from excel_to_parquet import SHEET_NAME
+from publish import root_paths
+
+WORK_DIR = os.path.join(ROOT_DIR, "benchmarks", ".work")
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+BASELINE_PATH = os.path.join(ROOT_DIR, "benchmarks", "baseline.json")
+
+SUITES = ["details", "search", "executor", "etl"]
+DEFAULT_SCALES = [100_000, 1_000_000]
+DEFAULT_REPEAT = 5
+EXCEL_ROWS = 20_000
+
+# A case regresses when its median is this much slower than the baseline
+# (relative) and by more than the noise floor (absolute).
+REGRESSION_THRESHOLD = 0.2
+NOISE_FLOOR_MS = 2.0
+
+METRIC = "Open Qty Pcs"
+FILTER_VARIANTS = {
+    "none": None,
+    # partition key: prunes folders before reading
+    "partition_filter": {"Store Status": {"op": "=", "value": "Hold"}},
+    # regular column: full read, then mask
+    "column_filter": {"Division": {"op": "=", "value": "Men"}},
+}
+PLANS = {
+    "sum": {"operation": "sum", "metric": METRIC},
+    "count": {"operation": "count"},
+    "group_sum": {"operation": "group_sum", "group_by": ["Region"], "metric": METRIC},
+    "group_count": {"operation": "group_count", "group_by": ["Division"]},
+    "top_n": {"operation": "top_n", "group_by": ["Sitealias"], "metric": METRIC, "limit": 10},
+    "bottom_n": {"operation": "bottom_n", "group_by": ["Sitealias"], "metric": METRIC, "limit": 10},
+}
+
+# ---------------------------
+# TIMING
+# ---------------------------
+
+def measure(fn, repeat, warmup=1):
+    """
+    Runs fn warmup + repeat times; returns latency stats (ms) of the timed runs
+    and the last return value.
+    """
+    for _ in range(warmup):
+        result = fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples = np.array(samples)
+    stats = {
+        "median_ms": round(float(np.median(samples)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "min_ms": round(float(samples.min()), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+        "runs": int(repeat),
+    }
+    return stats, result
+
+# ---------------------------
+# WORKSPACE
+# ---------------------------
+
+def workspace(rows, seed):
+    return os.path.join(WORK_DIR, f"{rows}_s{seed}")
+
+def prepare_workspace(rows, seed, force=False):
+    """
+    Legacy-layout data folder (<workspace>/data) with a synthetic dataset.
+    Reused when it already holds the same rows and seed.
+    Returns (data_dir, generation seconds or None when reused).
+    """
+    data_dir = os.path.join(workspace(rows, seed), "data")
+    manifest_path = root_paths(data_dir)["manifest_path"]
+    if not force and os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get("rows") == rows and manifest.get("synthetic", {}).get("seed") == seed:
+            return data_dir, None
+
+    shutil.rmtree(workspace(rows, seed), ignore_errors=True)
+    os.makedirs(data_dir)
+    start = time.perf_counter()
+    generate_dataset(data_dir, rows, seed)
+    return data_dir, time.perf_counter() - start
+
+# ---------------------------
+# BACKEND SUITES
+# ---------------------------
+
+def bench_details(client, statuses, repeat):
+    results = {}
+    for status in statuses + ["Grand Total"]:
+        stats, response = measure(lambda: client.get(f"/details/{status}", params={"page": 1, "page_size": 1000}), repeat)
+        response.raise_for_status()
+        stats["total_rows"] = response.json()["total_rows"]
+        results[f"details/{status}"] = stats
+    return results
+
+def search_terms(data_dir):
+    """
+    Terms from very selective (one order) to unselective (matches most rows).
+    """
+    df = pd.read_parquet(root_paths(data_dir)["processed_path"], columns=["Orderkey", "Section"])
+    return {
+        "orderkey": str(df["Orderkey"].iloc[len(df) // 2]),
+        "section": str(df["Section"].value_counts().index[-1]),
+        "common": "store",
+        "no_match": "zzzz-no-such-value",
+    }
+
+def bench_search(client, data_dir, repeat):
+    results = {}
+    for status in ["Active", "Grand Total"]:
+        for label, term in search_terms(data_dir).items():
+            stats, response = measure(
+                lambda: client.get(f"/details/{status}", params={"page": 1, "page_size": 1000, "search": term}), repeat)
+            response.raise_for_status()
+            stats["total_rows"] = response.json()["total_rows"]
+            results[f"search/{status}/{label}"] = stats
+    return results
+
+def bench_executor(repeat):
+    from backend.ai_engine.executor import execute_query_plan
+
+    results = {}
+    for op, plan in PLANS.items():
+        for variant, filters in FILTER_VARIANTS.items():
+            full_plan = {"dataset": "processed", **plan, "filters": filters or {}}
+            stats, df = measure(lambda: execute_query_plan(full_plan), repeat)
+            stats["result_rows"] = len(df)
+            results[f"executor/{op}/{variant}"] = stats
+    return results
+
+def run_backend_suites(data_dir, suites, repeat):
+    from fastapi.testclient import TestClient
+    from backend.ai_engine.data_version import manager
+    import backend.main as backend_main
+
+    manager.use_data_dir(data_dir)
+    client = TestClient(backend_main.app)
+    statuses = [s for s in client.get("/summary").json() if s["Store Status"] != "Grand Total"]
+    statuses = [s["Store Status"] for s in statuses]
+
+    results = {}
+    if "details" in suites:
+        results.update(bench_details(client, statuses, repeat))
+    if "search" in suites:
+        results.update(bench_search(client, data_dir, repeat))
+    if "executor" in suites:
+        results.update(bench_executor(repeat))
+    return results
+
+# ---------------------------
+# ETL SUITE
+# ---------------------------
+
+def run_script(workdir, *args):
+    """
+    Run one ETL script the documented way (from a project-like root).
+    """
+    command = [sys.executable, os.path.join(ETL_DIR, args[0])] + list(args[1:])
+    completed = subprocess.run(command, cwd=workdir, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{completed.stdout[-2000:]}\n{completed.stderr[-2000:]}")
+
+def write_excel_sample(data_dir, path, rows):
+    """
+    Small 'Raw Data' workbook in the export's format (empty first row, Excel serial dates).
+    """
+    df = pd.read_parquet(root_paths(data_dir)["processed_path"]).head(rows)
+    df["Orderdate"] = (pd.to_datetime(df["Orderdate"]) - pd.Timestamp("1899-12-30")).dt.days
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    df.to_excel(path, sheet_name=SHEET_NAME, startrow=1, index=False)
+
+def write_incremental_extract(data_dir, path, seed):
+    """
+    Next-day extract: ~1% of lines change quantities, ~0.5% are closed, ~0.5% are new.
+    """
+    rng = np.random.default_rng(seed)
+    df = pd.read_parquet(root_paths(data_dir)["processed_path"])
+    changed = rng.random(len(df)) < 0.01
+    df.loc[changed, "Openqty"] = df.loc[changed, "Openqty"] + 1
+    df = df[rng.random(len(df)) >= 0.005]
+    new = df.sample(frac=0.005, random_state=seed).copy()
+    new["Set Barcode"] = "S$NEW" + pd.Series(range(len(new)), index=new.index).astype(str).str.zfill(10)
+    pd.concat([df, new], ignore_index=True).to_parquet(path, index=False)
+
+def bench_etl(data_dir, rows, seed, repeat, generation_s):
+    results = {}
+    workdir = os.path.dirname(data_dir)
+    if generation_s is not None:
+        results["etl/synthetic_data"] = {"median_ms": round(generation_s * 1000, 3), "runs": 1}
+
+    excel_path = os.path.join(workdir, "raw.xlsx")
+    write_excel_sample(data_dir, excel_path, min(rows, EXCEL_ROWS))
+    scripts = {
+        "excel_to_parquet": ("excel_to_parquet.py", excel_path, os.path.join(workdir, "raw.parquet")),
+        "excel_to_parquet_stream": ("excel_to_parquet.py", excel_path, os.path.join(workdir, "raw_stream.parquet"), "--stream"),
+        "transform_summary": ("transform_summary.py",),
+        "partition_by_status": ("partition_by_status.py",),
+        "pipeline": ("pipeline.py", "--no-publish"),
+        "parquet_layout": ("parquet_layout.py",),
+    }
+    for name, args in scripts.items():
+        stats, _ = measure(lambda: run_script(workdir, *args), repeat, warmup=0)
+        if name.startswith("excel_to_parquet"):
+            stats["rows"] = min(rows, EXCEL_ROWS)
+        results[f"etl/{name}"] = stats
+
+    # Incremental refresh rewrites the dataset: restore it before every run
+    extract_path = os.path.join(workdir, "extract.parquet")
+    write_incremental_extract(data_dir, extract_path, seed)
+    backup = os.path.join(workdir, "backup")
+    shutil.rmtree(backup, ignore_errors=True)
+    shutil.copytree(data_dir, backup)
+    samples = []
+    for _ in range(repeat):
+        shutil.rmtree(data_dir)
+        shutil.copytree(backup, data_dir)
+        start = time.perf_counter()
+        run_script(workdir, "incremental.py", extract_path, "--no-publish")
+        samples.append((time.perf_counter() - start) * 1000)
+    shutil.rmtree(data_dir)
+    shutil.move(backup, data_dir)
+    results["etl/incremental"] = {
+        "median_ms": round(float(np.median(samples)), 3),
+        "min_ms": round(float(np.min(samples)), 3),
+        "runs": int(repeat),
+    }
+    return results
+
+# ---------------------------
+# RESULTS / COMPARISON
+# ---------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD, noise_floor_ms=NOISE_FLOOR_MS):
+    """
+    Per-case median comparison. Returns a list of dicts with status
+    'regression', 'improvement', 'ok', 'new' or 'missing'.
+    """
+    rows = []
+    base_cases = baseline.get("cases", {})
+    cur_cases = current.get("cases", {})
+    for case in sorted(set(base_cases) | set(cur_cases)):
+        if case not in base_cases:
+            rows.append({"case": case, "status": "new", "current_ms": cur_cases[case]["median_ms"]})
+            continue
+        if case not in cur_cases:
+            rows.append({"case": case, "status": "missing", "baseline_ms": base_cases[case]["median_ms"]})
+            continue
+        base = base_cases[case]["median_ms"]
+        cur = cur_cases[case]["median_ms"]
+        change = (cur - base) / base if base else 0.0
+        status = "ok"
+        if abs(cur - base) > noise_floor_ms:
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+        rows.append({"case": case, "status": status, "baseline_ms": base, "current_ms": cur,
+                     "change": round(change, 4)})
+    return rows
+
+def print_comparison(rows):
+    print(f"\n{'case':<60} {'baseline':>10} {'current':>10} {'change':>8}  status")
+    for row in rows:
+        change = f"{row['change']:+.1%}" if "change" in row else ""
+        print(f"{row['case']:<60} {row.get('baseline_ms', ''):>10} {row.get('current_ms', ''):>10} {change:>8}  {row['status']}")
+    regressions = [row for row in rows if row["status"] == "regression"]
+    print(f"\n{len(regressions)} regression(s), "
+          f"{sum(row['status'] == 'improvement' for row in rows)} improvement(s)")
+    return regressions
+
+def run(scales, suites, repeat, seed, regenerate=False):
+    results = {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "repeat": repeat,
+        "cases": {},
+    }
+    for rows in scales:
+        print(f"\n=== {rows:,} rows ===")
+        data_dir, generation_s = prepare_workspace(rows, seed, force=regenerate or "etl" in suites)
+        cases = run_backend_suites(data_dir, suites, repeat)
+        if "etl" in suites:
+            cases.update(bench_etl(data_dir, rows, seed, repeat, generation_s))
+        for case, stats in cases.items():
+            print(f"  {case:<55} {stats['median_ms']:>10.2f} ms")
+            results["cases"][f"{rows}/{case}"] = stats
+    return results
+
+def parse_list(value, cast=str):
+    return [cast(item) for item in value.split(",") if item]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks for /details, search, the query executor and the ETL scripts.")
+    parser.add_argument("--scales", type=lambda v: parse_list(v, int), default=DEFAULT_SCALES,
+                        help="Comma-separated synthetic dataset sizes (rows)")
+    parser.add_argument("--suites", type=parse_list, default=SUITES,
+                        help=f"Comma-separated subset of {','.join(SUITES)}")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per case")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--regenerate", action="store_true", help="Regenerate cached synthetic datasets")
+    parser.add_argument("--output", default=None, help="Results JSON (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=None,
+                        help="Compare against this results JSON; exits 1 on regressions")
+    parser.add_argument("--save-baseline", action="store_true", help=f"Also save the results as {BASELINE_PATH}")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"),
+                        help="Only compare two existing results files")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown of the median that counts as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        sys.exit(1 if print_comparison(compare(baseline, current, args.threshold)) else 0)
+
+    unknown = [s for s in args.suites if s not in SUITES]
+    if unknown:
+        print(f"Error: unknown suite(s) {unknown}; choose from {SUITES}")
+        sys.exit(1)
+
+    results = run(args.scales, args.suites, args.repeat, args.seed, args.regenerate)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to {output}")
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if print_comparison(compare(baseline, results, args.threshold)):
+            sys.exit(1)
@@ -0,0 +1,115 @@
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import sys
+
+# Low-cardinality dimensions that get one bitmap per distinct value
+BITMAP_COLS = ['Store Status', 'Region', 'Zone', 'Division', 'Section', 'Department',
+               'Ageing_Group', 'Month', 'Warehouse', 'Seasonal Flag']
+
+# Roaring layout: rows are split into chunks of 2^16; in each chunk a value's
+# rows are stored as sorted 16-bit offsets (at most 4096 of them) or as a
+# 65536-bit bitmap, whichever is smaller
+CHUNK_BITS = 16
+CHUNK_ROWS = 1 << CHUNK_BITS
+ARRAY_MAX = 4096
+
+ROWS_METADATA = b"processed_rows"
+BYTES_METADATA = b"processed_bytes"
+COLUMNS_METADATA = b"bitmap_columns"
+
+def build_containers(values, chunk):
+    """
+    Containers of one column in one chunk of CHUNK_ROWS rows: (Value, Chunk,
+    Kind, Cardinality, Data) per value present. `values` are the chunk's
+    values as strings, in file order.
+    """
+    codes, uniques = pd.factorize(values, sort=True)
+    # Offsets grouped by value, ascending within each value
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    bounds = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1], True])
+    records = []
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        offsets = order[begin:end].astype(np.uint16)
+        if end - begin <= ARRAY_MAX:
+            kind, data = 'array', offsets.tobytes()
+        else:
+            bits = np.zeros(CHUNK_ROWS, dtype=bool)
+            bits[offsets] = True
+            kind, data = 'bitmap', np.packbits(bits, bitorder='little').tobytes()
+        records.append((uniques[sorted_codes[begin]], chunk, kind, end - begin, data))
+    return records
+
+def iter_chunks(parquet, columns):
+    """
+    The processed file's `columns` in consecutive chunks of CHUNK_ROWS rows,
+    read one row group at a time (row groups need not line up with chunks).
+    """
+    pending, pending_rows = [], 0
+    for row_group in range(parquet.num_row_groups):
+        pending.append(parquet.read_row_group(row_group, columns=columns))
+        pending_rows += pending[-1].num_rows
+        while pending_rows >= CHUNK_ROWS:
+            table = pa.concat_tables(pending)
+            yield table.slice(0, CHUNK_ROWS)
+            pending, pending_rows = [table.slice(CHUNK_ROWS)], pending_rows - CHUNK_ROWS
+    if pending_rows:
+        yield pa.concat_tables(pending)
+
+def build_bitmaps(processed_path, columns=BITMAP_COLS):
+    """
+    Bitmap containers of every value of `columns`, over row positions of the
+    processed file as written (so this runs after the file is in place).
+    Values are keyed by their string form, as the filters compare them. The
+    file is read a chunk at a time, so only the containers are held.
+    """
+    parquet = pq.ParquetFile(processed_path)
+    columns = [col for col in columns if col in parquet.schema_arrow.names]
+    records = {col: [] for col in columns}
+    for chunk, table in enumerate(iter_chunks(parquet, columns)):
+        df = table.to_pandas()
+        for col in columns:
+            records[col].extend(build_containers(df[col].astype(str).to_numpy(), chunk))
+    frames = [pd.DataFrame(records[col], columns=['Value', 'Chunk', 'Kind', 'Cardinality', 'Data']).assign(Column=col)
+              for col in columns if records[col]]
+    bitmaps = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['Value', 'Chunk', 'Kind', 'Cardinality', 'Data', 'Column'])
+    bitmaps = bitmaps[['Column', 'Value', 'Chunk', 'Kind', 'Cardinality', 'Data']]
+    return bitmaps.astype({'Chunk': 'int32', 'Cardinality': 'int32'}), parquet.metadata.num_rows, columns
+
+def write_bitmaps(processed_path, output_path, columns=BITMAP_COLS):
+    """
+    Build and persist the bitmaps next to the other transformed outputs, with
+    the processed file's row count and size in the metadata (to detect a
+    stale index) and the indexed columns.
+    """
+    bitmaps, processed_rows, indexed = build_bitmaps(processed_path, columns)
+    table = pa.Table.from_pandas(bitmaps, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           ROWS_METADATA: str(processed_rows).encode(),
+                                           BYTES_METADATA: str(os.path.getsize(processed_path)).encode(),
+                                           COLUMNS_METADATA: json.dumps(indexed).encode()})
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, output_path)
+    return len(bitmaps)
+
+if __name__ == "__main__":
+    input_path = "data/processed/SO_Order_Ageing.parquet"
+    output_path = "data/transformed/bitmaps.parquet"
+
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        sys.exit(1)
+
+    try:
+        containers = write_bitmaps(input_path, output_path)
+        print(f"Bitmap index saved to {output_path} ({containers} containers)")
+    except Exception as e:
+        print(f"Error building bitmap index: {e}")
+        sys.exit(1)
@@ -1,32 +1,56 @@
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import argparse
+import datetime
 import sys
 import os
+import time
+
+from so_schema import PROCESSED_SCHEMA, INT_COLUMNS
+
+SHEET_NAME = 'Raw Data'
+HEADER_ROW = 1  # header is the second row, the first one is empty
+DEFAULT_CHUNK_SIZE = 50_000
+EXCEL_EPOCH = datetime.datetime(1899, 12, 30)
+
+def read_raw_data(input_file):
+    """
+    Reads the 'Raw Data' sheet of an Excel export into a DataFrame.
+    """
+    # Determine engine based on file extension
+    file_ext = os.path.splitext(input_file)[1].lower()
+    engine = 'openpyxl'
+    if file_ext == '.xlsb':
+        engine = 'pyxlsb'
+        
+    print(f"Reading Excel file: {input_file} (Engine: {engine})...")
+    print("Reading sheet 'Raw Data' with header at row 1...")
+    
+    # Read Excel file
+    # Using specific sheet 'Raw Data' and header=1 (skipping first empty row)
+    return pd.read_excel(input_file, engine=engine, sheet_name=SHEET_NAME, header=HEADER_ROW)
+
+def clean_object_columns(df):
+    """
+    Convert object columns to string to ensure PyArrow compatibility.
+    Ensure missing values are empty strings, not the string 'nan'.
+    """
+    for col in df.columns:
+        if df[col].dtype == 'object' or df[col].dtype.name == 'category':
+            df[col] = df[col].fillna("").astype(str).replace("nan", "")
+    return df
 
 def convert_excel_to_parquet(input_file, output_file):
     """
     Converts an Excel file to Parquet format.
     """
     try:
-        # Determine engine based on file extension
-        file_ext = os.path.splitext(input_file)[1].lower()
-        engine = 'openpyxl'
-        if file_ext == '.xlsb':
-            engine = 'pyxlsb'
-            
-        print(f"Reading Excel file: {input_file} (Engine: {engine})...")
-        print("Reading sheet 'Raw Data' with header at row 1...")
-        
-        # Read Excel file
-        # Using specific sheet 'Raw Data' and header=1 (skipping first empty row)
-        df = pd.read_excel(input_file, engine=engine, sheet_name='Raw Data', header=1)
+        df = read_raw_data(input_file)
         
         print(f"Data shape: {df.shape}")
         
-        # Convert object columns to string to ensure PyArrow compatibility
-        # Ensure missing values are empty strings, not the string 'nan'
-        for col in df.columns:
-            if df[col].dtype == 'object' or df[col].dtype.name == 'category':
-                df[col] = df[col].fillna("").astype(str).replace("nan", "")
+        df = clean_object_columns(df)
                 
         print(f"Writing Parquet file: {output_file}...")
         # Save as Parquet
@@ -36,16 +60,148 @@ def convert_excel_to_parquet(input_file, output_file):
         print(f"Error converting file: {e}")
         sys.exit(1)
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Usage: python excel_to_parquet.py <input_excel_file> <output_parquet_file>")
+# ---------------------------
+# STREAMING CONVERSION
+# ---------------------------
+
+def iter_sheet_rows(input_file):
+    """
+    Yields the 'Raw Data' sheet row by row as lists of raw cell values,
+    without materializing the sheet.
+    """
+    file_ext = os.path.splitext(input_file)[1].lower()
+    if file_ext == '.xlsb':
+        from pyxlsb import open_workbook
+        with open_workbook(input_file) as wb:
+            with wb.get_sheet(SHEET_NAME) as sheet:
+                for row in sheet.rows():
+                    yield [cell.v for cell in row]
+    else:
+        from openpyxl import load_workbook
+        wb = load_workbook(input_file, read_only=True, data_only=True)
+        try:
+            for row in wb[SHEET_NAME].iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            wb.close()
+
+def _to_text(value):
+    # Mirrors read_excel + clean_object_columns: integral floats print as ints,
+    # blanks and 'nan' become empty strings.
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if value != value:
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    text = str(value)
+    return "" if text == "nan" else text
+
+def _to_number(value):
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime.datetime):
+        # openpyxl decodes date-formatted cells; keep the Excel serial like .xlsb does
+        return (value - EXCEL_EPOCH).days
+    if isinstance(value, str):
+        value = float(value.strip())
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+def rows_to_table(rows, positions, schema=PROCESSED_SCHEMA):
+    """
+    Builds an Arrow table with the fixed schema from a chunk of raw rows.
+    """
+    arrays = []
+    for field in schema:
+        idx = positions[field.name]
+        if field.name in INT_COLUMNS:
+            values = [_to_number(row[idx]) if idx < len(row) else None for row in rows]
+        else:
+            values = [_to_text(row[idx]) if idx < len(row) else "" for row in rows]
+        try:
+            arrays.append(pa.array(values, type=field.type))
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Column '{field.name}' does not match type {field.type}: {e}")
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def convert_excel_to_parquet_streaming(input_file, output_file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Converts an Excel file to Parquet in bounded memory.
+    Rows are read in chunks and written as Parquet row groups, so peak memory
+    depends on chunk_size, not on the size of the sheet.
+    """
+    try:
+        print(f"Streaming Excel file: {input_file} (chunk size: {chunk_size:,} rows)...")
+        rows_iter = iter_sheet_rows(input_file)
+
+        # Skip to the header row
+        header = None
+        for i, row in enumerate(rows_iter):
+            if i == HEADER_ROW:
+                header = [str(h) if h is not None else "" for h in row]
+                break
+        if header is None:
+            raise ValueError(f"Sheet '{SHEET_NAME}' has no header row")
+
+        positions = {name: idx for idx, name in reversed(list(enumerate(header)))}
+        missing = [field.name for field in PROCESSED_SCHEMA if field.name not in positions]
+        if missing:
+            raise ValueError(f"Missing columns in '{SHEET_NAME}': {missing}")
+        extra = [name for name in header if name and name not in PROCESSED_SCHEMA.names]
+        if extra:
+            print(f"Ignoring columns not in schema: {extra}")
+
+        total_rows = 0
+        start = time.perf_counter()
+        with pq.ParquetWriter(output_file, PROCESSED_SCHEMA) as writer:
+            chunk = []
+            for row in rows_iter:
+                # Skip fully empty rows (trailing formatting in the export)
+                if not any(v is not None and v != "" for v in row):
+                    continue
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    writer.write_table(rows_to_table(chunk, positions), row_group_size=chunk_size)
+                    total_rows += len(chunk)
+                    chunk = []
+                    elapsed = time.perf_counter() - start
+                    print(f"  {total_rows:,} rows written ({total_rows / elapsed:,.0f} rows/s)")
+            if chunk:
+                writer.write_table(rows_to_table(chunk, positions), row_group_size=chunk_size)
+                total_rows += len(chunk)
+
+        elapsed = time.perf_counter() - start
+        rate = total_rows / elapsed if elapsed > 0 else 0
+        print(f"Successfully converted '{input_file}' to '{output_file}': "
+              f"{total_rows:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    except Exception as e:
+        print(f"Error converting file: {e}")
         sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert the SO Order Ageing Excel export to Parquet.")
+    parser.add_argument("input_excel_file")
+    parser.add_argument("output_parquet_file")
+    parser.add_argument("--stream", action="store_true",
+                        help="Read rows in chunks and write row groups incrementally (bounded memory)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Rows per chunk / row group in streaming mode")
+    args = parser.parse_args()
     
-    input_path = sys.argv[1]
-    output_path = sys.argv[2]
+    input_path = args.input_excel_file
+    output_path = args.output_parquet_file
     
     if not os.path.exists(input_path):
         print(f"Error: Input file '{input_path}' not found.")
         sys.exit(1)
         
-    convert_excel_to_parquet(input_path, output_path)
+    if args.stream:
+        convert_excel_to_parquet_streaming(input_path, output_path, chunk_size=args.chunk_size)
+    else:
+        convert_excel_to_parquet(input_path, output_path)
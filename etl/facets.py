@@ -0,0 +1,91 @@
+import pandas as pd
+import os
+import sys
+
+from transform_summary import GROUP_COL, NUMERIC_COLS
+
+# Dashboard filter columns (and the values the chat planner is told about)
+FACET_COLS = ['Region', 'Division', 'Zone', 'Warehouse', 'Ageing_Group', 'Month', 'Seasonal Flag']
+FACET_KEYS = [GROUP_COL, 'Column', 'Value']
+
+def build_facets(df):
+    """
+    Long table of distinct values per facet column and Store Status, with
+    row counts and quantity sums:
+    Store Status | Column | Value | Rows | Open Qty Pcs | ...
+    Rows are additive, so any status scope (or the Grand Total) is a sum
+    over the matching Store Status rows.
+    """
+    numeric_cols = [col for col in NUMERIC_COLS if col in df.columns]
+    # int64 sums: the processed file stores downcast ints that would overflow
+    quantities = df[numeric_cols].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int64')
+    quantities['Rows'] = 1
+    frames = []
+    for col in [c for c in FACET_COLS if c in df.columns]:
+        # Group on the stored (often categorical) columns; only the result is stringified
+        facet = quantities.groupby([df[GROUP_COL], df[col]], observed=True, dropna=False).sum()
+        facet.index.names = [GROUP_COL, 'Value']
+        facet = facet.reset_index()
+        facet[GROUP_COL] = facet[GROUP_COL].astype(str)
+        facet['Value'] = facet['Value'].astype(str)
+        facet.insert(1, 'Column', col)
+        frames.append(facet[FACET_KEYS + ['Rows'] + numeric_cols])
+    if not frames:
+        return pd.DataFrame(columns=FACET_KEYS + ['Rows'] + numeric_cols)
+    return pd.concat(frames, ignore_index=True)
+
+def combine_facets(frames):
+    """
+    Merge facet tables built from disjoint chunks of rows.
+    """
+    facets = pd.concat(frames, ignore_index=True)
+    value_cols = [col for col in facets.columns if col not in FACET_KEYS]
+    return facets.groupby(FACET_KEYS, observed=True)[value_cols].sum().reset_index()
+
+def update_facets(facets_path, new_df, touched_statuses):
+    """
+    Recompute the facets of the touched Store Statuses only and keep the
+    others from the existing table.
+    """
+    fresh = build_facets(new_df[new_df[GROUP_COL].isin(touched_statuses)])
+    if os.path.exists(facets_path):
+        existing = pd.read_parquet(facets_path)
+        kept = existing[~existing[GROUP_COL].isin(touched_statuses)]
+        facets = pd.concat([kept, fresh], ignore_index=True)
+    else:
+        facets = build_facets(new_df)
+    facets = facets.sort_values(FACET_KEYS).reset_index(drop=True)
+    write_facets(facets, facets_path)
+    return facets
+
+def write_facets(facets, output_path):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    facets.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+
+def transform_facets():
+    """
+    Build the facet table from the processed data.
+    """
+    input_path = "data/processed/SO_Order_Ageing.parquet"
+    output_path = "data/transformed/facets.parquet"
+
+    print(f"Reading data from {input_path}...")
+
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        sys.exit(1)
+
+    try:
+        df = pd.read_parquet(input_path, columns=[GROUP_COL] + FACET_COLS + NUMERIC_COLS)
+        facets = build_facets(df)
+        print(f"Facets computed: {len(facets)} rows over {facets['Column'].nunique()} columns")
+        write_facets(facets, output_path)
+        print(f"Facets saved to {output_path}")
+    except Exception as e:
+        print(f"Error building facets: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    transform_facets()
@@ -0,0 +1,218 @@
+import pandas as pd
+import os
+import sys
+import shutil
+import time
+import argparse
+
+from pipeline import PROCESSED_PATH, PARTITIONED_DIR, SUMMARY_PATH, FACETS_PATH, ORDER_INDEX_PATH, ROLLUPS_PATH, SAMPLE_PATH, BITMAPS_PATH, load_source
+from transform_summary import GROUP_COL, build_summary, write_summary
+from facets import update_facets
+from order_index import write_order_index
+from bitmaps import write_bitmaps
+from rollups import update_rollups
+from sample import update_sample
+from partition_by_status import (
+    PARTITION_COL, PARTITION_KEYS, split_by_keys, write_partition, partition_relpath,
+    partition_label, read_partitioning,
+)
+from parquet_layout import normalize_frame, write_parquet
+from manifest import MANIFEST_PATH, load_manifest, write_manifest, bump_manifest
+from publish import root_paths, current_root, stage_version, publish, prune_versions
+from snapshots import SNAPSHOT_DIR, diff_extract, append_snapshot
+
+DELTA_DIR = "data/processed/deltas"
+
+def touched_partitions(frames, keys):
+    """
+    Distinct partition key tuples (as strings) present in any of the frames.
+    """
+    touched = set()
+    for frame in frames:
+        for values in frame[keys].astype(str).drop_duplicates().itertuples(index=False, name=None):
+            touched.add(values)
+    return touched
+
+def write_delta(new_rows, changed_rows, deleted_rows, version, delta_dir=DELTA_DIR):
+    """
+    Persist only the rows that changed, tagged with the kind of change.
+    """
+    os.makedirs(delta_dir, exist_ok=True)
+    delta = pd.concat([
+        new_rows.assign(_change="new"),
+        changed_rows.assign(_change="changed"),
+        deleted_rows.assign(_change="deleted"),
+    ], ignore_index=True)
+    path = os.path.join(delta_dir, f"delta_v{version}.parquet")
+    delta.to_parquet(path, index=False)
+    return path
+
+def update_summary(summary_path, new_df, touched_statuses):
+    """
+    Recompute only the touched Store Status rows, reuse the others, and
+    recompute the Grand Total from the combined rows.
+    """
+    fresh = build_summary(new_df[new_df[GROUP_COL].isin(touched_statuses)])
+    fresh = fresh[fresh[GROUP_COL] != 'Grand Total']
+
+    if os.path.exists(summary_path):
+        existing = pd.read_parquet(summary_path)
+        kept = existing[~existing[GROUP_COL].isin(list(touched_statuses) + ['Grand Total'])]
+    else:
+        kept = fresh.iloc[0:0]
+
+    summary = pd.concat([kept, fresh], ignore_index=True)
+    summary = summary.sort_values(GROUP_COL).reset_index(drop=True)
+    numeric_cols = [col for col in summary.columns if col != GROUP_COL]
+    total_row = pd.DataFrame(summary[numeric_cols].sum()).T
+    total_row[GROUP_COL] = 'Grand Total'
+    summary = pd.concat([summary, total_row], ignore_index=True)
+    write_summary(summary, summary_path)
+    return summary
+
+def run_incremental(source_path, processed_path=PROCESSED_PATH, partitioned_dir=PARTITIONED_DIR,
+                    summary_path=SUMMARY_PATH, facets_path=FACETS_PATH, order_index_path=ORDER_INDEX_PATH,
+                    rollups_path=ROLLUPS_PATH, sample_path=SAMPLE_PATH, bitmaps_path=BITMAPS_PATH,
+                    manifest_path=MANIFEST_PATH, delta_dir=DELTA_DIR, snapshot_dir=None, snapshot_date=None):
+    """
+    Incremental refresh keyed by Orderkey + Set Barcode.
+    Only the partitions (per the recorded partition keys), summary rows,
+    facet counts, Store Status rollups and sample strata touched by the delta
+    are rewritten; the manifest records which outputs
+    got a new version. With `snapshot_dir`, the extract is also recorded as
+    the snapshot of `snapshot_date` (default: today), changed or not.
+    """
+    start = time.perf_counter()
+
+    if not os.path.exists(processed_path):
+        raise FileNotFoundError(f"No current dataset at {processed_path}; run the full pipeline first")
+
+    print(f"Reading current dataset: {processed_path}...")
+    current_df = pd.read_parquet(processed_path)
+    print(f"Reading new extract: {source_path}...")
+    new_df, _ = load_source(source_path)
+
+    missing = [col for col in current_df.columns if col not in new_df.columns]
+    if missing:
+        raise ValueError(f"New extract is missing columns: {missing}")
+    # Compare both sides in the same physical types (dates, categoricals, downcast ints)
+    current_df = normalize_frame(current_df)
+    new_df = normalize_frame(new_df[list(current_df.columns)])
+
+    new_rows, changed_rows, deleted_rows, changed_old_rows = diff_extract(current_df, new_df)
+    delta_counts = {"new": len(new_rows), "changed": len(changed_rows), "deleted": len(deleted_rows)}
+    print(f"Delta: {delta_counts['new']} new, {delta_counts['changed']} changed, {delta_counts['deleted']} deleted")
+
+    manifest = load_manifest(manifest_path)
+    if not any(delta_counts.values()):
+        print(f"No changes; dataset stays at version {manifest.get('dataset_version', 0)}")
+        if snapshot_dir:
+            append_snapshot(new_df, snapshot_dir, snapshot_date)
+        return manifest
+
+    partitioning = read_partitioning(partitioned_dir) or {}
+    keys = partitioning.get("keys", PARTITION_KEYS)
+    delta_frames = [new_rows, changed_rows, deleted_rows, changed_old_rows]
+    touched = touched_partitions(delta_frames, keys)
+    touched_statuses = {values[0] for values in touched_partitions(delta_frames, [PARTITION_COL])}
+    print(f"Touched partitions: {sorted(partition_label(values) for values in touched)}")
+
+    version = manifest.get("dataset_version", 0) + 1
+    delta_path = write_delta(new_rows, changed_rows, deleted_rows, version, delta_dir)
+    print(f"Delta rows written to {delta_path}")
+
+    # The processed file is what Grand Total and the chat executor read, so it
+    # must stay a single complete snapshot.
+    write_parquet(new_df, processed_path)
+    # Row positions change with the rewrite
+    write_order_index(processed_path, order_index_path)
+    write_bitmaps(processed_path, bitmaps_path)
+
+    in_touched = [values in touched for values in new_df[keys].astype(str).itertuples(index=False, name=None)]
+    touched_df = new_df[in_touched]
+    rebuilt = set()
+    for values, group_df in split_by_keys(touched_df, keys):
+        write_partition(values, group_df, partitioned_dir, keys)
+        rebuilt.add(tuple(str(v) for v in values))
+        print(f"  [OK] {partition_label(values)}: {len(group_df)} rows (rebuilt)")
+
+    # Partitions with no rows left are removed
+    removed = touched - rebuilt
+    for values in removed:
+        folder = os.path.join(partitioned_dir, partition_relpath(keys, values))
+        if os.path.exists(folder):
+            shutil.rmtree(folder)
+        print(f"  [OK] {partition_label(values)}: removed")
+
+    update_summary(summary_path, new_df, touched_statuses)
+    update_facets(facets_path, new_df, touched_statuses)
+    update_rollups(rollups_path, new_df, touched_statuses)
+    update_sample(sample_path, new_df, touched_statuses)
+
+    manifest = bump_manifest(
+        manifest, "incremental", len(new_df),
+        [partition_label(values) for values in rebuilt],
+        [partition_label(values) for values in removed],
+        delta=delta_counts,
+    )
+    write_manifest(manifest, manifest_path)
+    if snapshot_dir:
+        append_snapshot(new_df, snapshot_dir, snapshot_date)
+
+    print(f"Dataset version: {manifest['dataset_version']} ({time.perf_counter() - start:.2f}s)")
+    return manifest
+
+def run_incremental_published(source_path, delta_dir=DELTA_DIR, snapshot_dir=SNAPSHOT_DIR, snapshot_date=None):
+    """
+    Incremental refresh into a new data version: the current version is
+    hard-linked into data/versions/v<N>/, only touched files are replaced,
+    then the 'CURRENT' pointer is flipped. Nothing is published if the
+    extract has no changes.
+    """
+    base = current_root()
+    previous = load_manifest(root_paths(base)["manifest_path"])
+    stage = stage_version(previous.get("dataset_version", 0) + 1, base_root=base)
+
+    try:
+        manifest = run_incremental(source_path, delta_dir=delta_dir, snapshot_dir=snapshot_dir,
+                                   snapshot_date=snapshot_date, **root_paths(stage))
+    except Exception:
+        shutil.rmtree(stage, ignore_errors=True)
+        raise
+
+    if manifest.get("dataset_version") == previous.get("dataset_version"):
+        shutil.rmtree(stage, ignore_errors=True)
+        return manifest
+
+    publish(stage)
+    prune_versions()
+    print(f"Published {stage} as current")
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incremental refresh keyed by Orderkey + Set Barcode.")
+    parser.add_argument("new_extract", help="New extract (.xlsb/.xlsx/.parquet)")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="Update the legacy data/processed + data/transformed paths in place")
+    parser.add_argument("--snapshot-date", default=None,
+                        help="Date the extract is recorded under in data/snapshots (YYYY-MM-DD, default: today)")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Don't record the extract in the daily snapshot store")
+    args = parser.parse_args()
+    snapshot_dir = None if args.no_snapshot else SNAPSHOT_DIR
+
+    source = args.new_extract
+    if not os.path.exists(source):
+        print(f"Error: Input file '{source}' not found.")
+        sys.exit(1)
+
+    try:
+        if args.no_publish:
+            run_incremental(source, snapshot_dir=snapshot_dir, snapshot_date=args.snapshot_date)
+        else:
+            run_incremental_published(source, snapshot_dir=snapshot_dir, snapshot_date=args.snapshot_date)
+    except Exception as e:
+        print(f"Error during incremental refresh: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
@@ -0,0 +1,50 @@
+import json
+import os
+import datetime
+
+MANIFEST_PATH = "data/transformed/manifest.json"
+
+def load_manifest(path=MANIFEST_PATH):
+    """
+    Load the dataset manifest, or an empty version-0 manifest if none exists yet.
+    """
+    if not os.path.exists(path):
+        return {"dataset_version": 0, "processed_version": 0, "summary_version": 0, "partitions": {}}
+    with open(path) as f:
+        return json.load(f)
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    """
+    Write the manifest atomically (temp file + rename) so readers never see a
+    half-written file.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def bump_manifest(manifest, mode, rows, touched_partitions, removed_partitions=(),
+                  summary_changed=True, processed_changed=True, delta=None):
+    """
+    Return a new manifest with the dataset version incremented.
+    Only the outputs that were rewritten get the new version number, so a
+    consumer can invalidate exactly the partitions / summary that changed.
+    """
+    version = manifest.get("dataset_version", 0) + 1
+    partitions = dict(manifest.get("partitions", {}))
+    for status in removed_partitions:
+        partitions.pop(status, None)
+    for status in touched_partitions:
+        partitions[status] = version
+
+    return {
+        "dataset_version": version,
+        "processed_version": version if processed_changed else manifest.get("processed_version", 0),
+        "summary_version": version if summary_changed else manifest.get("summary_version", 0),
+        "partitions": partitions,
+        "mode": mode,
+        "rows": int(rows),
+        "delta": delta or {},
+        "updated_at": datetime.datetime.now().isoformat(timespec="seconds"),
+    }
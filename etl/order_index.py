@@ -0,0 +1,76 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import os
+import sys
+
+INDEX_KEYS = ['Orderkey', 'Set Barcode']
+ROWS_METADATA = b"processed_rows"
+BYTES_METADATA = b"processed_bytes"
+
+def build_order_index(processed_path):
+    """
+    Position of every Orderkey / Set Barcode in the processed file:
+    Kind | Key | Row Group | Row, sorted by (Kind, Key) so the lines of one
+    order are contiguous. Positions refer to the file as written, so this
+    runs after the processed file is in place. Read one row group at a time
+    and kept as Arrow strings, so memory is the index itself rather than the
+    processed file or a Python object per key.
+    """
+    parquet = pq.ParquetFile(processed_path)
+    keys = {kind: [] for kind in INDEX_KEYS}
+    row_groups, rows = [], []
+    for row_group in range(parquet.num_row_groups):
+        table = parquet.read_row_group(row_group, columns=INDEX_KEYS)
+        for kind in INDEX_KEYS:
+            keys[kind].append(pc.cast(table[kind].combine_chunks(), pa.large_string()))
+        row_groups.append(np.full(table.num_rows, row_group, dtype=np.int32))
+        rows.append(np.arange(table.num_rows, dtype=np.int32))
+    row_groups = pa.array(np.concatenate(row_groups) if row_groups else np.array([], dtype=np.int32))
+    rows = pa.array(np.concatenate(rows) if rows else np.array([], dtype=np.int32))
+
+    # Kind in sorted order, then each kind's keys sorted (stable, so file order within a key)
+    parts = []
+    for code, kind in sorted(enumerate(INDEX_KEYS), key=lambda item: item[1]):
+        kind_keys = pa.chunked_array(keys.pop(kind), type=pa.large_string())
+        order = pc.sort_indices(kind_keys)
+        parts.append(pa.table({
+            'Kind': pa.DictionaryArray.from_arrays(pa.array(np.full(len(order), code, dtype=np.int8)),
+                                                   pa.array(INDEX_KEYS, type=pa.string())),
+            'Key': kind_keys.take(order),
+            'Row Group': row_groups.take(order),
+            'Row': rows.take(order),
+        }))
+    return pa.concat_tables(parts), parquet.metadata.num_rows
+
+def write_order_index(processed_path, output_path):
+    """
+    Build and persist the index next to the other transformed outputs. The
+    processed file's row count and size are stored in the file metadata so
+    readers can tell a stale index from a current one.
+    """
+    table, processed_rows = build_order_index(processed_path)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           ROWS_METADATA: str(processed_rows).encode(),
+                                           BYTES_METADATA: str(os.path.getsize(processed_path)).encode()})
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, output_path)
+    return table.num_rows
+
+if __name__ == "__main__":
+    input_path = "data/processed/SO_Order_Ageing.parquet"
+    output_path = "data/transformed/order_index.parquet"
+
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        sys.exit(1)
+
+    try:
+        entries = write_order_index(input_path, output_path)
+        print(f"Order index saved to {output_path} ({entries} entries)")
+    except Exception as e:
+        print(f"Error building order index: {e}")
+        sys.exit(1)
@@ -0,0 +1,221 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import json
+import os
+import sys
+import tempfile
+import time
+
+# ---------------------------
+# PHYSICAL LAYOUT
+# ---------------------------
+
+# Low-cardinality dimensions are stored dictionary-encoded (read back as pandas categoricals)
+CATEGORICAL_COLUMNS = [
+    'Sitealias', 'Region', 'State', 'Store Remark', 'Store Status', 'Zone',
+    'Division', 'Div Group', 'Section', 'Department', 'Seasonal Flag',
+    'Sku Type', 'Sku Remark', 'Month', 'Ageing_Group', 'Whseid', 'Warehouse',
+]
+
+# Integer quantities downcast to the smallest type that fits the business range
+INT_TYPES = {
+    'Priority': pa.int8(),
+    'Sitecode': pa.int32(),
+    'Article Code': pa.int64(),
+    'Bom Qty': pa.int32(),
+    'Openqty': pa.int32(),
+    'Qtyallocated': pa.int32(),
+    'Qtypicked': pa.int32(),
+    'Unallocated Qty': pa.int32(),
+    'Open Qty Pcs': pa.int32(),
+    'Allocated Qty Pcs': pa.int32(),
+    'Picked Qty Pcs': pa.int32(),
+    'SO Balance': pa.int32(),
+    'Unallocated Qty Pcs': pa.int32(),
+    'Floor Pending Qty (Pcs)': pa.int32(),
+    'Ageing ': pa.int16(),
+    'Type': pa.int8(),
+}
+
+DATE_COLUMNS = ['Orderdate']
+
+# Sort order: lets row-group / page statistics skip data for status, region and ageing filters
+SORT_COLUMNS = ['Store Status', 'Region', 'Ageing ']
+
+ROW_GROUP_SIZE = 128 * 1024
+COMPRESSION = 'zstd'
+COMPRESSION_LEVEL = 3
+
+WRITE_OPTIONS = dict(
+    compression=COMPRESSION,
+    compression_level=COMPRESSION_LEVEL,
+    use_dictionary=True,
+    write_statistics=True,
+    write_page_index=True,
+)
+
+EXCEL_EPOCH = '1899-12-30'
+
+def excel_serial_to_date(series):
+    """
+    Converts Excel serial day numbers (e.g. 46036) to dates.
+    Already-parsed datetimes are passed through.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return pd.to_datetime(series, unit='D', origin=EXCEL_EPOCH).dt.date
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.date
+    return series
+
+def _sort_key(series):
+    # Categoricals sort by category order; sort by value instead
+    # (unless the categories are already in value order)
+    if isinstance(series.dtype, pd.CategoricalDtype) and not series.cat.categories.is_monotonic_increasing:
+        return series.astype(str)
+    return series
+
+def _dictionary_array(series):
+    if isinstance(series.dtype, pd.CategoricalDtype) and not series.isna().any():
+        # Reuse the codes instead of re-encoding every value
+        categories = pa.array(series.cat.categories.astype(str), type=pa.string())
+        return pa.DictionaryArray.from_arrays(series.cat.codes.to_numpy().astype('int32'), categories)
+    values = series.astype(object).where(series.notna(), "").astype(str)
+    return pa.array(values, type=pa.string()).dictionary_encode()
+
+def to_layout_table(df, sort_by=SORT_COLUMNS):
+    """
+    Converts a frame to an Arrow table with the explicit physical schema:
+    downcast integers, real dates, dictionary-encoded dimensions, sorted rows.
+    Columns not covered by the layout keep their inferred type.
+    """
+    sort_cols = [col for col in sort_by if col in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, key=_sort_key, kind='stable')
+
+    arrays = []
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORICAL_COLUMNS:
+            arr = _dictionary_array(series)
+        elif col in DATE_COLUMNS:
+            arr = pa.array(excel_serial_to_date(series), type=pa.date32(), from_pandas=True)
+        elif col in INT_TYPES:
+            arr = pa.Array.from_pandas(series, type=INT_TYPES[col])
+        else:
+            arr = pa.Array.from_pandas(series)
+        arrays.append(arr)
+    return pa.Table.from_arrays(arrays, names=[str(col) for col in df.columns])
+
+def normalize_frame(df):
+    """
+    Round-trips a frame through the layout schema (without sorting) so frames
+    from different sources compare value-for-value.
+    """
+    return to_layout_table(df, sort_by=()).to_pandas()
+
+def write_parquet(df, path, sort_by=SORT_COLUMNS):
+    """
+    Writes a frame with the optimized layout: zstd, tuned row groups,
+    dictionary encoding, column statistics and page index.
+    """
+    table = to_layout_table(df, sort_by)
+    # Write next to the target and rename: readers never see a half-written
+    # file, and a hard-linked copy in another data version stays untouched.
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, **WRITE_OPTIONS)
+    os.replace(tmp_path, path)
+
+class LayoutWriter:
+    """
+    Chunked counterpart of write_parquet for outputs too large to hold in
+    memory: each chunk is sorted and converted with the layout schema and
+    appended; the file is renamed into place on close().
+    """
+    def __init__(self, path, sort_by=SORT_COLUMNS):
+        self.path = path
+        self.sort_by = sort_by
+        self.rows = 0
+        self._tmp_path = f"{path}.tmp"
+        self._writer = None
+
+    def write(self, df):
+        table = to_layout_table(df, self.sort_by)
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._writer = pq.ParquetWriter(self._tmp_path, table.schema, **WRITE_OPTIONS)
+        else:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self._tmp_path, self.path)
+
+# ---------------------------
+# BEFORE / AFTER REPORT
+# ---------------------------
+
+def _time_read(path, **kwargs):
+    start = time.perf_counter()
+    df = pd.read_parquet(path, **kwargs)
+    return round(time.perf_counter() - start, 4), len(df)
+
+def layout_report(input_path, report_path="data/transformed/layout_report.json"):
+    """
+    Writes the input both the old way (default to_parquet after str casts) and
+    with the optimized layout, and compares file size and read times.
+    """
+    df = pd.read_parquet(input_path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        before_path = os.path.join(tmp, "before.parquet")
+        after_path = os.path.join(tmp, "after.parquet")
+
+        before_df = df.copy()
+        for col in before_df.columns:
+            if before_df[col].dtype == 'object' or before_df[col].dtype.name == 'category':
+                before_df[col] = before_df[col].astype(str)
+        before_df.to_parquet(before_path, index=False)
+        write_parquet(df, after_path)
+
+        status = str(df['Store Status'].iloc[0]) if 'Store Status' in df.columns and len(df) else None
+        report = {"rows": int(len(df))}
+        for label, path in (("before", before_path), ("after", after_path)):
+            full_time, _ = _time_read(path)
+            entry = {
+                "size_bytes": os.path.getsize(path),
+                "row_groups": pq.ParquetFile(path).num_row_groups,
+                "full_read_s": full_time,
+            }
+            if status is not None:
+                filtered_time, filtered_rows = _time_read(path, filters=[('Store Status', '=', status)])
+                entry["filtered_read_s"] = filtered_time
+                entry["filtered_rows"] = filtered_rows
+            report[label] = entry
+
+    report["size_ratio"] = round(report["after"]["size_bytes"] / max(report["before"]["size_bytes"], 1), 3)
+
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    input_path = sys.argv[1] if len(sys.argv) > 1 else "data/processed/SO_Order_Ageing.parquet"
+
+    if not os.path.exists(input_path):
+        print(f"Error: Input file '{input_path}' not found.")
+        sys.exit(1)
+
+    report = layout_report(input_path)
+    print(f"Layout report for {input_path} ({report['rows']:,} rows)")
+    for label in ("before", "after"):
+        entry = report[label]
+        print(f"  {label:<7} size: {entry['size_bytes'] / 1024 / 1024:8.2f} MB | "
+              f"row groups: {entry['row_groups']:3d} | full read: {entry['full_read_s']:.3f}s"
+              + (f" | status read: {entry['filtered_read_s']:.3f}s" if 'filtered_read_s' in entry else ""))
+    print(f"  size ratio (after/before): {report['size_ratio']}")
+    print("Report saved to data/transformed/layout_report.json")
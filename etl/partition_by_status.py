@@ -1,10 +1,119 @@
 import pandas as pd
 import os
 import sys
+import json
+import shutil
+import argparse
+from urllib.parse import quote
 
-def partition_by_status():
+from parquet_layout import write_parquet
+
+PARTITION_COL = 'Store Status'
+PARTITION_KEYS = [PARTITION_COL]
+PARTITIONING_FILE = "_partitioning.json"
+
+def partition_segment(key, value):
+    """
+    Hive-style folder name for one partition level, e.g. 'Store Status=New%20Store'.
+    Use URL encoding for special characters in folder names.
+    """
+    return f"{key}={quote(str(value), safe='')}"
+
+def partition_folder_name(status):
+    """
+    Folder name for a status partition.
+    """
+    return partition_segment(PARTITION_COL, status)
+
+def partition_relpath(keys, values):
+    """
+    Relative folder of a (possibly multi-level) partition,
+    e.g. 'Store Status=Active/Region=JHK1'.
+    """
+    return os.path.join(*[partition_segment(k, v) for k, v in zip(keys, values)])
+
+def partition_label(values):
+    """
+    Human-readable partition id used in logs and the manifest ('Active/JHK1').
+    """
+    return "/".join(str(v) for v in values)
+
+def split_by_keys(df, keys=PARTITION_KEYS):
+    """
+    Split the frame into (values, rows) pairs in a single groupby pass,
+    instead of re-scanning the full frame once per partition.
+    """
+    for values, group_df in df.groupby(keys, sort=False, observed=True):
+        yield (values if isinstance(values, tuple) else (values,)), group_df
+
+def split_by_status(df, partition_col=PARTITION_COL):
+    for values, status_df in split_by_keys(df, [partition_col]):
+        yield values[0], status_df
+
+def write_partition(values, group_df, output_dir, keys=PARTITION_KEYS):
+    """
+    Write one partition to <output_dir>/<key>=<value>/.../data.parquet.
     """
-    Partition data by Store Status for fast lookups.
+    if not isinstance(values, tuple):
+        values = (values,)
+    partition_folder = os.path.join(output_dir, partition_relpath(keys, values))
+    os.makedirs(partition_folder, exist_ok=True)
+    
+    # Write to parquet WITHOUT the partition columns (they're in the folder names)
+    # This avoids categorical column issues
+    group_df_no_partition = group_df.drop(columns=list(keys))
+    output_file = os.path.join(partition_folder, "data.parquet")
+    write_parquet(group_df_no_partition, output_file)
+    return partition_folder
+
+def read_partitioning(output_dir):
+    """
+    Partitioning descriptor written next to the partitions, or None.
+    """
+    path = os.path.join(output_dir, PARTITIONING_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def write_partitioning(output_dir, keys, columns):
+    """
+    Record the partition keys and the full column order so readers can
+    rebuild rows without guessing from folder names.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, PARTITIONING_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"keys": list(keys), "columns": [str(c) for c in columns]}, f, indent=2)
+    os.replace(tmp_path, path)
+
+def prepare_output_dir(output_dir, keys):
+    """
+    Switching partition keys invalidates the whole tree: clear it first.
+    """
+    current = read_partitioning(output_dir)
+    if current is not None and current.get("keys") != list(keys):
+        print(f"Partition keys changed {current.get('keys')} -> {list(keys)}; clearing {output_dir}")
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+def remove_stale_partitions(output_dir, keep_relpaths):
+    """
+    Remove leaf partition folders that were not written in this run.
+    """
+    keep = {os.path.normpath(p) for p in keep_relpaths}
+    for root, dirs, files in os.walk(output_dir, topdown=False):
+        rel = os.path.normpath(os.path.relpath(root, output_dir))
+        if "data.parquet" in files and rel not in keep:
+            shutil.rmtree(root)
+        elif rel != "." and not os.listdir(root):
+            os.rmdir(root)
+
+def partition_by_status(keys=PARTITION_KEYS):
+    """
+    Partition data by Store Status (or any hive key list, e.g. Store Status/Region)
+    for fast lookups.
     Manually creates partition folders to avoid categorical column issues.
     """
     input_path = "data/processed/SO_Order_Ageing.parquet"
@@ -22,38 +131,25 @@ def partition_by_status():
         
         print(f"Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
         
-        # Get unique statuses
-        partition_col = 'Store Status'
-        if partition_col not in df.columns:
-            print(f"Error: Column '{partition_col}' not found")
+        missing = [col for col in keys if col not in df.columns]
+        if missing:
+            print(f"Error: Column(s) {missing} not found")
             sys.exit(1)
         
-        statuses = df[partition_col].unique()
-        print(f"Found {len(statuses)} unique statuses: {list(statuses)}")
-        
         # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
+        prepare_output_dir(output_dir, keys)
         
-        # Manually partition - write each status to its own folder
-        print(f"\nPartitioning data to {output_dir}...")
+        # Manually partition - write each key combination to its own folder
+        print(f"\nPartitioning data by {list(keys)} to {output_dir}...")
         
-        for status in statuses:
-            # Filter data for this status
-            status_df = df[df[partition_col] == status].copy()
-            
-            # Create partition folder
-            # Use URL encoding for special characters in folder names
-            safe_status = status.replace(' ', '%20').replace('/', '%2F')
-            partition_folder = os.path.join(output_dir, f"Store Status={safe_status}")
-            os.makedirs(partition_folder, exist_ok=True)
-            
-            # Write to parquet WITHOUT the partition column (it's in the folder name)
-            # This avoids categorical column issues
-            status_df_no_partition = status_df.drop(columns=[partition_col])
-            output_file = os.path.join(partition_folder, "data.parquet")
-            status_df_no_partition.to_parquet(output_file, engine='pyarrow', index=False)
-            
-            print(f"  [OK] {status}: {len(status_df)} rows -> {partition_folder}")
+        written = []
+        for values, group_df in split_by_keys(df, keys):
+            partition_folder = write_partition(values, group_df, output_dir, keys)
+            written.append(partition_relpath(keys, values))
+            print(f"  [OK] {partition_label(values)}: {len(group_df)} rows -> {partition_folder}")
+        
+        remove_stale_partitions(output_dir, written)
+        write_partitioning(output_dir, keys, df.columns)
         
         print(f"\nData partitioned successfully!")
         print(f"Partitions created in: {output_dir}")
@@ -64,5 +160,12 @@ def partition_by_status():
         traceback.print_exc()
         sys.exit(1)
 
+def parse_keys(value):
+    return [key for key in value.split(",") if key]
+
 if __name__ == "__main__":
-    partition_by_status()
+    parser = argparse.ArgumentParser(description="Partition the processed dataset into hive-style folders.")
+    parser.add_argument("--keys", type=parse_keys, default=PARTITION_KEYS,
+                        help="Comma-separated partition columns, e.g. 'Store Status,Region' or 'Warehouse,Month'")
+    args = parser.parse_args()
+    partition_by_status(args.keys)
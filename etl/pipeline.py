@@ -0,0 +1,220 @@
+import pandas as pd
+import os
+import sys
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from excel_to_parquet import read_raw_data, clean_object_columns
+from transform_summary import build_summary, write_summary
+from facets import build_facets, write_facets
+from order_index import write_order_index
+from bitmaps import write_bitmaps
+from rollups import HIERARCHIES, build_rollups, write_rollups, parse_hierarchies
+from sample import build_sample, write_sample
+from snapshots import SNAPSHOT_DIR, append_snapshot
+from partition_by_status import (
+    PARTITION_KEYS, split_by_keys, write_partition, partition_relpath, partition_label,
+    prepare_output_dir, remove_stale_partitions, write_partitioning, parse_keys,
+)
+from parquet_layout import write_parquet
+from manifest import MANIFEST_PATH, load_manifest, write_manifest, bump_manifest
+from publish import TIMINGS_REL, root_paths, current_root, stage_version, publish, prune_versions
+
+PROCESSED_PATH = "data/processed/SO_Order_Ageing.parquet"
+PARTITIONED_DIR = "data/transformed/partitioned"
+SUMMARY_PATH = "data/transformed/summary.parquet"
+FACETS_PATH = "data/transformed/facets.parquet"
+ORDER_INDEX_PATH = "data/transformed/order_index.parquet"
+ROLLUPS_PATH = "data/transformed/rollups.parquet"
+SAMPLE_PATH = "data/transformed/sample.parquet"
+BITMAPS_PATH = "data/transformed/bitmaps.parquet"
+TIMINGS_PATH = "data/transformed/pipeline_timings.json"
+
+EXCEL_EXTENSIONS = ('.xlsb', '.xlsx', '.xlsm', '.xls')
+
+class StageTimer:
+    """
+    Records wall-clock duration (seconds) per named stage.
+    """
+    def __init__(self):
+        self.timings = {}
+
+    def run(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.timings[name] = round(time.perf_counter() - start, 4)
+
+def load_source(source_path):
+    """
+    Read the source exactly once: an Excel export or an already processed parquet.
+    Returns (df, is_excel).
+    """
+    if source_path.lower().endswith(EXCEL_EXTENSIONS):
+        return clean_object_columns(read_raw_data(source_path)), True
+    return pd.read_parquet(source_path), False
+
+def run_pipeline(source_path=PROCESSED_PATH, processed_path=PROCESSED_PATH,
+                 partitioned_dir=PARTITIONED_DIR, summary_path=SUMMARY_PATH,
+                 facets_path=FACETS_PATH, order_index_path=ORDER_INDEX_PATH, rollups_path=ROLLUPS_PATH,
+                 sample_path=SAMPLE_PATH, bitmaps_path=BITMAPS_PATH, timings_path=TIMINGS_PATH, manifest_path=MANIFEST_PATH,
+                 partition_keys=PARTITION_KEYS, hierarchies=HIERARCHIES, max_workers=4,
+                 snapshot_dir=None, snapshot_date=None):
+    """
+    Single-pass refresh: read the source once, then write the processed file,
+    every partition (Store Status by default, any hive key list otherwise),
+    the summary, the facet counts, the drill-down rollups (along
+    `hierarchies`) and the stratified sample in parallel, then the order index
+    and the bitmap index (positions in the processed file as written).
+    With `snapshot_dir`, the extract is also recorded in the daily snapshot
+    store as of `snapshot_date` (default: today).
+    Returns the per-stage timings (seconds).
+    """
+    timer = StageTimer()
+    pipeline_start = time.perf_counter()
+
+    print(f"Reading source: {source_path}...")
+    df, _ = timer.run("read_source", load_source, source_path)
+    print(f"Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+
+    missing = [col for col in partition_keys if col not in df.columns]
+    if missing:
+        raise ValueError(f"Partition column(s) {missing} not found")
+
+    prepare_output_dir(partitioned_dir, partition_keys)
+
+    # Writers are independent and spend most of their time inside pyarrow
+    # (which releases the GIL), so a thread pool is enough to overlap them.
+    write_start = time.perf_counter()
+    futures = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # Always rewritten (even from the processed file itself) so the
+        # optimized layout is applied; the source is already in memory.
+        futures["write_processed"] = pool.submit(
+            timer.run, "write_processed", write_parquet, df, processed_path
+        )
+        futures["summary"] = pool.submit(
+            timer.run, "summary", lambda: write_summary(build_summary(df), summary_path)
+        )
+        futures["facets"] = pool.submit(
+            timer.run, "facets", lambda: write_facets(build_facets(df), facets_path)
+        )
+        futures["rollups"] = pool.submit(
+            timer.run, "rollups", lambda: write_rollups(build_rollups(df, hierarchies), rollups_path, hierarchies)
+        )
+        futures["sample"] = pool.submit(
+            timer.run, "sample", lambda: write_sample(build_sample(df), sample_path)
+        )
+
+        split_start = time.perf_counter()
+        partitions = list(split_by_keys(df, partition_keys))
+        timer.timings["split_partitions"] = round(time.perf_counter() - split_start, 4)
+
+        for values, group_df in partitions:
+            label = partition_label(values)
+            futures[f"partition:{label}"] = pool.submit(
+                timer.run, f"partition:{label}",
+                write_partition, values, group_df, partitioned_dir, partition_keys
+            )
+
+        # Surface the first writer error instead of silently dropping it
+        for name, future in futures.items():
+            future.result()
+
+    timer.timings["write_all"] = round(time.perf_counter() - write_start, 4)
+    timer.run("order_index", write_order_index, processed_path, order_index_path)
+    timer.run("bitmaps", write_bitmaps, processed_path, bitmaps_path)
+    if snapshot_dir:
+        timer.run("snapshot", append_snapshot, df, snapshot_dir, snapshot_date)
+    timer.timings["total"] = round(time.perf_counter() - pipeline_start, 4)
+
+    remove_stale_partitions(partitioned_dir, [partition_relpath(partition_keys, values) for values, _ in partitions])
+    write_partitioning(partitioned_dir, partition_keys, df.columns)
+
+    for values, group_df in partitions:
+        print(f"  [OK] {partition_label(values)}: {len(group_df)} rows")
+
+    if manifest_path:
+        manifest = load_manifest(manifest_path)
+        labels = [partition_label(values) for values, _ in partitions]
+        removed = [label for label in manifest.get("partitions", {}) if label not in labels]
+        manifest = bump_manifest(manifest, "full", len(df), labels, removed)
+        write_manifest(manifest, manifest_path)
+        print(f"Dataset version: {manifest['dataset_version']}")
+
+    if timings_path:
+        os.makedirs(os.path.dirname(timings_path), exist_ok=True)
+        with open(timings_path, "w") as f:
+            json.dump({"source": source_path, "rows": int(len(df)), "timings": timer.timings}, f, indent=2)
+
+    return timer.timings
+
+def run_published(source_path, partition_keys=PARTITION_KEYS, hierarchies=HIERARCHIES, max_workers=4,
+                  snapshot_dir=SNAPSHOT_DIR, snapshot_date=None):
+    """
+    Runs the pipeline into a fresh data/versions/v<N>/ directory and only then
+    flips the 'CURRENT' pointer, so the backend never sees a half-written refresh.
+    Returns (version_dir, timings).
+    """
+    previous = root_paths(current_root())
+    manifest = load_manifest(previous["manifest_path"])
+    version = manifest.get("dataset_version", 0) + 1
+
+    stage = stage_version(version)
+    paths = root_paths(stage)
+    # Seed the manifest so version numbers and partition versions carry over
+    write_manifest(manifest, paths["manifest_path"])
+
+    timings = run_pipeline(source_path, timings_path=os.path.join(stage, TIMINGS_REL),
+                           partition_keys=partition_keys, hierarchies=hierarchies, max_workers=max_workers,
+                           snapshot_dir=snapshot_dir, snapshot_date=snapshot_date, **paths)
+    publish(stage)
+    prune_versions()
+    return stage, timings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Single-pass ETL refresh.")
+    parser.add_argument("source", nargs="?", default=None,
+                        help="Excel export or processed parquet (default: the current processed parquet)")
+    parser.add_argument("--partition-keys", type=parse_keys, default=PARTITION_KEYS,
+                        help="Comma-separated hive partition columns, e.g. 'Store Status,Region'")
+    parser.add_argument("--hierarchy", action="append", default=[],
+                        help="Drill-down path as 'name=Col A>Col B>Col C' (repeatable; default: Store Status>Zone>Region>Sitealias and Division>Section>Department)")
+    parser.add_argument("--no-publish", action="store_true",
+                        help="Write to the legacy data/processed + data/transformed paths instead of a new data version")
+    parser.add_argument("--snapshot-date", default=None,
+                        help="Date the extract is recorded under in data/snapshots (YYYY-MM-DD, default: today)")
+    parser.add_argument("--no-snapshot", action="store_true",
+                        help="Don't record the extract in the daily snapshot store")
+    args = parser.parse_args()
+    snapshot_dir = None if args.no_snapshot else SNAPSHOT_DIR
+    source = args.source or (PROCESSED_PATH if args.no_publish else root_paths(current_root())["processed_path"])
+
+    if not os.path.exists(source):
+        print(f"Error: Input file '{source}' not found.")
+        sys.exit(1)
+
+    try:
+        hierarchies = parse_hierarchies(args.hierarchy) if args.hierarchy else HIERARCHIES
+        if args.no_publish:
+            timings = run_pipeline(source, partition_keys=args.partition_keys, hierarchies=hierarchies,
+                                   snapshot_dir=snapshot_dir, snapshot_date=args.snapshot_date)
+            timings_path = TIMINGS_PATH
+        else:
+            stage, timings = run_published(source, partition_keys=args.partition_keys, hierarchies=hierarchies,
+                                           snapshot_dir=snapshot_dir, snapshot_date=args.snapshot_date)
+            timings_path = os.path.join(stage, TIMINGS_REL)
+            print(f"Published {stage} as current")
+    except Exception as e:
+        print(f"Error during pipeline run: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    print("\nStage timings (s):")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<30} {seconds:>8.3f}")
+    print(f"\nTimings saved to {timings_path}")
@@ -0,0 +1,103 @@
+import os
+import re
+import shutil
+
+DATA_ROOT = "data"
+VERSIONS_DIR = os.path.join(DATA_ROOT, "versions")
+CURRENT_FILE = os.path.join(DATA_ROOT, "CURRENT")
+KEEP_VERSIONS = 3
+
+# Layout inside a data root (the legacy 'data/' folder or 'data/versions/v<N>/')
+PROCESSED_REL = os.path.join("processed", "SO_Order_Ageing.parquet")
+TRANSFORMED_REL = "transformed"
+SUMMARY_REL = os.path.join(TRANSFORMED_REL, "summary.parquet")
+FACETS_REL = os.path.join(TRANSFORMED_REL, "facets.parquet")
+ORDER_INDEX_REL = os.path.join(TRANSFORMED_REL, "order_index.parquet")
+ROLLUPS_REL = os.path.join(TRANSFORMED_REL, "rollups.parquet")
+SAMPLE_REL = os.path.join(TRANSFORMED_REL, "sample.parquet")
+BITMAPS_REL = os.path.join(TRANSFORMED_REL, "bitmaps.parquet")
+PARTITIONED_REL = os.path.join(TRANSFORMED_REL, "partitioned")
+MANIFEST_REL = os.path.join(TRANSFORMED_REL, "manifest.json")
+TIMINGS_REL = os.path.join(TRANSFORMED_REL, "pipeline_timings.json")
+
+def root_paths(root):
+    """
+    Output paths of one data root, keyed like run_pipeline's arguments.
+    """
+    return {
+        "processed_path": os.path.join(root, PROCESSED_REL),
+        "summary_path": os.path.join(root, SUMMARY_REL),
+        "facets_path": os.path.join(root, FACETS_REL),
+        "order_index_path": os.path.join(root, ORDER_INDEX_REL),
+        "rollups_path": os.path.join(root, ROLLUPS_REL),
+        "sample_path": os.path.join(root, SAMPLE_REL),
+        "bitmaps_path": os.path.join(root, BITMAPS_REL),
+        "partitioned_dir": os.path.join(root, PARTITIONED_REL),
+        "manifest_path": os.path.join(root, MANIFEST_REL),
+    }
+
+def current_root():
+    """
+    Data root the 'CURRENT' pointer refers to, or the legacy 'data/' folder
+    when nothing has been published yet.
+    """
+    if os.path.exists(CURRENT_FILE):
+        with open(CURRENT_FILE) as f:
+            name = f.read().strip()
+        root = os.path.join(VERSIONS_DIR, name)
+        if name and os.path.isdir(root):
+            return root
+    return DATA_ROOT
+
+def _link_or_copy(src, dst):
+    # Unchanged files are shared between versions; writers always replace
+    # files (never write in place) so the previous version stays intact.
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def stage_version(version, base_root=None):
+    """
+    Create data/versions/v<version>/ (removing leftovers of a crashed run).
+    With base_root, the previous outputs are hard-linked in as a starting point.
+    """
+    stage = os.path.join(VERSIONS_DIR, f"v{version}")
+    if os.path.exists(stage):
+        shutil.rmtree(stage)
+    os.makedirs(os.path.join(stage, os.path.dirname(PROCESSED_REL)), exist_ok=True)
+    os.makedirs(os.path.join(stage, TRANSFORMED_REL), exist_ok=True)
+
+    if base_root is not None:
+        processed = os.path.join(base_root, PROCESSED_REL)
+        if os.path.exists(processed):
+            _link_or_copy(processed, os.path.join(stage, PROCESSED_REL))
+        transformed = os.path.join(base_root, TRANSFORMED_REL)
+        if os.path.isdir(transformed):
+            shutil.copytree(transformed, os.path.join(stage, TRANSFORMED_REL),
+                            copy_function=_link_or_copy, dirs_exist_ok=True)
+    return stage
+
+def publish(stage):
+    """
+    Atomically point 'CURRENT' at a fully written version directory.
+    """
+    tmp_path = f"{CURRENT_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(os.path.basename(os.path.normpath(stage)))
+    os.replace(tmp_path, CURRENT_FILE)
+
+def prune_versions(keep=KEEP_VERSIONS):
+    """
+    Delete all but the newest `keep` versions. Errors are ignored: a version
+    still open by a backend worker (Windows) is retried on the next run.
+    """
+    if not os.path.isdir(VERSIONS_DIR):
+        return
+    versions = sorted(
+        (int(m.group(1)), name)
+        for name in os.listdir(VERSIONS_DIR)
+        if (m := re.fullmatch(r"v(\d+)", name))
+    )
+    for _, name in versions[:-keep]:
+        shutil.rmtree(os.path.join(VERSIONS_DIR, name), ignore_errors=True)
@@ -0,0 +1,161 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import argparse
+import json
+import os
+import sys
+
+from transform_summary import GROUP_COL, NUMERIC_COLS
+
+# Drill-down paths served by /drilldown, top level first
+HIERARCHIES = {
+    'status': ['Store Status', 'Zone', 'Region', 'Sitealias'],
+    'merchandise': ['Division', 'Section', 'Department'],
+}
+ROLLUP_KEYS = ['Hierarchy', 'Parent', 'Value']
+HIERARCHIES_METADATA = b"hierarchies"
+
+def parse_hierarchies(specs):
+    """
+    "name=Col A>Col B>Col C" specs into {name: [levels]}.
+    """
+    hierarchies = {}
+    for spec in specs:
+        name, sep, levels = spec.partition('=')
+        levels = [level.strip() for level in levels.split('>') if level.strip()]
+        if not sep or not name.strip() or not levels:
+            raise ValueError(f"Hierarchy must look like 'name=Col A>Col B', got {spec!r}")
+        hierarchies[name.strip()] = levels
+    return hierarchies
+
+def encode_path(values):
+    # Parent key of a node's children: its ancestors' values, top level first
+    return json.dumps([str(v) for v in values])
+
+def build_rollups(df, hierarchies=HIERARCHIES):
+    """
+    Quantity sums and row counts for every node of every hierarchy:
+    Hierarchy | Parent | Value | Depth | Rows | Open Qty Pcs | ...
+    where Parent is the JSON list of the node's ancestors. The deepest level
+    is grouped from the rows once; each level above is summed from the one
+    below it. Hierarchies with a column missing from `df` are skipped.
+    """
+    numeric_cols = [col for col in NUMERIC_COLS if col in df.columns]
+    # int64 sums: the processed file stores downcast ints that would overflow
+    quantities = df[numeric_cols].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int64')
+    quantities['Rows'] = 1
+    value_cols = ['Rows'] + numeric_cols
+    frames = []
+    for name, levels in hierarchies.items():
+        missing = [col for col in levels if col not in df.columns]
+        if missing:
+            print(f"Skipping hierarchy '{name}': column(s) {missing} not found")
+            continue
+        # Group on the stored (often categorical) columns; only the result is stringified
+        deepest = quantities.groupby([df[col] for col in levels], observed=True, dropna=False).sum()
+        deepest.index.names = levels
+        deepest = deepest.reset_index()
+        for col in levels:
+            deepest[col] = deepest[col].astype(str)
+        for depth in range(len(levels)):
+            level = deepest.groupby(levels[:depth + 1], sort=False)[value_cols].sum().reset_index()
+            parents = zip(*[level[col] for col in levels[:depth]]) if depth else ((),) * len(level)
+            frames.append(pd.DataFrame({
+                'Hierarchy': name,
+                'Parent': [encode_path(values) for values in parents],
+                'Value': level[levels[depth]],
+                'Depth': depth,
+                **{col: level[col] for col in value_cols},
+            }))
+    if not frames:
+        return pd.DataFrame(columns=ROLLUP_KEYS + ['Depth'] + value_cols)
+    return sort_rollups(pd.concat(frames, ignore_index=True))
+
+def combine_rollups(frames):
+    """
+    Merge rollups built from disjoint chunks of rows.
+    """
+    rollups = pd.concat(frames, ignore_index=True)
+    value_cols = [col for col in rollups.columns if col not in ROLLUP_KEYS + ['Depth']]
+    rollups = rollups.groupby(ROLLUP_KEYS + ['Depth'], observed=True)[value_cols].sum().reset_index()
+    return sort_rollups(rollups)
+
+def update_rollups(rollups_path, new_df, touched_statuses):
+    """
+    Incremental refresh: hierarchies rooted at Store Status only recompute
+    the subtrees of the touched statuses; the others are rebuilt from
+    `new_df`. Keeps the hierarchies the existing file was built with.
+    """
+    hierarchies = read_hierarchies(rollups_path)
+    if not os.path.exists(rollups_path):
+        rollups = build_rollups(new_df, hierarchies)
+        write_rollups(rollups, rollups_path, hierarchies)
+        return rollups
+
+    by_status = {name: levels for name, levels in hierarchies.items() if levels[0] == GROUP_COL}
+    others = {name: levels for name, levels in hierarchies.items() if name not in by_status}
+    existing = pd.read_parquet(rollups_path)
+    top = existing['Value'].where(existing['Depth'] == 0, existing['Parent'].map(lambda p: (json.loads(p) or [''])[0]))
+    kept = existing[existing['Hierarchy'].isin(list(by_status)) & ~top.isin(list(touched_statuses))]
+    fresh = [build_rollups(new_df[new_df[GROUP_COL].isin(touched_statuses)], by_status)]
+    if others:
+        fresh.append(build_rollups(new_df, others))
+    rollups = sort_rollups(pd.concat([kept] + fresh, ignore_index=True))
+    write_rollups(rollups, rollups_path, hierarchies)
+    return rollups
+
+def sort_rollups(rollups):
+    # Children of one node are contiguous, largest open quantity first
+    order_col = 'Open Qty Pcs' if 'Open Qty Pcs' in rollups.columns else 'Rows'
+    return rollups.sort_values(['Hierarchy', 'Parent', order_col, 'Value'],
+                               ascending=[True, True, False, True]).reset_index(drop=True)
+
+def write_rollups(rollups, output_path, hierarchies=HIERARCHIES):
+    """
+    Persist the rollups with the hierarchy definitions in the file metadata,
+    so the backend serves exactly the levels they were built for.
+    """
+    table = pa.Table.from_pandas(rollups, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                           HIERARCHIES_METADATA: json.dumps(hierarchies).encode()})
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, output_path)
+
+def read_hierarchies(rollups_path):
+    """
+    Hierarchies an existing rollups file was built with (defaults otherwise).
+    """
+    if os.path.exists(rollups_path):
+        metadata = pq.read_schema(rollups_path).metadata or {}
+        if HIERARCHIES_METADATA in metadata:
+            return json.loads(metadata[HIERARCHIES_METADATA])
+    return HIERARCHIES
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the drill-down rollups from the processed data.")
+    parser.add_argument("--hierarchy", action="append", default=[],
+                        help="Drill-down path as 'name=Col A>Col B>Col C' (repeatable; default: "
+                             + "; ".join(f"{n}={'>'.join(l)}" for n, l in HIERARCHIES.items()) + ")")
+    args = parser.parse_args()
+
+    input_path = "data/processed/SO_Order_Ageing.parquet"
+    output_path = "data/transformed/rollups.parquet"
+
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        sys.exit(1)
+
+    try:
+        hierarchies = parse_hierarchies(args.hierarchy) if args.hierarchy else HIERARCHIES
+        stored = set(pq.read_schema(input_path).names)
+        columns = {col for levels in hierarchies.values() for col in levels} | set(NUMERIC_COLS)
+        df = pd.read_parquet(input_path, columns=[col for col in columns if col in stored])
+        rollups = build_rollups(df, hierarchies)
+        write_rollups(rollups, output_path, hierarchies)
+        print(f"Rollups saved to {output_path} ({len(rollups)} nodes)")
+    except Exception as e:
+        print(f"Error building rollups: {e}")
+        sys.exit(1)
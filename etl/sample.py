@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import argparse
+import os
+import sys
+
+from transform_summary import GROUP_COL
+
+# Stratified sample for approximate chat answers
+STRATA = [GROUP_COL, 'Region']
+SAMPLE_FRACTION = 0.02
+MIN_PER_STRATUM = 50
+STRATUM_ROWS = '_stratum_rows'
+STRATUM_SAMPLE = '_stratum_sample'
+
+def build_sample(df, fraction=SAMPLE_FRACTION, min_per_stratum=MIN_PER_STRATUM, seed=42):
+    """
+    Stratified random sample by Store Status x Region: `fraction` of every
+    stratum (at least `min_per_stratum` rows, or the whole stratum when it is
+    smaller). Every row keeps all columns plus its stratum's population and
+    sample sizes, which is what the estimator needs to weight rows and put
+    error bounds on a sum or count.
+    """
+    strata = [col for col in STRATA if col in df.columns]
+    keys = df[strata].astype(str)
+    population = keys.groupby(strata, sort=False)[strata[0]].transform('size')
+    wanted = np.minimum(population, np.maximum(np.ceil(population * fraction), min_per_stratum)).astype('int64')
+
+    # Random order within each stratum; keep the first `wanted` rows
+    rng = np.random.default_rng(seed)
+    order = pd.Series(rng.random(len(df)), index=df.index)
+    rank = order.groupby([keys[col] for col in strata], sort=False).rank(method='first') - 1
+    chosen = rank < wanted
+
+    sample = df[chosen.to_numpy()].copy()
+    sample[STRATUM_ROWS] = population[chosen].to_numpy().astype('int64')
+    sample[STRATUM_SAMPLE] = wanted[chosen].to_numpy().astype('int64')
+    return sample.reset_index(drop=True)
+
+def combine_samples(frames):
+    """
+    Merge samples drawn from disjoint chunks with the same fraction: the
+    stratum sizes are summed over the chunks.
+    """
+    strata = [col for col in STRATA if col in frames[0].columns]
+    sizes = pd.concat([
+        frame[strata + [STRATUM_ROWS, STRATUM_SAMPLE]].astype({col: str for col in strata}).drop_duplicates(strata)
+        for frame in frames
+    ]).groupby(strata, sort=False)[[STRATUM_ROWS, STRATUM_SAMPLE]].sum().reset_index()
+    sample = pd.concat(frames, ignore_index=True).drop(columns=[STRATUM_ROWS, STRATUM_SAMPLE])
+    keys = sample[strata].astype(str)
+    merged = keys.merge(sizes, on=strata, how='left')
+    sample[STRATUM_ROWS] = merged[STRATUM_ROWS].to_numpy()
+    sample[STRATUM_SAMPLE] = merged[STRATUM_SAMPLE].to_numpy()
+    return sample
+
+def update_sample(sample_path, new_df, touched_statuses, seed=42):
+    """
+    Resample the strata of the touched Store Statuses only and keep the
+    others from the existing sample.
+    """
+    fresh = build_sample(new_df[new_df[GROUP_COL].isin(touched_statuses)], seed=seed)
+    if os.path.exists(sample_path):
+        existing = pd.read_parquet(sample_path)
+        kept = existing[~existing[GROUP_COL].astype(str).isin(touched_statuses)]
+        sample = pd.concat([kept, fresh], ignore_index=True)
+    else:
+        sample = build_sample(new_df, seed=seed)
+    write_sample(sample, sample_path)
+    return sample
+
+def write_sample(sample, output_path):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    table = pa.Table.from_pandas(sample, preserve_index=False)
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, output_path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the stratified sample used for approximate chat answers.")
+    parser.add_argument("--fraction", type=float, default=SAMPLE_FRACTION)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    input_path = "data/processed/SO_Order_Ageing.parquet"
+    output_path = "data/transformed/sample.parquet"
+
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        sys.exit(1)
+
+    try:
+        df = pd.read_parquet(input_path)
+        sample = build_sample(df, fraction=args.fraction, seed=args.seed)
+        write_sample(sample, output_path)
+        print(f"Sample saved to {output_path} ({len(sample)} of {len(df)} rows)")
+    except Exception as e:
+        print(f"Error building sample: {e}")
+        sys.exit(1)
@@ -0,0 +1,270 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import argparse
+import datetime
+import itertools
+import os
+import sys
+
+from transform_summary import NUMERIC_COLS
+from parquet_layout import WRITE_OPTIONS, to_layout_table
+
+# Snapshot store, shared by every data version (pruning versions keeps the history):
+#   latest.parquet        the last extract in full
+#   deltas/<day>.parquet  what turns that day's snapshot back into the previous one
+#   trends.parquet        per-day totals by the main dimensions
+SNAPSHOT_DIR = "data/snapshots"
+LATEST_FILE = "latest.parquet"
+DELTAS_DIR = "deltas"
+TRENDS_FILE = "trends.parquet"
+
+KEY_COLS = ['Orderkey', 'Set Barcode']
+OCCURRENCE = '_occurrence'
+CHANGE = '_change'
+
+# Daily series: every combination of up to two of these dimensions
+TREND_DIMENSIONS = ['Store Status', 'Region', 'Zone', 'Division', 'Warehouse', 'Ageing_Group']
+TREND_MAX_DIMENSIONS = 2
+TREND_METRICS = NUMERIC_COLS + ['Unallocated Qty', 'Floor Pending Qty (Pcs)', 'SO Balance', 'Ageing ']
+
+DATE_METADATA = b"snapshot_date"
+PREVIOUS_METADATA = b"previous_date"
+
+def _occurrences(df):
+    return df[KEY_COLS].groupby(KEY_COLS, sort=False).cumcount()
+
+def _keyed(df):
+    """
+    Key + content hash per row. A running occurrence number is added to the
+    key so duplicate (Orderkey, Set Barcode) lines still diff one-to-one.
+    """
+    keyed = df[KEY_COLS].copy()
+    keyed[OCCURRENCE] = _occurrences(df)
+    keyed["_row_hash"] = pd.util.hash_pandas_object(df, index=False).values
+    keyed["_row"] = range(len(df))
+    return keyed
+
+def diff_extract(current_df, new_df):
+    """
+    Diff a new full extract against the current processed dataset.
+    Returns (new_rows, changed_rows, deleted_rows, changed_old_rows):
+    new/changed rows come from the new extract, deleted rows and the previous
+    version of changed rows from the current one.
+    """
+    new_df = new_df[list(current_df.columns)]
+    merged = _keyed(current_df).merge(
+        _keyed(new_df), on=KEY_COLS + [OCCURRENCE], how="outer",
+        suffixes=("_old", "_new"), indicator=True
+    )
+    added = merged[merged["_merge"] == "right_only"]
+    deleted = merged[merged["_merge"] == "left_only"]
+    both = merged[merged["_merge"] == "both"]
+    changed = both[both["_row_hash_old"] != both["_row_hash_new"]]
+
+    return (
+        new_df.iloc[added["_row_new"].astype(int)],
+        new_df.iloc[changed["_row_new"].astype(int)],
+        current_df.iloc[deleted["_row_old"].astype(int)],
+        # Changed rows may have moved between partitions: keep the old version too
+        current_df.iloc[changed["_row_old"].astype(int)],
+    )
+
+def _with_occurrence(rows, occurrences):
+    # diff_extract keeps the row labels, so each row finds its occurrence number
+    return rows.assign(**{OCCURRENCE: occurrences.loc[rows.index].to_numpy()})
+
+def build_delta(previous_df, df):
+    """
+    Reverse delta from the previous snapshot to `df`, keyed by Orderkey +
+    Set Barcode (+ occurrence): rows added today (as they are now), and the
+    previous content of changed and deleted rows. Unchanged rows are not
+    stored; the latest snapshot and the deltas rebuild any earlier day.
+    """
+    previous_df = previous_df.reset_index(drop=True)
+    df = df[list(previous_df.columns)].reset_index(drop=True)
+    new_rows, _, deleted_rows, changed_old_rows = diff_extract(previous_df, df)
+    previous_occurrences, occurrences = _occurrences(previous_df), _occurrences(df)
+    return pd.concat([
+        _with_occurrence(new_rows, occurrences).assign(**{CHANGE: "new"}),
+        _with_occurrence(changed_old_rows, previous_occurrences).assign(**{CHANGE: "changed"}),
+        _with_occurrence(deleted_rows, previous_occurrences).assign(**{CHANGE: "deleted"}),
+    ], ignore_index=True)
+
+def apply_delta(df, delta):
+    """
+    The previous snapshot from `df` and its reverse delta: today's new and
+    changed rows are dropped and the previous rows put back. Rows stay in
+    occurrence order per key, so the older deltas still line up.
+    """
+    df = df.reset_index(drop=True)
+    keyed = df[KEY_COLS].assign(**{OCCURRENCE: _occurrences(df)})
+    replaced = delta.loc[delta[CHANGE].isin(["new", "changed"]), KEY_COLS + [OCCURRENCE]]
+    hits = keyed.merge(replaced, on=KEY_COLS + [OCCURRENCE], how="left", indicator=True)
+    kept = df[(hits["_merge"] == "left_only").to_numpy()]
+    kept = kept.assign(**{OCCURRENCE: keyed[OCCURRENCE][kept.index].to_numpy()})
+    restored = delta[delta[CHANGE].isin(["changed", "deleted"])].drop(columns=[CHANGE])
+    previous = pd.concat([kept, restored[list(kept.columns)]], ignore_index=True)
+    previous = previous.sort_values(OCCURRENCE, kind="stable").drop(columns=[OCCURRENCE])
+    return previous.reset_index(drop=True)
+
+def build_trends(df, day):
+    """
+    Row counts and quantity sums of one snapshot for the overall total and
+    every combination of up to two trend dimensions:
+    Date | Grouping | <dimensions> | Rows | <metrics>, where Grouping names the
+    grouped dimensions (comma-separated, "" for the total) and the other
+    dimension columns are null. Every grouping is summed from the finest one.
+    """
+    dims = [col for col in TREND_DIMENSIONS if col in df.columns]
+    metric_cols = [col for col in TREND_METRICS if col in df.columns]
+    # int64 sums: the processed file stores downcast ints that would overflow
+    values = df[metric_cols].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int64')
+    values['Rows'] = 1
+    value_cols = ['Rows'] + metric_cols
+    finest = values.groupby([df[col].astype(str) for col in dims], observed=True, dropna=False).sum().reset_index()
+
+    frames = []
+    for size in range(TREND_MAX_DIMENSIONS + 1):
+        for grouping in itertools.combinations(dims, size):
+            if grouping:
+                level = finest.groupby(list(grouping), sort=True)[value_cols].sum().reset_index()
+            else:
+                level = finest[value_cols].sum().to_frame().T
+            level.insert(0, 'Grouping', ','.join(grouping))
+            frames.append(level)
+    trends = pd.concat(frames, ignore_index=True)
+    trends.insert(0, 'Date', pd.Timestamp(day).date().isoformat())
+    for col in dims:
+        if col not in trends.columns:
+            trends[col] = None
+    return trends[['Date', 'Grouping'] + dims + value_cols].astype({col: 'int64' for col in value_cols})
+
+def _write_table(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, **WRITE_OPTIONS)
+    os.replace(tmp_path, path)
+
+def _with_metadata(table, **metadata):
+    return table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                          **{key.encode(): value.encode() for key, value in metadata.items()}})
+
+def read_latest(snapshot_dir=SNAPSHOT_DIR):
+    """
+    (latest snapshot, its date), or (None, None) before the first run.
+    """
+    path = os.path.join(snapshot_dir, LATEST_FILE)
+    if not os.path.exists(path):
+        return None, None
+    table = pq.read_table(path)
+    return table.to_pandas(), table.schema.metadata[DATE_METADATA].decode()
+
+def delta_days(snapshot_dir=SNAPSHOT_DIR):
+    deltas_dir = os.path.join(snapshot_dir, DELTAS_DIR)
+    if not os.path.isdir(deltas_dir):
+        return []
+    return sorted(name[:-len(".parquet")] for name in os.listdir(deltas_dir) if name.endswith(".parquet"))
+
+def _read_delta(snapshot_dir, day):
+    table = pq.read_table(os.path.join(snapshot_dir, DELTAS_DIR, f"{day}.parquet"))
+    return table.to_pandas(), table.schema.metadata[PREVIOUS_METADATA].decode()
+
+def update_trends(trends_path, day_trends, day):
+    """
+    Replace the day's rows of the series (a re-run on the same day
+    overwrites them) and keep the file sorted by grouping and date, so a
+    trend query reads the row groups of one grouping.
+    """
+    if os.path.exists(trends_path):
+        existing = pd.read_parquet(trends_path)
+        existing = existing[existing['Date'] != day]
+        trends = pd.concat([existing, day_trends], ignore_index=True)
+    else:
+        trends = day_trends
+    trends = trends.sort_values(['Grouping', 'Date'], kind='stable').reset_index(drop=True)
+    _write_table(pa.Table.from_pandas(trends, preserve_index=False), trends_path)
+    return trends
+
+def append_snapshot(df, snapshot_dir=SNAPSHOT_DIR, day=None):
+    """
+    Record `df` (a full extract) as the snapshot of `day` (default: today):
+    the reverse delta from the previous snapshot day, the new latest
+    snapshot and the day's aggregate rows. Re-running on the same day
+    replaces that day. Returns the delta counts.
+    """
+    day = pd.Timestamp(day or datetime.date.today()).date().isoformat()
+    previous, previous_day = read_latest(snapshot_dir)
+    if previous_day is not None and previous_day > day:
+        raise ValueError(f"Snapshot date {day} is before the latest snapshot ({previous_day})")
+    if previous_day == day:
+        # Compare against the day before, not against this day's earlier run
+        if day in delta_days(snapshot_dir):
+            delta, previous_day = _read_delta(snapshot_dir, day)
+            previous = apply_delta(previous, delta)
+        else:
+            previous, previous_day = None, None
+
+    # Snapshots are stored (and compared) in the layout's physical types
+    df = to_layout_table(df, sort_by=()).to_pandas()
+    counts = {}
+    delta_path = os.path.join(snapshot_dir, DELTAS_DIR, f"{day}.parquet")
+    if previous is not None:
+        previous = to_layout_table(previous.reindex(columns=df.columns), sort_by=()).to_pandas()
+        delta = build_delta(previous, df)
+        counts = delta[CHANGE].value_counts().to_dict()
+        table = to_layout_table(delta, sort_by=())
+        _write_table(_with_metadata(table, snapshot_date=day, previous_date=previous_day), delta_path)
+    elif os.path.exists(delta_path):
+        os.remove(delta_path)
+
+    table = to_layout_table(df, sort_by=())
+    _write_table(_with_metadata(table, snapshot_date=day), os.path.join(snapshot_dir, LATEST_FILE))
+    update_trends(os.path.join(snapshot_dir, TRENDS_FILE), build_trends(df, day), day)
+    return {kind: int(counts.get(kind, 0)) for kind in ("new", "changed", "deleted")}
+
+def restore_snapshot(day, snapshot_dir=SNAPSHOT_DIR):
+    """
+    The snapshot as of `day` (the last one recorded on or before it), rebuilt
+    from the latest snapshot by applying the reverse deltas newest first.
+    Returns (df, snapshot date).
+    """
+    day = pd.Timestamp(day).date().isoformat()
+    df, current = read_latest(snapshot_dir)
+    if df is None:
+        raise FileNotFoundError(f"No snapshots in {snapshot_dir}")
+    deltas = set(delta_days(snapshot_dir))
+    while current > day:
+        if current not in deltas:
+            raise ValueError(f"No snapshot on or before {day} (history starts {current})")
+        delta, previous_day = _read_delta(snapshot_dir, current)
+        df, current = apply_delta(df, delta), previous_day
+    return df, current
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Daily snapshot store: append today's extract or rebuild an earlier day.")
+    parser.add_argument("--date", default=None, help="Snapshot date (YYYY-MM-DD, default: today)")
+    parser.add_argument("--restore", metavar="OUTPUT", default=None,
+                        help="Write the snapshot as of --date to this parquet file instead of appending")
+    args = parser.parse_args()
+
+    input_path = "data/processed/SO_Order_Ageing.parquet"
+
+    try:
+        if args.restore:
+            if not args.date:
+                print("Error: --restore needs --date")
+                sys.exit(1)
+            df, day = restore_snapshot(args.date)
+            df.to_parquet(args.restore, index=False)
+            print(f"Snapshot of {day} ({len(df)} rows) saved to {args.restore}")
+        else:
+            if not os.path.exists(input_path):
+                print(f"Error: Input file not found at {input_path}")
+                sys.exit(1)
+            counts = append_snapshot(pd.read_parquet(input_path), day=args.date)
+            print(f"Snapshot saved to {SNAPSHOT_DIR} ({counts['new']} new, {counts['changed']} changed, "
+                  f"{counts['deleted']} deleted)")
+    except Exception as e:
+        print(f"Error updating the snapshot store: {e}")
+        sys.exit(1)
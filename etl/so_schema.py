@@ -0,0 +1,29 @@
+import pyarrow as pa
+
+# Column layout of the 'Raw Data' sheet (see data_info.txt).
+# NOTE: 'Ageing ' has a trailing space in the source export.
+INT_COLUMNS = [
+    'Priority', 'Sitecode', 'Article Code', 'Orderdate', 'Bom Qty', 'Openqty',
+    'Qtyallocated', 'Qtypicked', 'Unallocated Qty', 'Open Qty Pcs',
+    'Allocated Qty Pcs', 'Picked Qty Pcs', 'SO Balance', 'Unallocated Qty Pcs',
+    'Floor Pending Qty (Pcs)', 'Ageing ', 'Type',
+]
+
+COLUMNS = [
+    'Priority', 'Sitealias', 'Sitecode', 'Region', 'State', 'Store Remark',
+    'Store Status', 'Zone', 'Division', 'Div Group', 'Section', 'Department',
+    'Article Code', 'Article Name', 'Seasonal Flag', 'Orderkey', 'Orderdate',
+    'Set Barcode', 'Sku Type', 'Sku Remark', 'Bom Qty', 'Openqty', 'Qtyallocated',
+    'Qtypicked', 'Unallocated Qty', 'Open Qty Pcs', 'Allocated Qty Pcs',
+    'Picked Qty Pcs', 'SO Balance', 'Unallocated Qty Pcs', 'Floor Pending Qty (Pcs)',
+    'Month', 'Ageing ', 'Ageing_Group', 'Type', 'Whseid', 'Warehouse',
+]
+
+STRING_COLUMNS = [col for col in COLUMNS if col not in INT_COLUMNS]
+
+# Fixed Arrow schema of data/processed/SO_Order_Ageing.parquet:
+# text columns as strings ("" for blanks), numeric columns as nullable int64.
+PROCESSED_SCHEMA = pa.schema([
+    pa.field(col, pa.int64() if col in INT_COLUMNS else pa.string())
+    for col in COLUMNS
+])
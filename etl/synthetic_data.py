@@ -0,0 +1,353 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+import argparse
+import datetime
+import time
+
+from so_schema import COLUMNS
+from parquet_layout import LayoutWriter
+from transform_summary import GROUP_COL, NUMERIC_COLS, build_summary, write_summary
+from facets import build_facets, combine_facets, write_facets
+from order_index import write_order_index
+from bitmaps import write_bitmaps
+from rollups import build_rollups, combine_rollups, write_rollups
+from sample import build_sample, combine_samples, write_sample
+from partition_by_status import (
+    PARTITION_KEYS, partition_relpath, prepare_output_dir, remove_stale_partitions, write_partitioning,
+)
+from manifest import load_manifest, write_manifest, bump_manifest
+from publish import root_paths, current_root, stage_version, publish, prune_versions
+
+# ---------------------------
+# SHAPE OF THE REAL EXTRACT
+# ---------------------------
+
+MIN_ROWS = 100_000
+MAX_ROWS = 50_000_000
+CHUNK_ROWS = 1_000_000
+SNAPSHOT_DATE = datetime.date(2026, 1, 31)
+EXCEL_EPOCH = datetime.date(1899, 12, 30)
+
+N_SITES = 450
+N_ARTICLES = 25_000
+
+# Store Status is a store attribute; most stores (and rows) are Active
+STORE_STATUSES = {
+    'Active': 0.82, 'New Store': 0.06, 'Hold': 0.05, 'Non Operational': 0.04, 'Closed': 0.03,
+}
+STORE_REMARKS = {
+    'Active': ['ROI Open Store', 'Non ROI Open Store'],
+    'New Store': ['New Store'],
+    'Hold': ['Hold Store'],
+    'Non Operational': ['Non Operational Store'],
+    'Closed': ['Closed Store'],
+}
+
+# (Region, State, Zone)
+REGIONS = [
+    ('JHK1', 'JH', 'East/JHK'), ('WB1', 'WB', 'East/WB'), ('WB2', 'WB', 'East/WB'),
+    ('BH1', 'BR', 'East/BH'), ('OD1', 'OR', 'East/OD'), ('DELHI NCR', 'DL', 'North/NCR'),
+    ('UP1', 'UP', 'North/UP'), ('UP2', 'UP', 'North/UP'), ('PB1', 'PB', 'North/PB'),
+    ('RJ1', 'RJ', 'North/RJ'), ('MH1', 'MH', 'West/MH'), ('MH2', 'MH', 'West/MH'),
+    ('GJ1', 'GJ', 'West/GJ'), ('MP1', 'MP', 'West/MP'), ('KA1', 'KA', 'South/KA'),
+    ('TN1', 'TN', 'South/TN'), ('AP1', 'AP', 'South/AP'), ('TS1', 'TS', 'South/TS'),
+]
+
+# Each zone is served by one warehouse (Whseid, Warehouse)
+WAREHOUSES = {
+    'East': ('WMWHSE2', 'WH-KOLKATA'),
+    'North': ('WMWHSE1', 'WH-PALWAL'),
+    'West': ('WMWHSE3', 'WH-BHIWANDI'),
+    'South': ('WMWHSE4', 'WH-HOSKOTE'),
+}
+
+# Division -> (Div Group, share of articles, sections)
+HIERARCHY = {
+    'Men': ('1.Apparels', 0.26, ['Mens Sports Wear', 'Mens Casual Wear', 'Mens Formal Wear', 'Mens Ethnic Wear', 'Mens Inner Wear']),
+    'Women Western': ('1.Apparels', 0.18, ['Womens Tops', 'Womens Bottoms', 'Womens Dresses', 'Womens Sports Wear']),
+    'Women Ethnic': ('1.Apparels', 0.16, ['Kurtas', 'Sarees', 'Ethnic Sets', 'Dupattas']),
+    'Kids': ('1.Apparels', 0.18, ['Boys Wear', 'Girls Wear', 'Infants Wear']),
+    'Footwear': ('2.Non Apparels', 0.08, ['Mens Footwear', 'Womens Footwear', 'Kids Footwear']),
+    'Accessories': ('2.Non Apparels', 0.07, ['Bags', 'Belts & Wallets', 'Jewellery']),
+    'Home': ('2.Non Apparels', 0.07, ['Bed Linen', 'Bath Linen', 'Kitchen']),
+}
+DEPARTMENT_TYPES = ['T-Shirts', 'Shirts', 'Jeans', 'Trousers', 'Shorts', '3/4ths', 'Track Pants', 'Jackets']
+BRANDS = ['ECO', 'URBAN', 'STREET', 'BASIC', 'PRIME', 'FUSION', 'ACTIVE', 'CLASSIC']
+SEASONAL_FLAGS = {'SUMMER': 0.35, 'WINTER': 0.25, 'ALL SEASON': 0.3, 'FESTIVE': 0.1}
+SKU_REMARKS = {'Regular': 0.8, 'Promo': 0.12, 'New Launch': 0.08}
+BOM_QTY = {1: 0.45, 2: 0.15, 3: 0.1, 4: 0.12, 6: 0.08, 8: 0.06, 12: 0.04}
+
+AGEING_GROUPS = [(3, 'A ( 0-3 )'), (7, 'B ( 4-7 )'), (11, 'C ( 8-11 )'), (None, 'D ( 12 & Above )')]
+MEAN_AGEING_DAYS = 8
+MAX_AGEING_DAYS = 180
+MEAN_ORDER_LINES = 6
+
+def _zipf_weights(n, a=1.1):
+    weights = 1.0 / np.arange(1, n + 1) ** a
+    return weights / weights.sum()
+
+def _pick(rng, options, n):
+    keys = list(options)
+    return np.asarray(keys, dtype=object)[rng.choice(len(keys), size=n, p=list(options.values()))]
+
+def build_dimensions(seed):
+    """
+    Stores and articles with consistent attributes (a store always has the
+    same region / status, an article the same division / section).
+    Independent of the row count, so datasets of different sizes share them.
+    """
+    rng = np.random.default_rng([seed, 0])
+
+    region_idx = rng.choice(len(REGIONS), size=N_SITES, p=_zipf_weights(len(REGIONS), 0.8))
+    status = _pick(rng, STORE_STATUSES, N_SITES)
+    zones = np.array([REGIONS[i][2] for i in region_idx], dtype=object)
+    sites = pd.DataFrame({
+        'Priority': rng.integers(1, 6, N_SITES),
+        'Sitealias': [f"STORE-{code}" for code in range(101001, 101001 + N_SITES)],
+        'Sitecode': np.arange(101001, 101001 + N_SITES),
+        'Region': [REGIONS[i][0] for i in region_idx],
+        'State': [REGIONS[i][1] for i in region_idx],
+        'Store Remark': [rng.choice(STORE_REMARKS[s]) for s in status],
+        'Store Status': status,
+        'Zone': zones,
+        'Whseid': [WAREHOUSES[z.split('/')[0]][0] for z in zones],
+        'Warehouse': [WAREHOUSES[z.split('/')[0]][1] for z in zones],
+        # A few big stores carry most of the open orders
+        'weight': rng.permutation(_zipf_weights(N_SITES, 0.7)),
+    })
+
+    divisions = list(HIERARCHY)
+    division = np.asarray(divisions, dtype=object)[
+        rng.choice(len(divisions), size=N_ARTICLES, p=[HIERARCHY[d][1] for d in divisions])]
+    section = np.empty(N_ARTICLES, dtype=object)
+    department = np.empty(N_ARTICLES, dtype=object)
+    for d in divisions:
+        mask = division == d
+        sections = np.asarray(HIERARCHY[d][2], dtype=object)
+        section[mask] = sections[rng.integers(len(sections), size=mask.sum())]
+        department[mask] = np.asarray([f"{t}-{d.split()[0]}" for t in DEPARTMENT_TYPES], dtype=object)[
+            rng.integers(len(DEPARTMENT_TYPES), size=mask.sum())]
+    codes = np.arange(18001, 18001 + N_ARTICLES)
+    brands = np.asarray(BRANDS, dtype=object)[rng.integers(len(BRANDS), size=N_ARTICLES)]
+    articles = pd.DataFrame({
+        'Division': division,
+        'Div Group': [HIERARCHY[d][0] for d in division],
+        'Section': section,
+        'Department': department,
+        'Article Code': codes,
+        'Article Name': [f"{b}-[{''.join(w[0] for w in s.split())[:3].upper()}{c % 100:02d}]"
+                         for b, s, c in zip(brands, section, codes)],
+        'Seasonal Flag': _pick(rng, SEASONAL_FLAGS, N_ARTICLES),
+        'Sku Remark': _pick(rng, SKU_REMARKS, N_ARTICLES),
+        'Bom Qty': _pick(rng, BOM_QTY, N_ARTICLES).astype(np.int64),
+    })
+    # Dimensions as categoricals: rows are gathered by code and written
+    # dictionary-encoded without re-hashing every string
+    for frame in (sites, articles):
+        for col in frame.columns:
+            if not pd.api.types.is_numeric_dtype(frame[col]) and col != 'Article Name':
+                frame[col] = frame[col].astype('category')
+
+    # Best sellers: demand follows a Zipf curve over a shuffled catalogue
+    weights = rng.permutation(_zipf_weights(N_ARTICLES, 0.8))
+    return sites, articles, weights
+
+def generate_rows(rng, n, sites, articles, article_weights, first_row, first_order,
+                  snapshot_date=SNAPSHOT_DATE):
+    """
+    n order lines for the given stores. Lines come in orders (one store and
+    order date per order); Set Barcode is unique per line.
+    Returns (frame with the processed column order and dtypes, orders used).
+    """
+    sizes = rng.geometric(1 / MEAN_ORDER_LINES, size=n // MEAN_ORDER_LINES + 16)
+    while sizes.sum() < n:
+        sizes = np.concatenate([sizes, rng.geometric(1 / MEAN_ORDER_LINES, size=16)])
+    order = np.repeat(np.arange(len(sizes)), sizes)[:n]
+    n_orders = int(order[-1]) + 1
+
+    site_weights = sites['weight'].to_numpy() / sites['weight'].sum()
+    site = sites.iloc[rng.choice(len(sites), size=n_orders, p=site_weights)[order]].reset_index(drop=True)
+    article = articles.iloc[rng.choice(len(articles), size=n, p=article_weights)].reset_index(drop=True)
+
+    ageing = np.minimum(rng.geometric(1 / (MEAN_AGEING_DAYS + 1), size=n_orders) - 1, MAX_AGEING_DAYS)[order]
+    order_date = (snapshot_date - EXCEL_EPOCH).days - ageing
+    # Month of the order date, looked up per ageing day instead of formatting every row
+    month_by_age = [(snapshot_date - datetime.timedelta(days=d)).strftime('%b').upper()
+                    for d in range(MAX_AGEING_DAYS + 1)]
+    months = sorted(set(month_by_age))
+    month = pd.Categorical.from_codes(np.array([months.index(m) for m in month_by_age])[ageing], months)
+    bounds = [upper for upper, _ in AGEING_GROUPS[:-1]]
+    ageing_group = pd.Categorical.from_codes(np.searchsorted(bounds, ageing), [label for _, label in AGEING_GROUPS])
+
+    bom = article['Bom Qty'].to_numpy()
+    openqty = rng.geometric(0.55, size=n)
+    # Older orders are more likely to be allocated and picked
+    allocated = rng.binomial(openqty, np.clip(0.35 + ageing / 40, 0, 0.95))
+    picked = rng.binomial(allocated, 0.4)
+    picked_pcs = picked * bom
+
+    df = pd.DataFrame({
+        'Priority': site['Priority'],
+        'Sitealias': site['Sitealias'],
+        'Sitecode': site['Sitecode'],
+        'Region': site['Region'],
+        'State': site['State'],
+        'Store Remark': site['Store Remark'],
+        'Store Status': site['Store Status'],
+        'Zone': site['Zone'],
+        'Division': article['Division'],
+        'Div Group': article['Div Group'],
+        'Section': article['Section'],
+        'Department': article['Department'],
+        'Article Code': article['Article Code'],
+        'Article Name': article['Article Name'],
+        'Seasonal Flag': article['Seasonal Flag'],
+        'Orderkey': 'O' + pd.Series(first_order + order).astype(str).str.zfill(9),
+        'Orderdate': order_date,
+        'Set Barcode': 'S$' + pd.Series(12_000_000_000 + first_row + np.arange(n)).astype(str).str.zfill(13),
+        'Sku Type': pd.Categorical.from_codes((bom == 1).astype(np.int8), ['Complex', 'Simple']),
+        'Sku Remark': article['Sku Remark'],
+        'Bom Qty': bom,
+        'Openqty': openqty,
+        'Qtyallocated': allocated,
+        'Qtypicked': picked,
+        'Unallocated Qty': openqty - allocated,
+        'Open Qty Pcs': openqty * bom,
+        'Allocated Qty Pcs': allocated * bom,
+        'Picked Qty Pcs': picked_pcs,
+        'SO Balance': openqty * bom - picked_pcs,
+        'Unallocated Qty Pcs': (openqty - allocated) * bom,
+        'Floor Pending Qty (Pcs)': rng.binomial(picked_pcs, 0.3),
+        'Month': month,
+        'Ageing ': ageing,
+        'Ageing_Group': ageing_group,
+        'Type': (rng.random(n) < 0.1).astype(np.int64),
+        'Whseid': site['Whseid'],
+        'Warehouse': site['Warehouse'],
+    })
+    # Like a real extract, only values that occur are stored in the dictionaries
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df[COLUMNS], n_orders
+
+def generate_dataset(root, rows, seed=42, chunk_rows=CHUNK_ROWS, snapshot_date=SNAPSHOT_DATE):
+    """
+    Writes a synthetic dataset into a data root with the exact ETL layout:
+    processed/SO_Order_Ageing.parquet, transformed/partitioned/Store Status=<s>/,
+    transformed/summary.parquet, facets.parquet, rollups.parquet,
+    sample.parquet, order_index.parquet, bitmaps.parquet and the manifest.
+    Rows are generated and written one status at a time in chunks, and the
+    order index and bitmaps are built from the written file one row group at
+    a time, so no step holds the whole dataset. The order index itself grows
+    with the row count (two entries per row).
+    Same seed and row count -> same dataset.
+    """
+    paths = root_paths(root)
+    partitioned_dir = paths["partitioned_dir"]
+    prepare_output_dir(partitioned_dir, PARTITION_KEYS)
+
+    sites, articles, article_weights = build_dimensions(seed)
+    rng = np.random.default_rng([seed, 1])
+
+    # Rows per status follow the stores' share of demand
+    shares = sites.groupby('Store Status')['weight'].sum()
+    shares = shares / shares.sum()
+    status_rows = dict(zip(shares.index, rng.multinomial(rows, shares.to_numpy())))
+
+    processed = LayoutWriter(paths["processed_path"])
+    partial_sums = []
+    partial_facets = []
+    partial_rollups = []
+    partial_samples = []
+    written = []
+    next_row = next_order = 0
+    for status in sorted(status_rows):
+        count = int(status_rows[status])
+        if count == 0:
+            continue
+        partition_path = os.path.join(partitioned_dir, partition_relpath(PARTITION_KEYS, (status,)), "data.parquet")
+        partition = LayoutWriter(partition_path)
+        status_sites = sites[sites['Store Status'] == status]
+        for start in range(0, count, chunk_rows):
+            n = min(chunk_rows, count - start)
+            df, orders = generate_rows(rng, n, status_sites, articles, article_weights,
+                                       next_row, next_order, snapshot_date)
+            next_row += n
+            next_order += orders
+            processed.write(df)
+            partition.write(df.drop(columns=PARTITION_KEYS))
+            partial_sums.append(df.groupby(GROUP_COL)[NUMERIC_COLS].sum().reset_index())
+            partial_facets.append(build_facets(df))
+            partial_rollups.append(build_rollups(df))
+            # Same fraction in every chunk (no per-chunk minimum), so the merged sample stays proportional
+            partial_samples.append(build_sample(df, min_per_stratum=0, seed=seed + next_row))
+        partition.close()
+        written.append(status)
+        print(f"  [OK] {status}: {count:,} rows")
+    processed.close()
+    write_order_index(paths["processed_path"], paths["order_index_path"])
+    write_bitmaps(paths["processed_path"], paths["bitmaps_path"])
+
+    write_summary(build_summary(pd.concat(partial_sums, ignore_index=True)), paths["summary_path"])
+    write_facets(combine_facets(partial_facets), paths["facets_path"])
+    write_rollups(combine_rollups(partial_rollups), paths["rollups_path"])
+    write_sample(combine_samples(partial_samples), paths["sample_path"])
+    remove_stale_partitions(partitioned_dir, [partition_relpath(PARTITION_KEYS, (s,)) for s in written])
+    write_partitioning(partitioned_dir, PARTITION_KEYS, COLUMNS)
+
+    manifest = load_manifest(paths["manifest_path"])
+    removed = [label for label in manifest.get("partitions", {}) if label not in written]
+    manifest = bump_manifest(manifest, "synthetic", rows, written, removed)
+    manifest["synthetic"] = {"seed": seed, "snapshot_date": snapshot_date.isoformat()}
+    write_manifest(manifest, paths["manifest_path"])
+    return manifest
+
+def generate_published(rows, seed=42, chunk_rows=CHUNK_ROWS, snapshot_date=SNAPSHOT_DATE):
+    """
+    Generates into a new data/versions/v<N>/ and publishes it as current.
+    """
+    manifest = load_manifest(root_paths(current_root())["manifest_path"])
+    stage = stage_version(manifest.get("dataset_version", 0) + 1)
+    write_manifest(manifest, root_paths(stage)["manifest_path"])
+    generate_dataset(stage, rows, seed, chunk_rows, snapshot_date)
+    publish(stage)
+    prune_versions()
+    return stage
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic SO Order Ageing dataset for scale testing.")
+    parser.add_argument("--rows", type=int, default=1_000_000,
+                        help=f"Number of order lines ({MIN_ROWS:,} - {MAX_ROWS:,})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="Rows generated per chunk (bounds memory use)")
+    parser.add_argument("--snapshot-date", type=datetime.date.fromisoformat, default=SNAPSHOT_DATE,
+                        help="Extract date the ageing is measured against (YYYY-MM-DD)")
+    parser.add_argument("--root", default=None,
+                        help="Write into this data root (e.g. data/synthetic) instead of publishing a new data version")
+    args = parser.parse_args()
+
+    if not MIN_ROWS <= args.rows <= MAX_ROWS:
+        print(f"Error: --rows must be between {MIN_ROWS:,} and {MAX_ROWS:,}")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    print(f"Generating {args.rows:,} rows (seed {args.seed})...")
+    try:
+        if args.root:
+            generate_dataset(args.root, args.rows, args.seed, args.chunk_rows, args.snapshot_date)
+            target = args.root
+        else:
+            target = generate_published(args.rows, args.seed, args.chunk_rows, args.snapshot_date)
+            print(f"Published {target} as current")
+    except Exception as e:
+        print(f"Error generating dataset: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+
+    elapsed = time.perf_counter() - start
+    print(f"Done in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s) -> {target}")
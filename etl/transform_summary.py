@@ -2,6 +2,40 @@ import pandas as pd
 import os
 import sys
 
+GROUP_COL = 'Store Status'
+NUMERIC_COLS = ['Open Qty Pcs', 'Allocated Qty Pcs', 'Picked Qty Pcs', 'Unallocated Qty Pcs']
+
+def build_summary(df):
+    """
+    Aggregate row-level data into the Store Status summary (with Grand Total).
+    Works on a copy of the needed columns so the caller's frame is untouched.
+    """
+    numeric_cols = [col for col in NUMERIC_COLS if col in df.columns]
+    data = df[[GROUP_COL] + numeric_cols].copy()
+    
+    # Ensure numeric columns are numeric
+    for col in numeric_cols:
+        data[col] = pd.to_numeric(data[col], errors='coerce').fillna(0)
+    
+    # Group and aggregate
+    summary = data.groupby(GROUP_COL, observed=True)[numeric_cols].sum().reset_index()
+    
+    # Calculate Grand Total
+    total_row = pd.DataFrame(summary[numeric_cols].sum()).T
+    total_row[GROUP_COL] = 'Grand Total'
+    
+    # Combine
+    return pd.concat([summary, total_row], ignore_index=True)
+
+def write_summary(final_summary, output_path):
+    """
+    Save the summary frame, creating the output directory if needed.
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    final_summary.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+
 def transform_summary():
     """
     Transform raw data into summary aggregations by Store Status.
@@ -20,36 +54,15 @@ def transform_summary():
         df = pd.read_parquet(input_path)
         
         print(f"Data loaded: {df.shape[0]} rows, {df.shape[1]} columns")
+        print(f"Aggregating by {GROUP_COL}...")
         
-        # Define grouping column and metrics
-        group_col = 'Store Status'
-        numeric_cols = ['Open Qty Pcs', 'Allocated Qty Pcs', 'Picked Qty Pcs', 'Unallocated Qty Pcs']
-        
-        # Ensure numeric columns are numeric
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-        
-        print(f"Aggregating by {group_col}...")
-        
-        # Group and aggregate
-        summary = df.groupby(group_col)[numeric_cols].sum().reset_index()
-        
-        # Calculate Grand Total
-        total_row = pd.DataFrame(summary[numeric_cols].sum()).T
-        total_row[group_col] = 'Grand Total'
-        
-        # Combine
-        final_summary = pd.concat([summary, total_row], ignore_index=True)
+        final_summary = build_summary(df)
         
         print(f"Summary computed: {len(final_summary)} rows")
         print(final_summary)
         
-        # Create output directory if needed
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        
         # Save summary
-        final_summary.to_parquet(output_path, index=False)
+        write_summary(final_summary, output_path)
         print(f"\nSummary saved to {output_path}")
         
     except Exception as e:
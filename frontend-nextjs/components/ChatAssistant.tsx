@@ -9,6 +9,8 @@ import remarkGfm from 'remark-gfm';
 interface Message {
     role: 'user' | 'assistant';
     content: string;
+    // Set on an estimate whose exact answer can still be requested
+    exactId?: string;
 }
 
 const QUICK_PROMPTS: any[] = [];
@@ -18,6 +20,7 @@ export default function ChatAssistant() {
     const [messages, setMessages] = useState<Message[]>([]);
     const [input, setInput] = useState('');
     const [isLoading, setIsLoading] = useState(false);
+    const [pendingExactId, setPendingExactId] = useState<string | null>(null);
 
     // Resizing State
     const [dimensions, setDimensions] = useState({ width: 75, height: 75 });
@@ -89,8 +92,10 @@ export default function ChatAssistant() {
         setIsLoading(true);
 
         try {
-            const response = await api.chat(queryToSend, messages);
-            const assistantMessage: Message = { role: 'assistant', content: response.response };
+            // Estimate first; the exact answer is a full scan, so it is only run when asked for
+            const response = await api.chat(queryToSend, messages.map(({ role, content }) => ({ role, content })), true);
+            const exactId = response.exact_id ?? undefined;
+            const assistantMessage: Message = { role: 'assistant', content: response.response, exactId };
             setMessages(prev => [...prev, assistantMessage]);
         } catch (error) {
             console.error('Chat error:', error);
@@ -103,6 +108,20 @@ export default function ChatAssistant() {
         }
     };
 
+    const handleExact = async (exactId: string) => {
+        if (pendingExactId) return;
+        setPendingExactId(exactId);
+        try {
+            const exact = await api.chatExact(exactId);
+            setMessages(prev => prev.map(m =>
+                m.exactId === exactId ? { role: 'assistant', content: exact.response } : m));
+        } catch (error) {
+            console.error('Exact answer error:', error);
+        } finally {
+            setPendingExactId(null);
+        }
+    };
+
     const clearHistory = () => {
         localStorage.removeItem('ai_chat_history');
         setMessages([
@@ -232,6 +251,15 @@ export default function ChatAssistant() {
                                         {m.content}
                                     </ReactMarkdown>
                                 </div>
+                                {m.exactId && (
+                                    <button
+                                        onClick={() => handleExact(m.exactId!)}
+                                        disabled={pendingExactId !== null}
+                                        className="mt-3 px-3 py-1.5 rounded-xl bg-blue-600/20 border border-blue-500/30 text-[11px] font-bold uppercase tracking-wider text-blue-300 hover:bg-blue-600/40 transition-colors disabled:opacity-50"
+                                    >
+                                        {pendingExactId === m.exactId ? 'Computing exact answer...' : 'Get exact answer'}
+                                    </button>
+                                )}
                             </div>
                         </div>
                     ))}
@@ -1,7 +1,8 @@
 'use client';
 
-import React from 'react';
+import React, { useEffect, useState } from 'react';
 import { X, Clipboard, ExternalLink } from 'lucide-react';
+import { api } from '@/lib/api';
 
 interface OrderDrawerProps {
     order: any | null;
@@ -9,9 +10,25 @@ interface OrderDrawerProps {
 }
 
 export default function OrderDrawer({ order, onClose }: OrderDrawerProps) {
+    // Every line of the order comes from the indexed /orders lookup, so the
+    // drawer also works for an order the grid doesn't hold ({ Orderkey } only).
+    const [lines, setLines] = useState<any[] | null>(null);
+    const orderKey = order?.Orderkey;
+
+    useEffect(() => {
+        setLines(null);
+        if (!orderKey) return;
+        let cancelled = false;
+        api.getOrder(String(orderKey))
+            .then((res) => { if (!cancelled) setLines(res.lines); })
+            .catch(() => { if (!cancelled) setLines([]); });
+        return () => { cancelled = true; };
+    }, [orderKey]);
+
     if (!order) return null;
 
-    const displayFields = Object.entries(order).filter(([key]) => key !== 'id');
+    const record = Object.keys(order).length > 1 ? order : (lines?.[0] ?? order);
+    const displayFields = Object.entries(record).filter(([key]) => key !== 'id');
 
     return (
         <>
@@ -56,6 +73,24 @@ export default function OrderDrawer({ order, onClose }: OrderDrawerProps) {
                         ))}
                     </div>
 
+                    {/* Lines of the same order */}
+                    {lines && lines.length > 1 && (
+                        <div className="space-y-3">
+                            <h3 className="text-slate-400 text-[11px] font-bold uppercase tracking-[0.2em] px-1">Order Lines ({lines.length})</h3>
+                            <div className="grid grid-cols-1 gap-2">
+                                {lines.map((line, i) => (
+                                    <div
+                                        key={`${line['Set Barcode']}-${i}`}
+                                        className={`flex items-center justify-between p-3 rounded-xl border ${line['Set Barcode'] === record['Set Barcode'] ? 'bg-blue-500/10 border-blue-500/30' : 'bg-slate-800/10 border-slate-800/50'}`}
+                                    >
+                                        <span className="text-sm text-slate-300 font-mono truncate max-w-[220px]">{String(line['Set Barcode'])}</span>
+                                        <span className="text-xs text-slate-500 font-semibold">{String(line['Open Qty Pcs'] ?? '')} pcs open</span>
+                                    </div>
+                                ))}
+                            </div>
+                        </div>
+                    )}
+
                     {/* Grid of Remaining Fields */}
                     <div className="space-y-4">
                         <h3 className="text-slate-400 text-[11px] font-bold uppercase tracking-[0.2em] px-1">All Attributes</h3>
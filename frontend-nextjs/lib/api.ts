@@ -20,6 +20,39 @@ export interface DetailsResponse {
     status: string;
 }
 
+export interface OrderResponse {
+    key: string;
+    matched_on: 'Orderkey' | 'Set Barcode';
+    orderkey: string;
+    total_lines: number;
+    lines: any[];
+}
+
+export interface DrilldownNode {
+    value: string;
+    rows: number;
+    'Open Qty Pcs': number;
+    'Allocated Qty Pcs': number;
+    'Picked Qty Pcs': number;
+    'Unallocated Qty Pcs': number;
+    has_children: boolean;
+}
+
+export interface DrilldownResponse {
+    hierarchy: string;
+    levels: string[];
+    path: string[];
+    level: string;
+    total: Omit<DrilldownNode, 'value' | 'has_children'>;
+    children: DrilldownNode[];
+}
+
+export interface ChatResponse {
+    response: string;
+    approximate: boolean;
+    exact_id: string | null;
+}
+
 export const api = {
     getSummary: async (): Promise<SummaryRow[]> => {
         const response = await axios.get(`${API_BASE_URL}/summary`);
@@ -41,11 +74,40 @@ export const api = {
         return response.data;
     },
 
-    chat: async (query: string, history: { role: string; content: string }[]) => {
+    // All lines of one order by Orderkey or Set Barcode (indexed lookup)
+    getOrder: async (key: string): Promise<OrderResponse> => {
+        const response = await axios.get(`${API_BASE_URL}/orders/${encodeURIComponent(key)}`);
+        return response.data;
+    },
+
+    getHierarchies: async (): Promise<Record<string, string[]>> => {
+        const response = await axios.get(`${API_BASE_URL}/hierarchies`);
+        return response.data;
+    },
+
+    // Children of one node (top level for an empty path), from precomputed rollups
+    getDrilldown: async (hierarchy: string, path: string[] = []): Promise<DrilldownResponse> => {
+        const params = new URLSearchParams();
+        path.forEach((value) => params.append('path', value));
+        const response = await axios.get(
+            `${API_BASE_URL}/drilldown/${encodeURIComponent(hierarchy)}`,
+            { params }
+        );
+        return response.data;
+    },
+
+    // With `approximate`, sums/counts are first estimated from a sample; `exact_id` fetches the exact answer
+    chat: async (query: string, history: { role: string; content: string }[], approximate: boolean = false): Promise<ChatResponse> => {
         const response = await axios.post(`${API_BASE_URL}/chat`, {
             query,
-            history
+            history,
+            approximate
         });
         return response.data;
+    },
+
+    chatExact: async (exactId: string): Promise<ChatResponse> => {
+        const response = await axios.post(`${API_BASE_URL}/chat/exact/${encodeURIComponent(exactId)}`);
+        return response.data;
     }
 };
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 
 # Set page configuration
@@ -12,27 +13,71 @@ st.set_page_config(
 
 # Constants
 API_URL = "http://localhost:8000"
+CACHE_TTL_S = 30          # widget interactions within this window reuse fetched data
+REQUEST_TIMEOUT_S = 60
+MAX_VALIDATED = 64        # payloads kept for conditional re-fetches
+GRID_MODES = ["Server-side paging & sorting", "Client-side grid"]
+
+@st.cache_resource
+def get_session():
+    """
+    One pooled HTTP session per server process, shared by every rerun and
+    browser session, so requests reuse keep-alive connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_validated():
+    """
+    Last payload and ETag per URL. Once the TTL cache expires, the request is
+    conditional and an unchanged payload comes back as a bodiless 304.
+    """
+    return {}
+
+@st.cache_data(ttl=CACHE_TTL_S, show_spinner=False)
+def fetch_json(path, params=None):
+    # Errors raise (and are not cached); callers show them
+    key = (path, tuple(sorted((params or {}).items())))
+    validated = get_validated()
+    cached = validated.get(key)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    response = get_session().get(f"{API_URL}{path}", params=params, headers=headers, timeout=REQUEST_TIMEOUT_S)
+    if response.status_code == 304 and cached:
+        return cached[1]
+    response.raise_for_status()
+    payload = response.json()
+    if response.headers.get("ETag"):
+        # Bounded: drop the oldest entry once full
+        if len(validated) >= MAX_VALIDATED and key not in validated:
+            validated.pop(next(iter(validated)))
+        validated[key] = (response.headers["ETag"], payload)
+    return payload
 
 def get_summary():
     try:
-        response = requests.get(f"{API_URL}/summary")
-        if response.status_code == 200:
-            return pd.DataFrame(response.json())
-        else:
-            st.error(f"Error fetching summary: {response.text}")
-            return None
+        return pd.DataFrame(fetch_json("/summary"))
+    except requests.HTTPError as e:
+        st.error(f"Error fetching summary: {e.response.text}")
+        return None
     except Exception as e:
         st.error(f"Error connecting to backend: {e}")
         return None
 
-def get_details(status, page=1, page_size=1000):
+def get_details(status, page=1, page_size=1000, search="", sort_by="", sort_dir="asc"):
+    params = {"page": page, "page_size": page_size}
+    if search:
+        params["search"] = search
+    if sort_by:
+        params.update(sort_by=sort_by, sort_dir=sort_dir)
     try:
-        response = requests.get(f"{API_URL}/details/{status}?page={page}&page_size={page_size}")
-        if response.status_code == 200:
-            return response.json()
-        else:
-            st.error(f"Error fetching details: {response.text}")
-            return None
+        return fetch_json(f"/details/{status}", params)
+    except requests.HTTPError as e:
+        st.error(f"Error fetching details: {e.response.text}")
+        return None
     except Exception as e:
         st.error(f"Error connecting to backend: {e}")
         return None
@@ -99,22 +144,39 @@ def main():
             if status:
                 st.markdown(f"### Details for Status: **{status}**")
                 
-                # Initialize session state for pagination
+                # Server-side mode keeps pages small and sorts on the backend;
+                # client-side mode loads a whole page into the grid and sorts there.
+                grid_mode = st.radio("Grid mode:", GRID_MODES, horizontal=True)
+                server_side = grid_mode == GRID_MODES[0]
+                
+                ccol1, ccol2, ccol3, ccol4 = st.columns([3, 2, 2, 1])
+                with ccol1:
+                    search = st.text_input("Search:", "").strip()
+                with ccol2:
+                    # Page size selector
+                    if server_side:
+                        page_size = st.selectbox("Rows per page:", [50, 100, 250, 500], index=1)
+                    else:
+                        page_size = st.selectbox("Rows per page:", [100, 500, 1000, 2000], index=2)
+                sort_by, sort_dir = "", "asc"
+                if server_side:
+                    columns = st.session_state.get("detail_columns", [])
+                    with ccol3:
+                        sort_by = st.selectbox("Sort by:", [""] + columns, format_func=lambda c: c or "(none)")
+                    with ccol4:
+                        sort_dir = "desc" if st.selectbox("Order:", ["Asc", "Desc"]) == "Desc" else "asc"
+                
+                # Initialize session state for pagination; any change of view goes back to page 1
+                view = (status, page_size, search, sort_by, sort_dir)
                 if 'current_page' not in st.session_state:
                     st.session_state.current_page = 1
-                if 'current_status' not in st.session_state:
-                    st.session_state.current_status = status
-                
-                # Reset page if status changed
-                if st.session_state.current_status != status:
+                if st.session_state.get('current_view') != view:
                     st.session_state.current_page = 1
-                    st.session_state.current_status = status
-                
-                # Page size selector
-                page_size = st.selectbox("Rows per page:", [100, 500, 1000, 2000], index=2)
+                    st.session_state.current_view = view
                 
                 with st.spinner(f"Fetching details for {status}..."):
-                    result = get_details(status, page=st.session_state.current_page, page_size=page_size)
+                    result = get_details(status, page=st.session_state.current_page, page_size=page_size,
+                                         search=search, sort_by=sort_by, sort_dir=sort_dir)
                 
                 if result:
                     total_rows = result.get('total_rows', 0)
@@ -151,6 +213,11 @@ def main():
                     # Display data
                     if returned_rows > 0:
                         details_df = pd.DataFrame(result['data'])
+                        # Offer the columns for server-side sorting (known after the first page)
+                        if st.session_state.get("detail_columns") != list(details_df.columns):
+                            st.session_state.detail_columns = list(details_df.columns)
+                            if server_side:
+                                st.rerun()
                         
                         # Configure AgGrid for details with proper column sizing
                         gb_details = GridOptionsBuilder.from_dataframe(details_df)
@@ -160,8 +227,9 @@ def main():
                             width=150,  # Default width for all columns
                             minWidth=100,
                             resizable=True,
-                            sortable=True,
-                            filterable=True,
+                            # Sorting a single server page in the grid would be misleading
+                            sortable=not server_side,
+                            filterable=not server_side,
                             wrapText=False,
                             autoHeight=False
                         )